@@ -4,33 +4,124 @@
 分析知识库结构和内容
 """
 import os
+import json
 from pathlib import Path
 
 # 知识库根目录
 KB_ROOT = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库"
 
-def analyze_directory(path, level=0):
-    """递归分析目录结构"""
-    items = []
+# 统计缓存（可选，默认关闭）：按目录记录 修改时间 + 文件列表和大小，目录未变化时不再列目录、不再逐个取文件大小
+# 注意：直接覆盖写入（编辑器保存、重新下载）的文件不会改变目录修改时间，开启后报告中的大小可能是旧值；
+# Windows 下 DirEntry.stat() 不需要额外系统调用，缓存节省得很少，主要用于网络盘等列目录很慢的情况
+USE_STAT_CACHE = False
+STAT_CACHE_NAME = ".知识库统计缓存.json"
+STAT_CACHE_PATH = os.path.join(KB_ROOT, STAT_CACHE_NAME)
+
+def load_stat_cache(cache_path):
+    """读取统计缓存，不存在或损坏时返回空字典"""
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_stat_cache(cache_path, cache):
+    """写入统计缓存（先写临时文件再替换）"""
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+def _list_directory(path):
+    """用 os.scandir 列出目录，文件大小取自 DirEntry.stat()（Windows 下不需要额外系统调用）"""
+    files = []
+    dirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name == STAT_CACHE_NAME:
+                continue
+            try:
+                if entry.is_dir():
+                    dirs.append(entry.name)
+                else:
+                    files.append([entry.name, entry.stat().st_size])
+            except OSError:
+                continue
+    return files, dirs
+
+def scan_tree(path, cache, new_cache):
+    """
+    一次遍历得到整个目录树及统计信息
+    cache 为上次的统计缓存，new_cache 收集本次的缓存（只保留仍然存在的目录）
+
+    返回节点 {'name', 'files': [[文件名, 大小], ...], 'children': [子节点, ...],
+             'total_files', 'total_size', 'ext_stats': {扩展名: [文件数, 总大小]}, 'error'}
+    """
+    node = {
+        'name': os.path.basename(path),
+        'files': [],
+        'children': [],
+        'total_files': 0,
+        'total_size': 0,
+        'ext_stats': {},
+        'error': None
+    }
+
     try:
-        for item in sorted(os.listdir(path)):
-            item_path = os.path.join(path, item)
-            indent = "  " * level
-
-            if os.path.isdir(item_path):
-                # 统计目录下的文件数
-                file_count = len([f for f in os.listdir(item_path) if os.path.isfile(os.path.join(item_path, f))])
-                items.append(f"{indent}[目录] {item}/ ({file_count} 个文件)")
-                # 递归分析子目录
-                items.extend(analyze_directory(item_path, level + 1))
-            else:
-                # 获取文件大小
-                size = os.path.getsize(item_path)
-                size_str = format_size(size)
-                ext = os.path.splitext(item)[1]
-                items.append(f"{indent}[文件] {item} ({size_str}) {ext}")
-    except Exception as e:
-        items.append(f"{indent}[错误] 无法访问: {e}")
+        mtime_ns = os.stat(path).st_mtime_ns
+        cached = cache.get(path)
+        if cached and cached['mtime_ns'] == mtime_ns:
+            files, dirs = cached['files'], cached['dirs']
+        else:
+            files, dirs = _list_directory(path)
+    except OSError as e:
+        node['error'] = e
+        return node
+
+    new_cache[path] = {'mtime_ns': mtime_ns, 'files': files, 'dirs': dirs}
+    node['files'] = files
+
+    for name, size in files:
+        ext = os.path.splitext(name)[1]
+        stats = node['ext_stats'].setdefault(ext, [0, 0])
+        stats[0] += 1
+        stats[1] += size
+        node['total_files'] += 1
+        node['total_size'] += size
+
+    for name in dirs:
+        child = scan_tree(os.path.join(path, name), cache, new_cache)
+        node['children'].append(child)
+        node['total_files'] += child['total_files']
+        node['total_size'] += child['total_size']
+        for ext, (count, size) in child['ext_stats'].items():
+            stats = node['ext_stats'].setdefault(ext, [0, 0])
+            stats[0] += count
+            stats[1] += size
+
+    return node
+
+def analyze_directory(node, level=0):
+    """把目录树渲染成结构文本（目录和文件按名称排序）"""
+    items = []
+    indent = "  " * level
+
+    if node['error'] is not None:
+        items.append(f"{indent}[错误] 无法访问: {node['error']}")
+        return items
+
+    entries = [(name, 'file', size) for name, size in node['files']]
+    entries += [(child['name'], 'dir', child) for child in node['children']]
+
+    for name, kind, value in sorted(entries, key=lambda x: x[0]):
+        if kind == 'dir':
+            items.append(f"{indent}[目录] {name}/ ({len(value['files'])} 个文件)")
+            items.extend(analyze_directory(value, level + 1))
+        else:
+            ext = os.path.splitext(name)[1]
+            items.append(f"{indent}[文件] {name} ({format_size(value)}) {ext}")
 
     return items
 
@@ -47,7 +138,14 @@ def main():
     print("人类图AI高我知识库 - 结构分析")
     print("=" * 80)
 
-    structure = analyze_directory(KB_ROOT)
+    # 一次遍历得到目录结构和全部统计
+    cache = load_stat_cache(STAT_CACHE_PATH) if USE_STAT_CACHE else {}
+    new_cache = {}
+    tree = scan_tree(KB_ROOT, cache, new_cache)
+    if USE_STAT_CACHE and tree['error'] is None:
+        save_stat_cache(STAT_CACHE_PATH, new_cache)
+
+    structure = analyze_directory(tree)
 
     print("\n知识库结构:")
     print("-" * 80)
@@ -60,30 +158,26 @@ def main():
     print("=" * 80)
 
     # 统计各类文件
-    total_files = 0
-    txt_files = 0
-    md_files = 0
-    docx_files = 0
-    total_size = 0
-
-    for root, dirs, files in os.walk(KB_ROOT):
-        for file in files:
-            file_path = os.path.join(root, file)
-            total_files += 1
-            total_size += os.path.getsize(file_path)
-
-            if file.endswith('.txt'):
-                txt_files += 1
-            elif file.endswith('.md'):
-                md_files += 1
-            elif file.endswith('.docx'):
-                docx_files += 1
+    ext_stats = tree['ext_stats']
+    total_files = tree['total_files']
+    txt_files = ext_stats.get('.txt', [0, 0])[0]
+    md_files = ext_stats.get('.md', [0, 0])[0]
+    docx_files = ext_stats.get('.docx', [0, 0])[0]
+    total_size = tree['total_size']
+
+    ext_lines = [
+        f"  {ext or '(无扩展名)'}: {count} 个, {format_size(size)}"
+        for ext, (count, size) in sorted(ext_stats.items(), key=lambda x: (-x[1][0], x[0]))
+    ]
 
     print(f"总文件数: {total_files}")
     print(f"TXT文件: {txt_files}")
     print(f"MD文件: {md_files}")
     print(f"DOCX文件: {docx_files}")
     print(f"总大小: {format_size(total_size)}")
+    print("按扩展名:")
+    for line in ext_lines:
+        print(line)
 
     # 保存报告
     report_path = os.path.join(KB_ROOT, "知识库结构分析.txt")
@@ -103,6 +197,9 @@ def main():
         f.write(f"MD文件: {md_files}\n")
         f.write(f"DOCX文件: {docx_files}\n")
         f.write(f"总大小: {format_size(total_size)}\n")
+        f.write("按扩展名:\n")
+        for line in ext_lines:
+            f.write(line + "\n")
 
     print(f"\n报告已保存到: {report_path}")
 
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章目录库（SQLite）
+记录每个快照（去重结果、分类结果、旧版目录等）中每篇文章的 URL、标题、文集、是否收费、内容摘要，
+source_url 有索引。对比两个快照只需要在库里做集合查询，不必重新打开所有文章；
+同步目录时只打开 大小/修改时间 变化过的文件；这些文件在文章包（article_pack.py）中未变化时，
+URL/标题/内容摘要直接取自包的索引，也不打开
+"""
+import os
+import sqlite3
+
+from article_frontmatter import read_frontmatter
+from article_pack import PACK_PATH, open_pack, packed_entry
+from content_hash import hash_file
+from parallel_scan import parallel_map
+
+# 目录库位置
+CATALOG_PATH = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\文章目录.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    snapshot     TEXT NOT NULL,
+    path         TEXT NOT NULL,
+    directory    TEXT NOT NULL,
+    file         TEXT NOT NULL,
+    collection   TEXT,
+    source_url   TEXT,
+    title        TEXT,
+    paid         INTEGER,
+    content_hash TEXT,
+    size         INTEGER,
+    mtime_ns     INTEGER,
+    PRIMARY KEY (snapshot, path)
+);
+CREATE INDEX IF NOT EXISTS idx_articles_source_url ON articles (source_url);
+CREATE INDEX IF NOT EXISTS idx_articles_snapshot_url ON articles (snapshot, source_url);
+CREATE INDEX IF NOT EXISTS idx_articles_snapshot_dir ON articles (snapshot, directory);
+"""
+
+COLUMNS = ('snapshot', 'path', 'directory', 'file', 'collection', 'source_url',
+           'title', 'paid', 'content_hash', 'size', 'mtime_ns')
+
+def open_catalog(catalog_path=CATALOG_PATH):
+    """打开（必要时创建）目录库"""
+    conn = sqlite3.connect(catalog_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def upsert_articles(conn, snapshot, records):
+    """
+    写入或更新文章记录
+    records: 可迭代的字典，至少包含 path，其余字段（collection/source_url/title/paid/
+             content_hash/size/mtime_ns）缺省为 NULL
+    """
+    placeholders = ', '.join('?' for _ in COLUMNS)
+    updates = ', '.join(f"{col} = excluded.{col}" for col in COLUMNS[2:])
+    sql = (f"INSERT INTO articles ({', '.join(COLUMNS)}) VALUES ({placeholders}) "
+           f"ON CONFLICT (snapshot, path) DO UPDATE SET {updates}")
+
+    rows = []
+    for record in records:
+        path = record['path']
+        row = dict(record, snapshot=snapshot,
+                   directory=record.get('directory', os.path.dirname(path)),
+                   file=record.get('file', os.path.basename(path)))
+        if row.get('paid') is not None:
+            row['paid'] = int(row['paid'])
+        rows.append(tuple(row.get(col) for col in COLUMNS))
+
+    with conn:
+        conn.executemany(sql, rows)
+    return len(rows)
+
+def scan_article(file_path):
+    """读取一篇文章的 YAML 头并计算内容摘要（在子进程中运行）"""
+    try:
+        header = read_frontmatter(file_path)
+        return {
+            'source_url': header.source_url,
+            'title': header.title,
+            'content_hash': hash_file(file_path)
+        }
+    except Exception as e:
+        return {'error': str(e)}
+
+def sync_directory(conn, snapshot, directory, collection=None, paid=None, pack_path=PACK_PATH):
+    """
+    把目录中的 .md 文章同步到快照：
+    大小和修改时间未变、且已有内容摘要的文件直接跳过；变化的文件先从文章包的索引中取，
+    包中没有或已变化的文件并行重新读取；目录中已不存在的文件从快照中删除
+    返回 {'scanned': 文件数, 'updated': 更新数, 'from_pack': 其中取自文章包的数量, 'removed': 删除数}
+    """
+    known = {
+        row['path']: (row['size'], row['mtime_ns'], row['content_hash'])
+        for row in conn.execute(
+            "SELECT path, size, mtime_ns, content_hash FROM articles "
+            "WHERE snapshot = ? AND directory = ?", (snapshot, directory))
+    }
+
+    present = {}
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.md') and entry.is_file():
+            st = entry.stat()
+            present[entry.path] = (st.st_size, st.st_mtime_ns)
+
+    changed = [
+        path for path, (size, mtime_ns) in present.items()
+        if path not in known or known[path][:2] != (size, mtime_ns) or known[path][2] is None
+    ]
+
+    records = []
+    pack = open_pack(pack_path) if changed else None
+    to_scan = []
+    for path in changed:
+        entry = packed_entry(pack, path, present[path])
+        if entry is None:
+            to_scan.append(path)
+            continue
+        size, mtime_ns = present[path]
+        records.append({
+            'path': path, 'directory': directory, 'collection': collection, 'paid': paid,
+            'source_url': entry['source_url'], 'title': entry['title'],
+            'content_hash': entry['content_hash'], 'size': size, 'mtime_ns': mtime_ns
+        })
+    from_pack = len(records)
+    if pack is not None:
+        pack.close()
+
+    for path, scanned in zip(to_scan, parallel_map(scan_article, to_scan)):
+        if 'error' in scanned:
+            print(f"❌ 读取文件失败: {path}")
+            print(f"   错误: {scanned['error']}")
+            continue
+        size, mtime_ns = present[path]
+        records.append(dict(scanned, path=path, directory=directory, collection=collection,
+                            paid=paid, size=size, mtime_ns=mtime_ns))
+    upsert_articles(conn, snapshot, records)
+
+    # 文集或收费标记变化时，未变化的文件也要更新这两个字段
+    with conn:
+        conn.execute(
+            "UPDATE articles SET collection = ?, paid = ? WHERE snapshot = ? AND directory = ?",
+            (collection, None if paid is None else int(paid), snapshot, directory))
+
+    removed = [path for path in known if path not in present]
+    with conn:
+        conn.executemany("DELETE FROM articles WHERE snapshot = ? AND path = ?",
+                         [(snapshot, path) for path in removed])
+
+    return {'scanned': len(present), 'updated': len(records), 'from_pack': from_pack, 'removed': len(removed)}
+
+def snapshot_urls(conn, snapshot, paid=None):
+    """
+    快照中所有有URL的文章：{source_url: {'title', 'file', 'paid', 'collection'}}
+    paid 为 True/False 时只返回收费/免费文章
+    """
+    sql = "SELECT source_url, title, file, paid, collection FROM articles " \
+          "WHERE snapshot = ? AND source_url IS NOT NULL"
+    params = [snapshot]
+    if paid is not None:
+        sql += " AND paid = ?"
+        params.append(int(paid))
+    sql += " ORDER BY path"
+
+    return {
+        row['source_url']: {
+            'title': row['title'] or row['file'],
+            'file': row['file'],
+            'paid': None if row['paid'] is None else bool(row['paid']),
+            'collection': row['collection']
+        }
+        for row in conn.execute(sql, params)
+    }
+
+def urls_only_in(conn, snapshot, other_snapshot):
+    """在 snapshot 中但不在 other_snapshot 中的 URL（索引上的集合查询）"""
+    rows = conn.execute(
+        "SELECT DISTINCT a.source_url FROM articles a "
+        "WHERE a.snapshot = ? AND a.source_url IS NOT NULL "
+        "AND NOT EXISTS (SELECT 1 FROM articles b "
+        "                WHERE b.snapshot = ? AND b.source_url = a.source_url) "
+        "ORDER BY a.source_url",
+        (snapshot, other_snapshot))
+    return [row['source_url'] for row in rows]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章 YAML 头（frontmatter）读取
+只读取到 YAML 头结束的 --- 为止，不读取正文，多MB的文章每篇也只需读几KB
+"""
+import re
+from collections import namedtuple
+
+# 找不到 YAML 头结束标记时，最多读取的字符数
+MAX_HEADER_CHARS = 4096
+
+# title / source_url 等字段，预先编译
+_FIELD_RE = re.compile(r'^\s*([A-Za-z_][\w-]*):\s*(.*?)\s*$')
+_LOOSE_FIELD_RE = re.compile(r'^\s*(title|source_url):\s*"([^"]+)"', re.M)
+
+# title: 标题，source_url: 原文链接，fields: YAML 头中的全部字段，
+# body_offset: 正文在文件中的起始字符位置（不含BOM，没有 YAML 头时为 0）
+ArticleHeader = namedtuple('ArticleHeader', ['title', 'source_url', 'fields', 'body_offset'])
+
+def _unquote(value):
+    """去掉字段值两侧的引号"""
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+def _build_header(fields, body_offset):
+    return ArticleHeader(
+        title=fields.get('title') or None,
+        source_url=fields.get('source_url') or None,
+        fields=fields,
+        body_offset=body_offset,
+    )
+
+def _parse_lines(lines):
+    """
+    解析 YAML 头的各行（lines 为逐行产出的可迭代对象，第一行之后）
+    返回 (字段字典, 消耗的字符数, 是否找到结束标记)
+    """
+    fields = {}
+    consumed = 0
+    for line in lines:
+        consumed += len(line)
+        if line.strip() == '---':
+            return fields, consumed, True
+        match = _FIELD_RE.match(line)
+        if match:
+            fields.setdefault(match.group(1), _unquote(match.group(2)))
+        if consumed > MAX_HEADER_CHARS:
+            break
+    return fields, consumed, False
+
+def _iter_lines(text, start):
+    """从 start 位置开始逐行产出文本（不复制整段正文）"""
+    while start < len(text):
+        end = text.find('\n', start) + 1 or len(text)
+        yield text[start:end]
+        start = end
+
+def _parse_loose(text):
+    """没有标准 YAML 头时，在开头一段文字里查找 title / source_url"""
+    fields = {}
+    for match in _LOOSE_FIELD_RE.finditer(text):
+        fields.setdefault(match.group(1), match.group(2))
+    return _build_header(fields, 0)
+
+def parse_frontmatter(content):
+    """从已读入内存的文章内容中解析 YAML 头（只看头部，不会匹配到正文里的 title:）"""
+    if content.startswith('\ufeff'):
+        content = content[1:]
+    first_end = content.find('\n') + 1
+    if not first_end or content[:first_end].strip() != '---':
+        return _parse_loose(content[:MAX_HEADER_CHARS])
+
+    fields, consumed, closed = _parse_lines(_iter_lines(content, first_end))
+    if not closed:
+        return _parse_loose(content[:MAX_HEADER_CHARS])
+    return _build_header(fields, first_end + consumed)
+
+def read_frontmatter(file_path, max_chars=MAX_HEADER_CHARS):
+    """
+    逐行读取文章的 YAML 头，读到结束的 --- 就停止
+    文件不以 --- 开头时，只读取前 max_chars 个字符查找 title / source_url
+    读取失败时抛出 OSError / UnicodeDecodeError，由调用方处理
+    """
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        return read_frontmatter_from(f, max_chars)
+
+def read_frontmatter_from(f, max_chars=MAX_HEADER_CHARS):
+    """
+    从已打开的文本流读取 YAML 头，规则与 read_frontmatter() 相同；不需要 seek，可用于解压流
+    （article_pack.open_article_text）。读取后流的位置不确定，需要正文时重新打开
+    """
+    first = f.readline(max_chars)
+    if first.strip() != '---':
+        return _parse_loose(first + f.read(max(0, max_chars - len(first))))
+
+    lines = [first]
+    def iter_header_lines():
+        for line in iter(lambda: f.readline(max_chars), ''):
+            lines.append(line)
+            yield line
+
+    fields, consumed, closed = _parse_lines(iter_header_lines())
+    if not closed:
+        head = ''.join(lines)
+        return _parse_loose((head + f.read(max(0, max_chars - len(head))))[:max_chars])
+    return _build_header(fields, len(first) + consumed)
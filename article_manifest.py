@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章清单（manifest）缓存
+按 路径 + 文件大小 + 修改时间 记录已提取的元数据，
+未变化的文件直接复用清单中的结果，无需再次打开读取
+"""
+import os
+import json
+
+MANIFEST_VERSION = 1
+
+def file_signature(stat_result):
+    """用于判断文件是否变化的签名：[大小, 修改时间(纳秒)]"""
+    return [stat_result.st_size, stat_result.st_mtime_ns]
+
+def iter_markdown_files(root_dir, skip_names=('README.md',)):
+    """
+    遍历目录下所有 .md 文件，返回 (路径, 文件名, stat)
+    遍历顺序与 os.walk 一致（先当前目录的文件，再依次进入子目录），
+    使用 os.scandir 的 DirEntry.stat()，Windows 下无需额外系统调用
+    """
+    try:
+        entries = list(os.scandir(root_dir))
+    except OSError as e:
+        print(f"❌ 无法访问目录: {root_dir}")
+        print(f"   错误: {e}")
+        return
+
+    sub_dirs = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            sub_dirs.append(entry.path)
+        elif entry.name.endswith('.md') and entry.name not in skip_names:
+            yield entry.path, entry.name, entry.stat()
+
+    for sub_dir in sub_dirs:
+        yield from iter_markdown_files(sub_dir, skip_names)
+
+def load_manifest(manifest_path):
+    """读取清单文件，不存在或损坏时返回空清单"""
+    empty = {'version': MANIFEST_VERSION, 'files': {}, 'outputs': {}}
+    if not manifest_path or not os.path.exists(manifest_path):
+        return empty
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  清单文件无法读取，将重新全量扫描: {e}")
+        return empty
+    if manifest.get('version') != MANIFEST_VERSION:
+        return empty
+    manifest.setdefault('files', {})
+    manifest.setdefault('outputs', {})
+    return manifest
+
+def save_manifest(manifest_path, manifest):
+    """写入清单文件（先写临时文件再替换，避免中途崩溃留下半个文件）"""
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+def lookup_metadata(manifest, file_path, stat_result):
+    """文件未变化时返回清单中缓存的元数据，否则返回 None"""
+    entry = manifest['files'].get(file_path)
+    if entry and entry['sig'] == file_signature(stat_result):
+        return entry['metadata']
+    return None
+
+def record_metadata(manifest, file_path, stat_result, metadata):
+    """记录文件的元数据（只保存 source_url 和 title，不保存正文）"""
+    manifest['files'][file_path] = {
+        'sig': file_signature(stat_result),
+        'metadata': {
+            'source_url': metadata.get('source_url'),
+            'title': metadata.get('title'),
+        },
+    }
+
+def lookup_minhash(manifest, file_path, stat_result, params):
+    """
+    文件未变化、且签名参数相同时返回缓存的 MinHash 签名文本（正文为空的文章为 ''），否则返回 None
+    """
+    entry = manifest['files'].get(file_path)
+    if not entry or entry['sig'] != file_signature(stat_result):
+        return None
+    cached = entry.get('minhash')
+    if not cached or cached['params'] != list(params):
+        return None
+    return cached['signature']
+
+def record_minhash(manifest, file_path, stat_result, params, signature):
+    """在文件的清单记录中保存 MinHash 签名文本（文件的元数据记录须已存在且未变化）"""
+    entry = manifest['files'].get(file_path)
+    if entry and entry['sig'] == file_signature(stat_result):
+        entry['minhash'] = {'params': list(params), 'signature': signature}
+
+def prune_missing(manifest, seen_paths):
+    """删除清单中已经不存在的文件记录，返回删除数量"""
+    stale = [path for path in manifest['files'] if path not in seen_paths]
+    for path in stale:
+        del manifest['files'][path]
+    return len(stale)
+
+def output_is_current(manifest, dest_path, source_path, stat_result):
+    """输出文件存在，且上次由同一个未变化的源文件生成时返回 True"""
+    entry = manifest['outputs'].get(dest_path)
+    return (
+        entry is not None
+        and entry['source'] == source_path
+        and entry['sig'] == file_signature(stat_result)
+        and os.path.exists(dest_path)
+    )
+
+def record_output(manifest, dest_path, source_path, stat_result):
+    """记录输出文件对应的源文件及其签名"""
+    manifest['outputs'][dest_path] = {
+        'source': source_path,
+        'sig': file_signature(stat_result),
+    }
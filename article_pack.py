@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章打包存储
+把 王骁老师文章 / _去重后 / _免费文章 / _收费文章 等目录中的上千篇 .md 文章打成一个包文件：
+每篇文章单独压缩（安装了 zstandard 时用 zstd，否则用 zlib），内容相同的文章只存一份；
+包末尾是索引（文集、文件名、URL、标题、内容摘要、在包中的位置）
+
+读取时用 mmap 打开，只载入索引，读哪篇解压哪篇；遍历全部文章是对包文件的一次顺序读取，
+不再需要逐个 open/stat 几千个小文件
+
+各扫描脚本（dify_chunker / mention_index / article_catalog.sync_directory / recheck_paid_articles /
+near_duplicates / article_search）按文章逐篇使用包：目录中文件的 大小+修改时间 与包中记录一致时
+从包中读取（sync_directory 直接用索引中的 URL/标题/摘要，不解压），否则读取原文件。
+包是上次打包时的内容，重跑 article_pack.py（流水线的 pack 步骤）后命中的文章更多
+
+    python article_pack.py            # 重新打包（未变化的文章直接复用旧包中压缩好的数据）
+    python article_pack.py 免费文章    # 列出包中某个文集的文章
+"""
+import io
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+
+from article_frontmatter import parse_frontmatter
+from article_manifest import file_signature
+from content_hash import hash_bytes
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 配置路径
+BASE_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论"
+PACK_PATH = os.path.join(BASE_DIR, "王骁老师文章.pack")
+
+# 文集名 -> 目录
+PACK_DIRS = {
+    '原始文章': os.path.join(BASE_DIR, "王骁老师文章"),
+    '去重后': os.path.join(BASE_DIR, "王骁老师文章_去重后"),
+    '免费文章': os.path.join(BASE_DIR, "王骁老师文章_免费文章"),
+    '收费文章': os.path.join(BASE_DIR, "王骁老师文章_收费文章"),
+}
+
+# 压缩级别
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+
+# 流式读取时每次从包中取的压缩数据量
+STREAM_CHUNK = 64 * 1024
+
+_MAGIC = b'HDPACK01'
+_HEADER = struct.Struct('<8s8s')      # 标识、压缩方式
+_FOOTER = struct.Struct('<QQ8s')      # 索引位置、索引长度、标识
+
+def default_codec():
+    return 'zstd' if zstandard is not None else 'zlib'
+
+def _compressor(codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress
+    return lambda data: zlib.compress(data, ZLIB_LEVEL)
+
+def _decompressor(codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("这个包用 zstd 压缩，需要先安装 zstandard（pip install zstandard）")
+        return zstandard.ZstdDecompressor().decompress
+    if codec == 'zlib':
+        return zlib.decompress
+    raise ValueError(f"未知的压缩方式: {codec}")
+
+class _SliceReader:
+    """mmap 中一段数据的只读文件对象（每次 read 只复制请求的部分）"""
+
+    def __init__(self, mm, offset, length):
+        self._mm = mm
+        self._pos = offset
+        self._end = offset + length
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._end - self._pos
+        data = self._mm[self._pos:min(self._pos + size, self._end)]
+        self._pos += len(data)
+        return data
+
+class _ZlibReader(io.RawIOBase):
+    """逐块解压 zlib 数据；每次输出不超过调用方的缓冲区大小，内存占用与文章长度无关"""
+
+    def __init__(self, source):
+        self._source = source
+        self._decompressor = zlib.decompressobj()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._decompressor.eof:
+            data = self._decompressor.unconsumed_tail or self._source.read(STREAM_CHUNK)
+            if not data:
+                raise ValueError("文章包中的压缩数据不完整")
+            out = self._decompressor.decompress(data, len(buffer))
+            if out:
+                buffer[:len(out)] = out
+                return len(out)
+        return 0
+
+def _stream_reader(codec, source):
+    """按压缩方式返回逐块解压的二进制流"""
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("这个包用 zstd 压缩，需要先安装 zstandard（pip install zstandard）")
+        return zstandard.ZstdDecompressor().stream_reader(source, read_size=STREAM_CHUNK)
+    if codec == 'zlib':
+        return _ZlibReader(source)
+    raise ValueError(f"未知的压缩方式: {codec}")
+
+class ArticlePack:
+    """
+    用 mmap 打开的文章包
+    entries: 索引条目列表，每条为 {'collection', 'file', 'source_url', 'title', 'content_hash',
+             'sig', 'offset', 'length'}
+    """
+
+    def __init__(self, pack_path=PACK_PATH):
+        self._file = open(pack_path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, codec = _HEADER.unpack_from(self._mm, 0)
+        index_offset, index_length, end_magic = _FOOTER.unpack_from(self._mm, len(self._mm) - _FOOTER.size)
+        if magic != _MAGIC or end_magic != _MAGIC:
+            raise ValueError(f"不是文章包文件: {pack_path}")
+
+        self.codec = codec.rstrip(b'\0').decode('ascii')
+        self._decompress = _decompressor(self.codec)
+        self.entries = json.loads(zlib.decompress(self._mm[index_offset:index_offset + index_length]))
+        self._by_url = {}
+        self._by_hash = {}
+        self._by_file = {(entry['collection'], entry['file']): entry for entry in self.entries}
+        for entry in self.entries:
+            if entry['source_url']:
+                self._by_url.setdefault(entry['source_url'], entry)
+            self._by_hash.setdefault(entry['content_hash'], entry)
+
+    def raw(self, entry):
+        """条目的压缩数据（不解压）"""
+        return self._mm[entry['offset']:entry['offset'] + entry['length']]
+
+    def read_bytes(self, entry):
+        return self._decompress(self.raw(entry))
+
+    def read(self, entry):
+        """解压一篇文章，返回文本"""
+        return self.read_bytes(entry).decode('utf-8')
+
+    def open_stream(self, entry):
+        """按条目打开逐块解压的二进制流（不会一次解压整篇文章）；流关闭前不要关闭包"""
+        source = _SliceReader(self._mm, entry['offset'], entry['length'])
+        return io.BufferedReader(_stream_reader(self.codec, source), STREAM_CHUNK)
+
+    def find_url(self, source_url):
+        """按 URL 查找条目（没有时返回 None）"""
+        return self._by_url.get(source_url)
+
+    def find_hash(self, content_hash):
+        return self._by_hash.get(content_hash)
+
+    def entry_for(self, collection, file, sig):
+        """文集中文件名相同、大小/修改时间也相同的条目（没有或已变化时返回 None）"""
+        entry = self._by_file.get((collection, file))
+        return entry if entry is not None and entry['sig'] == list(sig) else None
+
+    def collection(self, name):
+        return [entry for entry in self.entries if entry['collection'] == name]
+
+    def is_current(self, collection, directory):
+        """包中该文集的文件及其 大小/修改时间 与目录一致时返回 True（只 stat，不读文件）"""
+        packed = {entry['file']: entry['sig'] for entry in self.collection(collection)}
+        on_disk = {name: sig for name, path, sig in _scan_directory(directory)}
+        return packed == on_disk
+
+    def iter_articles(self, collection=None):
+        """
+        按在包中的顺序产出 (条目, 文本)，对包文件是一次顺序读取；
+        内容相同的文章只解压一次
+        """
+        entries = self.entries if collection is None else self.collection(collection)
+        last_offset, last_text = None, None
+        for entry in sorted(entries, key=lambda e: e['offset']):
+            if entry['offset'] != last_offset:
+                last_offset, last_text = entry['offset'], self.read(entry)
+            yield entry, last_text
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+def open_pack(pack_path=PACK_PATH):
+    """打开文章包；包不存在或无法读取（例如缺少 zstandard）时返回 None，调用方改为读取原文件"""
+    if not pack_path or not os.path.exists(pack_path):
+        return None
+    try:
+        return ArticlePack(pack_path)
+    except (OSError, ValueError, RuntimeError, struct.error):
+        return None
+
+def collection_for(directory, pack_dirs=PACK_DIRS):
+    """目录对应的文集名（不是打包的目录时返回 None）"""
+    directory = os.path.normcase(os.path.abspath(directory))
+    for collection, pack_dir in pack_dirs.items():
+        if os.path.normcase(os.path.abspath(pack_dir)) == directory:
+            return collection
+    return None
+
+def packed_entry(pack, file_path, sig):
+    """文件在包中未变化的条目（pack 为 None、目录没有打包或文件已变化时返回 None）"""
+    if pack is None:
+        return None
+    collection = collection_for(os.path.dirname(file_path))
+    if collection is None:
+        return None
+    return pack.entry_for(collection, os.path.basename(file_path), sig)
+
+_worker_packs = {}
+
+def _worker_pack(pack_path):
+    """子进程中共用的包（每个进程只打开一次，不关闭）"""
+    pack = _worker_packs.get(pack_path)
+    if pack is None:
+        pack = _worker_packs[pack_path] = ArticlePack(pack_path)
+    return pack
+
+def read_packed(pack_path, entry):
+    """按条目读取文章原始字节（可在子进程中调用，每个进程只打开一次包）"""
+    return _worker_pack(pack_path).read_bytes(entry)
+
+def open_article_text(file_path, entry=None, pack_path=PACK_PATH, encoding='utf-8'):
+    """
+    以文本流打开文章：entry 不为 None 时从包中逐块解压，否则打开原文件（可在子进程中调用）
+    两种方式逐行读到的内容相同，换行符都统一为 \n；适合需要逐行处理、不想整篇载入内存的脚本
+    """
+    if entry is None:
+        return open(file_path, 'r', encoding=encoding)
+    return io.TextIOWrapper(_worker_pack(pack_path).open_stream(entry), encoding=encoding, newline=None)
+
+def read_article(file_path, entry=None, pack_path=PACK_PATH, encoding='utf-8'):
+    """
+    读取文章文本：entry 不为 None 时从包中解压，否则读取原文件（可在子进程中调用）
+    两种方式得到的文本相同，换行符都与文本模式 open() 一样统一为 \n
+    """
+    if entry is None:
+        with open(file_path, 'r', encoding=encoding) as f:
+            return f.read()
+    return io.StringIO(read_packed(pack_path, entry).decode(encoding), newline=None).read()
+
+def _scan_directory(directory):
+    """目录中的 .md 文件：[(文件名, 路径, 签名), ...]"""
+    files = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith('.md') and entry.is_file():
+                files.append((entry.name, entry.path, file_signature(entry.stat())))
+    files.sort()
+    return files
+
+def build_pack(pack_dirs=PACK_DIRS, pack_path=PACK_PATH, codec=None):
+    """
+    打包文章，返回 {'articles': 条目数, 'stored': 实际存储的不同内容数, 'reused': 复用旧包的条目数,
+                    'compressed': 本次压缩数, 'failed': [(路径, 错误), ...]}
+    文件签名未变化的文章直接复制旧包中压缩好的数据，不打开原文件
+    """
+    codec = codec or default_codec()
+    compress = _compressor(codec)
+
+    # 旧包损坏、被截断或缺少解压库时 open_pack 返回 None，全部重新压缩
+    old = open_pack(pack_path)
+    old_entries = {}
+    if old is not None and old.codec == codec:
+        old_entries = {(e['collection'], e['file']): e for e in old.entries}
+
+    stats = {'articles': 0, 'stored': 0, 'reused': 0, 'compressed': 0, 'failed': []}
+    tmp_path = pack_path + '.tmp'
+    entries = []
+    stored = {}   # 内容摘要 -> (位置, 长度)
+    try:
+        with open(tmp_path, 'wb') as out:
+            out.write(_HEADER.pack(_MAGIC, codec.encode('ascii')))
+            offset = _HEADER.size
+
+            for collection, directory in pack_dirs.items():
+                if not os.path.isdir(directory):
+                    continue
+                for name, path, sig in _scan_directory(directory):
+                    previous = old_entries.get((collection, name))
+                    if previous and previous['sig'] == sig:
+                        meta = {k: previous[k] for k in ('source_url', 'title', 'content_hash')}
+                        blob = None if meta['content_hash'] in stored else old.raw(previous)
+                        stats['reused'] += 1
+                    else:
+                        try:
+                            with open(path, 'rb') as f:
+                                data = f.read()
+                            header = parse_frontmatter(data.decode('utf-8'))
+                        except Exception as e:
+                            stats['failed'].append((path, str(e)))
+                            continue
+                        meta = {'source_url': header.source_url, 'title': header.title,
+                                'content_hash': hash_bytes(data)}
+                        blob = None
+                        if meta['content_hash'] not in stored:
+                            blob = compress(data)
+                            stats['compressed'] += 1
+
+                    content_hash = meta['content_hash']
+                    if content_hash not in stored:
+                        out.write(blob)
+                        stored[content_hash] = (offset, len(blob))
+                        offset += len(blob)
+                    position, length = stored[content_hash]
+                    entries.append(dict(meta, collection=collection, file=name, sig=sig,
+                                        offset=position, length=length))
+
+            index_blob = zlib.compress(json.dumps(entries, ensure_ascii=False).encode('utf-8'))
+            out.write(index_blob)
+            out.write(_FOOTER.pack(offset, len(index_blob), _MAGIC))
+    finally:
+        if old is not None:
+            old.close()
+    os.replace(tmp_path, pack_path)
+
+    stats['articles'] = len(entries)
+    stats['stored'] = len(stored)
+    return stats
+
+def main():
+    if len(sys.argv) > 1:
+        pack = ArticlePack(PACK_PATH)
+        for entry in pack.collection(sys.argv[1]):
+            print(f"{entry['file']}  {entry['title'] or ''}  {entry['source_url'] or ''}")
+        pack.close()
+        return
+
+    print("=" * 80)
+    print("文章打包")
+    print("=" * 80)
+
+    codec = default_codec()
+    if codec == 'zlib':
+        print("\n未安装 zstandard，使用 zlib 压缩（pip install zstandard 可改用 zstd）")
+
+    stats = build_pack(PACK_DIRS, PACK_PATH, codec)
+
+    for path, error in stats['failed']:
+        print(f"❌ 读取文件失败: {path}")
+        print(f"   错误: {error}")
+
+    total_size = 0
+    for directory in PACK_DIRS.values():
+        if os.path.isdir(directory):
+            total_size += sum(os.path.getsize(path) for name, path, sig in _scan_directory(directory))
+    pack_size = os.path.getsize(PACK_PATH)
+
+    print(f"\n文章: {stats['articles']} 篇（不同内容 {stats['stored']} 篇）")
+    print(f"复用旧包: {stats['reused']} 篇，本次压缩: {stats['compressed']} 篇")
+    print(f"原文件共 {total_size / 1024 / 1024:.1f}MB，包文件 {pack_size / 1024 / 1024:.1f}MB（{codec}）")
+    print(f"已保存到: {PACK_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+免费文章全文检索（BM25 倒排索引）
+把 find_paid_articles.py 分出来的免费文章切成 中文二字词 + 人类图术语词典中的词，
+建立压缩的倒排索引写入一个文件；查询时用 mmap 打开，只解压查询词的倒排表，
+在整个语料上取前 k 篇只需几毫秒，不需要把文章发给模型或外部向量服务
+
+    python article_search.py                  # 重建索引
+    python article_search.py 荐骨权威 等待回应   # 查询
+"""
+import os
+import re
+import sys
+import json
+import math
+import mmap
+import zlib
+import heapq
+import struct
+import time
+from array import array
+from collections import Counter
+from itertools import accumulate, chain
+
+from article_frontmatter import parse_frontmatter
+from article_manifest import iter_markdown_files
+from article_pack import PACK_PATH, open_pack
+from hd_terms import dictionary_terms
+from multi_pattern import AhoCorasick
+from parallel_scan import parallel_map
+
+# 配置路径
+ARTICLES_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章_免费文章"
+INDEX_PATH = os.path.join(os.path.dirname(ARTICLES_DIR), "免费文章检索索引.bin")
+
+# 文章包（article_pack.py）与免费文章目录一致时，直接从包中顺序读取免费文章
+USE_PACK = True
+PACK_COLLECTION = '免费文章'
+
+# 一并建立索引的其他目录（递归），例如 ingest_documents.py 导入的 DOCX / TXT 资料
+EXTRA_DIRS = [
+    r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\导入文档",
+]
+
+# BM25 参数
+K1 = 1.2
+B = 0.75
+
+# 默认返回篇数
+TOP_K = 10
+
+_MAGIC = b'HDBM25\x00\x01'
+_HEADER = struct.Struct('<8sQQQ')
+
+# 连续的汉字、连续的字母数字
+_CJK_RUN = re.compile(r'[\u4e00-\u9fff]+')
+_WORD = re.compile(r'[a-z0-9]+')
+
+_dictionary = None
+
+def _get_dictionary():
+    """术语词典自动机（每个进程只编译一次）"""
+    global _dictionary
+    if _dictionary is None:
+        _dictionary = AhoCorasick((term, term) for term in dictionary_terms())
+    return _dictionary
+
+def tokenize(text):
+    """
+    切词：每段连续汉字切成相邻二字词（单个汉字保留为一个词），
+    再加上文中出现的词典术语和英文/数字词（小写）
+    """
+    tokens = []
+    for match in _CJK_RUN.finditer(text):
+        run = match.group()
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    tokens.extend(term for start, end, term in _get_dictionary().iter_matches(text))
+    tokens.extend(_WORD.findall(text.lower()))
+    return tokens
+
+def index_article(file_path):
+    """读取一篇文章并统计词频（在子进程中运行）"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except Exception as e:
+        return {'error': str(e)}
+    return index_content(content, os.path.splitext(os.path.basename(file_path))[0])
+
+def index_content(content, default_title):
+    """统计一篇文章的词频（标题 + 正文）"""
+    header = parse_frontmatter(content)
+    title = header.title or default_title
+    terms = Counter(tokenize(title + '\n' + content[header.body_offset:]))
+    return {
+        'title': title,
+        'source_url': header.source_url,
+        'length': sum(terms.values()),
+        'terms': terms
+    }
+
+def _encode_postings(doc_ids, tfs):
+    """文章序号差值（按最大差值选 1/2/4 字节）+ 词频（最多 255），整体 zlib 压缩"""
+    gaps = [doc_ids[0]] + [b - a for a, b in zip(doc_ids, doc_ids[1:])]
+    largest = max(gaps)
+    code = 'B' if largest < 1 << 8 else 'H' if largest < 1 << 16 else 'I'
+    raw = array(code, gaps).tobytes() + bytes(min(tf, 255) for tf in tfs)
+    return code, zlib.compress(raw, 6)
+
+def build_index(paths, index_path=INDEX_PATH):
+    """
+    为文章建立索引并写入 index_path（先写临时文件再替换）
+    返回 {'documents': 篇数, 'terms': 词数, 'failed': [(路径, 错误), ...]}
+    """
+    return write_index(zip(paths, parallel_map(index_article, paths)), index_path)
+
+def iter_pack_results(pack, collection, directory):
+    """从文章包中顺序读取一个文集并统计词频：产出 (路径, 结果)"""
+    for entry, content in pack.iter_articles(collection):
+        yield (os.path.join(directory, entry['file']),
+               index_content(content, os.path.splitext(entry['file'])[0]))
+
+def write_index(results, index_path=INDEX_PATH):
+    """由 (路径, index_article 的结果) 序列生成索引文件"""
+    docs = []
+    postings = {}
+    failed = []
+    for path, result in results:
+        if 'error' in result:
+            failed.append((path, result['error']))
+            continue
+        doc_id = len(docs)
+        docs.append([path, result['title'], result['source_url'], result['length']])
+        for term, tf in result['terms'].items():
+            postings.setdefault(term, []).append((doc_id, tf))
+
+    terms = {}
+    blobs = []
+    offset = 0
+    for term in sorted(postings):
+        entries = postings[term]
+        code, blob = _encode_postings([d for d, tf in entries], [tf for d, tf in entries])
+        terms[term] = [offset, len(blob), len(entries), code]
+        blobs.append(blob)
+        offset += len(blob)
+
+    docs_blob = zlib.compress(json.dumps(docs, ensure_ascii=False).encode('utf-8'))
+    terms_blob = zlib.compress(json.dumps(terms, ensure_ascii=False).encode('utf-8'))
+
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, len(docs_blob), len(terms_blob), offset))
+        f.write(docs_blob)
+        f.write(terms_blob)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, index_path)
+
+    return {'documents': len(docs), 'terms': len(terms), 'failed': failed}
+
+class SearchIndex:
+    """用 mmap 打开的检索索引；文章表和词表在打开时载入，倒排表按需解压"""
+
+    def __init__(self, index_path=INDEX_PATH):
+        self._file = open(index_path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, docs_len, terms_len, postings_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"不是检索索引文件: {index_path}")
+
+        pos = _HEADER.size
+        self.docs = json.loads(zlib.decompress(self._mm[pos:pos + docs_len]))
+        pos += docs_len
+        self.terms = json.loads(zlib.decompress(self._mm[pos:pos + terms_len]))
+        self._postings_start = pos + terms_len
+
+        count = len(self.docs)
+        avgdl = sum(doc[3] for doc in self.docs) / count if count else 0.0
+        # BM25 分母中与文章长度有关的部分，每篇文章预先算好
+        self._norms = [K1 * (1 - B + B * doc[3] / avgdl) if avgdl else K1 for doc in self.docs]
+
+    def postings(self, term):
+        """返回 (文章序号迭代器, 词频字节串)，词不在索引中时返回 None"""
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        offset, length, df, code = entry
+        start = self._postings_start + offset
+        raw = zlib.decompress(self._mm[start:start + length])
+        gaps = array(code)
+        split = df * gaps.itemsize
+        gaps.frombytes(raw[:split])
+        return accumulate(gaps), raw[split:]
+
+    def search(self, query, k=TOP_K):
+        """BM25 排序的前 k 篇：[(分数, {'path', 'title', 'source_url'}), ...]"""
+        count = len(self.docs)
+        scores = {}
+        norms = self._norms
+        for term, qtf in Counter(tokenize(query)).items():
+            found = self.postings(term)
+            if found is None:
+                continue
+            doc_ids, tfs = found
+            df = self.terms[term][2]
+            weight = qtf * math.log(1 + (count - df + 0.5) / (df + 0.5)) * (K1 + 1)
+            get = scores.get
+            for doc_id, tf in zip(doc_ids, tfs):
+                scores[doc_id] = get(doc_id, 0.0) + weight * tf / (tf + norms[doc_id])
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [
+            (score, {'path': self.docs[d][0], 'title': self.docs[d][1], 'source_url': self.docs[d][2]})
+            for d, score in best
+        ]
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+def main():
+    if len(sys.argv) > 1:
+        query = ' '.join(sys.argv[1:])
+        index = SearchIndex(INDEX_PATH)
+        started = time.perf_counter()
+        results = index.search(query)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"查询: {query}（{len(index.docs)} 篇中找到 {len(results)} 篇，{elapsed:.1f}ms）\n")
+        for i, (score, doc) in enumerate(results, 1):
+            print(f"{i}. [{score:.2f}] {doc['title']}")
+            if doc['source_url']:
+                print(f"   {doc['source_url']}")
+        index.close()
+        return
+
+    print("=" * 80)
+    print("建立免费文章检索索引")
+    print("=" * 80)
+
+    extra_paths = []
+    for extra_dir in EXTRA_DIRS:
+        if os.path.isdir(extra_dir):
+            extra_paths.extend(path for path, name, st in iter_markdown_files(extra_dir))
+
+    # 包不存在、无法读取（例如用 zstd 压缩但没有安装 zstandard）或与目录不一致时读取文章文件
+    pack = open_pack(PACK_PATH) if USE_PACK else None
+    if pack is not None:
+        if not pack.is_current(PACK_COLLECTION, ARTICLES_DIR):
+            print("\n文章包与免费文章目录不一致，改为读取文章文件（重跑 article_pack.py 可更新）")
+            pack.close()
+            pack = None
+
+    if pack is not None:
+        print(f"\n从文章包读取 {len(pack.collection(PACK_COLLECTION))} 篇文章，"
+              f"另有 {len(extra_paths)} 篇导入文档，正在建立索引...")
+        results = chain(iter_pack_results(pack, PACK_COLLECTION, ARTICLES_DIR),
+                        zip(extra_paths, parallel_map(index_article, extra_paths)))
+        stats = write_index(results, INDEX_PATH)
+        pack.close()
+    else:
+        paths = sorted(
+            os.path.join(ARTICLES_DIR, name) for name in os.listdir(ARTICLES_DIR)
+            if name.endswith('.md')
+        ) + extra_paths
+        print(f"\n找到 {len(paths)} 篇文章，正在建立索引...")
+        stats = build_index(paths, INDEX_PATH)
+
+    for path, error in stats['failed']:
+        print(f"❌ 读取文件失败: {path}")
+        print(f"   错误: {error}")
+
+    print(f"\n索引完成: {stats['documents']} 篇文章，{stats['terms']} 个词")
+    print(f"索引大小: {os.path.getsize(INDEX_PATH) / 1024:.1f}KB")
+    print(f"已保存到: {INDEX_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章脚本基准测试
+在合成语料（synthetic_corpus.py）上依次运行 去重 → 收费分类 → 副本清理 → 新旧对比，
+每个脚本在单独的子进程中运行，测量：
+    耗时、每秒文件数、每秒MB数
+    峰值内存（本进程和进程池子进程中最大的一个）
+    读写字节数和 read/write 系统调用次数（来自 /proc/self/io，只有 Linux 有）
+结果写成 JSON 保存在 RESULTS_DIR，文件名带 git 提交号，方便比较不同提交的性能
+
+    python benchmark_articles.py                   # 按 SIZES 中的规模全部运行
+    python benchmark_articles.py 1000 10000        # 只运行指定规模
+    python benchmark_articles.py compare 旧.json 新.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import contextlib
+import subprocess
+
+from synthetic_corpus import generate_corpus
+
+try:
+    import resource
+except ImportError:
+    resource = None   # Windows 没有 resource 模块，不统计峰值内存
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 语料和运行目录（语料按规模缓存，参数不变时不会重新生成）
+WORK_DIR = os.path.join(SCRIPT_DIR, ".基准测试")
+RESULTS_DIR = os.path.join(SCRIPT_DIR, "基准测试结果")
+
+# 测试规模（文章数）
+SIZES = [1000, 10000, 100000]
+
+# 依次运行的脚本（后面的脚本使用前面脚本的输出）
+SCRIPTS = ['deduplicate_articles', 'find_paid_articles', 'clean_duplicates', 'compare_articles']
+
+def corpus_dir(size):
+    return os.path.join(WORK_DIR, f"语料_{size}")
+
+def run_dir(size):
+    return os.path.join(WORK_DIR, f"运行_{size}")
+
+def _link_tree(src, dest, flat=False):
+    """
+    用硬链接复制语料中的文章（不在语料上直接运行：clean_duplicates.py 会删除副本）
+    flat 为 True 时全部放在同一个目录中（compare_articles.py 只读取一层目录），跳过副本和同名文章
+    """
+    for current, dirs, files in os.walk(src):
+        target = dest if flat else os.path.join(dest, os.path.relpath(current, src))
+        os.makedirs(target, exist_ok=True)
+        for name in files:
+            if not name.endswith('.md') or (flat and '副本' in name):
+                continue
+            if os.path.exists(os.path.join(target, name)):
+                continue
+            try:
+                os.link(os.path.join(current, name), os.path.join(target, name))
+            except OSError:
+                shutil.copy2(os.path.join(current, name), os.path.join(target, name))
+
+def configure(script, size):
+    """把脚本的路径配置指向合成语料和运行目录，返回导入的模块"""
+    corpus, run = corpus_dir(size), run_dir(size)
+    catalog_path = os.path.join(run, "文章目录.db")
+    module = __import__(script)
+
+    if script == 'deduplicate_articles':
+        module.SOURCE_DIR = corpus
+        module.OUTPUT_DIR = os.path.join(run, "去重后")
+        module.MANIFEST_PATH = os.path.join(module.OUTPUT_DIR, ".去重清单.json")
+        module.CATALOG_PATH = catalog_path
+    elif script == 'find_paid_articles':
+        module.ARTICLES_DIR = os.path.join(run, "去重后")
+        module.PAID_DIR = os.path.join(run, "收费文章")
+        module.FREE_DIR = os.path.join(run, "免费文章")
+        module.PLAN_PATH = os.path.join(run, "收费文章分类计划.jsonl")
+        module.CATALOG_PATH = catalog_path
+    elif script == 'clean_duplicates':
+        module.TARGET_DIR = os.path.join(run, "副本清理")
+        module.SCAN_DIRS = [module.TARGET_DIR]
+        if not os.path.isdir(module.TARGET_DIR):
+            _link_tree(corpus, module.TARGET_DIR)
+    elif script == 'compare_articles':
+        module.OLD_DIR = os.path.join(run, "旧版文章")
+        if not os.path.isdir(module.OLD_DIR):
+            _link_tree(corpus, module.OLD_DIR, flat=True)
+        module.NEW_FREE_DIR = os.path.join(run, "免费文章")
+        module.NEW_PAID_DIR = os.path.join(run, "收费文章")
+        module.REPORT_PATH = os.path.join(run, "文章对比报告.txt")
+        module.CATALOG_PATH = catalog_path
+    return module
+
+def read_proc_io():
+    """/proc/self/io 中的读写统计（不是 Linux 时返回 None）"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            return {key: int(value) for key, value in (line.split(':') for line in f)}
+    except OSError:
+        return None
+
+def peak_rss_kb():
+    """本进程和已结束子进程中最大的峰值内存（KB）"""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def measure(script, size, log_path):
+    """在当前进程中运行一个脚本并测量（由子进程调用）"""
+    module = configure(script, size)
+    sys.argv = [script + '.py']
+    io_before = read_proc_io()
+    cpu_before = time.process_time()
+    start = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        module.main()
+    wall = time.perf_counter() - start
+
+    result = {
+        'wall_seconds': wall,
+        'cpu_seconds': time.process_time() - cpu_before,
+        'peak_rss_kb': peak_rss_kb(),
+        'io': None,
+    }
+    io_after = read_proc_io()
+    if io_before and io_after:
+        result['io'] = {key: io_after[key] - io_before[key] for key in io_after}
+    return result
+
+def run_script(script, size, corpus_stats):
+    """在子进程中运行一个脚本，返回测量结果"""
+    log_path = os.path.join(run_dir(size), f"{script}.log")
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--measure', script, str(size), log_path],
+        capture_output=True, text=True, encoding='utf-8', cwd=SCRIPT_DIR
+    )
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"退出码 {proc.returncode}"}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    wall = result['wall_seconds'] or 1e-9
+    result['files_per_second'] = corpus_stats['files'] / wall
+    result['mb_per_second'] = corpus_stats['bytes'] / 1024 / 1024 / wall
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=SCRIPT_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_benchmarks(sizes):
+    results = {
+        'commit': git_commit(),
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'workers': os.environ.get('ARTICLE_SCAN_WORKERS') or str(os.cpu_count()),
+        'sizes': {},
+    }
+    for size in sizes:
+        print(f"\n规模: {size} 篇")
+        corpus_stats = generate_corpus(corpus_dir(size), count=size)
+        state = "生成" if corpus_stats['generated'] else "复用"
+        print(f"  语料（{state}）: {corpus_stats['files']} 个文件，{corpus_stats['bytes'] / 1024 / 1024:.1f}MB")
+
+        shutil.rmtree(run_dir(size), ignore_errors=True)
+        os.makedirs(run_dir(size))
+        size_results = {'files': corpus_stats['files'], 'bytes': corpus_stats['bytes'], 'scripts': {}}
+        for script in SCRIPTS:
+            result = run_script(script, size, corpus_stats)
+            size_results['scripts'][script] = result
+            if 'error' in result:
+                print(f"  ❌ {script}: {result['error']}")
+                continue
+            io = result['io'] or {}
+            print(f"  {script}: {result['wall_seconds']:.2f}s，{result['files_per_second']:.0f} 文件/秒，"
+                  f"{result['mb_per_second']:.1f}MB/秒，峰值内存 {result['peak_rss_kb'] or '-'}KB，"
+                  f"read {io.get('syscr', '-')} 次 / write {io.get('syscw', '-')} 次")
+        results['sizes'][str(size)] = size_results
+    return results
+
+def save_results(results):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    name = time.strftime('%Y%m%d-%H%M%S') + f"-{results['commit']}.json"
+    path = os.path.join(RESULTS_DIR, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return path
+
+def compare_results(old_path, new_path):
+    """对比两次结果的耗时和峰值内存"""
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    print(f"对比: {old['commit']}（{old['time']}） -> {new['commit']}（{new['time']}）")
+    for size in sorted(old['sizes'].keys() & new['sizes'].keys(), key=int):
+        print(f"\n规模: {size} 篇")
+        for script in SCRIPTS:
+            a = old['sizes'][size]['scripts'].get(script, {})
+            b = new['sizes'][size]['scripts'].get(script, {})
+            if 'wall_seconds' not in a or 'wall_seconds' not in b:
+                continue
+            ratio = b['wall_seconds'] / a['wall_seconds'] if a['wall_seconds'] else float('inf')
+            line = f"  {script}: {a['wall_seconds']:.2f}s -> {b['wall_seconds']:.2f}s（{ratio:.2f}x）"
+            if a.get('peak_rss_kb') and b.get('peak_rss_kb'):
+                line += f"，峰值内存 {a['peak_rss_kb']}KB -> {b['peak_rss_kb']}KB"
+            print(line)
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--measure':
+        script, size, log_path = sys.argv[2], int(sys.argv[3]), sys.argv[4]
+        print(json.dumps(measure(script, size, log_path)))
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'compare':
+        if len(sys.argv) < 4:
+            print("用法: python benchmark_articles.py compare 旧.json 新.json")
+            return
+        compare_results(sys.argv[2], sys.argv[3])
+        return
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+
+    print("=" * 80)
+    print("文章脚本基准测试")
+    print("=" * 80)
+
+    results = run_benchmarks(sizes)
+    path = save_results(results)
+    print(f"\n结果已保存到: {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成轮回交叉直接索引表
+轮回交叉由 个性太阳闸门 + 人生角色决定的角度 唯一确定（右角度 / 并列 / 左角度），
+所以可以做成 64×3 的平铺数组：
+    table[(个性太阳闸门 - 1) * 3 + 角度序号] = crosses 中的下标
+bodygraph-analyzer.js 由人生角色查出角度序号后一次下标运算即可取到交叉，不再逐个比较 192 条记录；
+按门组合 key 查找还有一个问题：同一组门可能同时是并列和左角度交叉（如 1-2-4-49），只能找到其中一个
+
+数据按 SOURCES 的顺序填表（前面的文件优先），生成前检查 64 个闸门 × 3 种角度全部有交叉、
+12 种人生角色都有对应角度、各数据文件中同一 闸门/角度 的 key 一致，有缺失或冲突时不写出文件；安装了 numpy 时再用 cross_integrity.py
+检查表中 192 个交叉（对宫、key 重复、名称数等），有问题时同样不写出
+"""
+import os
+import sys
+import json
+
+try:
+    import cross_integrity
+except ImportError:
+    cross_integrity = None   # 没有安装 numpy，跳过完整性检查
+
+# 数据目录
+DATA_DIR = r"D:\CursorWork\HumanDesignAI\data"
+
+# 交叉数据（按优先顺序）：final 是前端使用的整理版（英文名已格式化、带编号），
+# complete 是从书中完整提取的 192 个，用来补 final 中缺少的交叉
+SOURCES = ['incarnation_crosses_final.json', 'incarnation_crosses_complete.json']
+
+# 输出：前端两份 bodygraph-analyzer.js 各自读取自己的 data 目录
+OUTPUT_NAME = 'incarnation_cross_lookup.json'
+OUTPUT_DIRS = [DATA_DIR, os.path.join(os.path.dirname(DATA_DIR), 'app-web', 'data')]
+
+LOOKUP_VERSION = 1
+
+# 角度序号
+ANGLES = ['右角度', '并列', '左角度']
+
+# 人生角色（个性太阳爻/设计太阳爻） -> 角度
+PROFILE_ANGLES = {
+    '1/3': '右角度', '1/4': '右角度', '2/4': '右角度', '2/5': '右角度',
+    '3/5': '右角度', '3/6': '右角度', '4/6': '右角度',
+    '4/1': '并列',
+    '5/1': '左角度', '5/2': '左角度', '6/2': '左角度', '6/3': '左角度',
+}
+
+GATE_COUNT = 64
+
+# 表中每个交叉保留的字段
+FIELDS = ('chinese_name', 'english_name', 'type', 'key', 'number', 'quarter')
+
+def slot(gate, angle):
+    """平铺数组中的位置"""
+    return (gate - 1) * len(ANGLES) + ANGLES.index(angle)
+
+def build_lookup(data_dir=DATA_DIR, sources=SOURCES):
+    """
+    生成索引表，返回 (表, 统计)
+    统计: {'filled': {数据文件: 填入数}, 'missing': [(闸门, 角度), ...], 'conflicts': [...]}
+    """
+    table = [-1] * (GATE_COUNT * len(ANGLES))
+    crosses = []
+    stats = {'filled': {}, 'missing': [], 'conflicts': []}
+
+    for source in sources:
+        path = os.path.join(data_dir, source)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        filled = 0
+        seen = {}
+        for record in records:
+            gate = record['gates']['black_sun']
+            angle = record['type']
+            if angle not in ANGLES or not 1 <= gate <= GATE_COUNT:
+                stats['conflicts'].append((source, record.get('key'), f"无法识别的类型或闸门: {angle} {gate}"))
+                continue
+            # 同一数据文件中同一闸门同一角度出现两次
+            if (gate, angle) in seen:
+                if seen[(gate, angle)] != record['key']:
+                    stats['conflicts'].append((source, record['key'], f"{gate}号闸门{angle}已有 {seen[(gate, angle)]}"))
+                continue
+            seen[(gate, angle)] = record['key']
+            if table[slot(gate, angle)] != -1:
+                # 前面的数据文件已填入：两者的门组合不同时记为冲突（不能悄悄用前面的覆盖）
+                existing = crosses[table[slot(gate, angle)]]
+                if existing['key'] != record['key']:
+                    stats['conflicts'].append((source, record['key'], f"{gate}号闸门{angle}已有 {existing['key']}"))
+                continue
+            table[slot(gate, angle)] = len(crosses)
+            crosses.append({field: record[field] for field in FIELDS if field in record})
+            filled += 1
+        stats['filled'][source] = filled
+
+    for gate in range(1, GATE_COUNT + 1):
+        for angle in ANGLES:
+            if table[slot(gate, angle)] == -1:
+                stats['missing'].append((gate, angle))
+
+    lookup = {
+        'version': LOOKUP_VERSION,
+        'angles': ANGLES,
+        'profile_angle': {profile: ANGLES.index(angle) for profile, angle in PROFILE_ANGLES.items()},
+        'table': table,
+        'crosses': crosses,
+    }
+    return lookup, stats
+
+def resolve(lookup, sun_gate, profile):
+    """按 个性太阳闸门 + 人生角色 查交叉（与 bodygraph-analyzer.js 中的查找方式相同）"""
+    angle = lookup['profile_angle'].get(profile)
+    if angle is None:
+        return None
+    index = lookup['table'][(sun_gate - 1) * len(lookup['angles']) + angle]
+    return lookup['crosses'][index] if index >= 0 else None
+
+def verify(lookup):
+    """检查 64 个闸门 × 12 种人生角色都能查到交叉，返回查不到的 [(闸门, 人生角色), ...]"""
+    return [
+        (gate, profile)
+        for gate in range(1, GATE_COUNT + 1)
+        for profile in PROFILE_ANGLES
+        if resolve(lookup, gate, profile) is None
+    ]
+
+def write_lookup(lookup, output_dirs=OUTPUT_DIRS):
+    """写入各输出目录（先写临时文件再替换）"""
+    written = []
+    for output_dir in output_dirs:
+        if not os.path.isdir(output_dir):
+            continue
+        path = os.path.join(output_dir, OUTPUT_NAME)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(lookup, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        written.append(path)
+    return written
+
+def main():
+    print("=" * 60)
+    print("生成轮回交叉直接索引表")
+    print("=" * 60)
+
+    lookup, stats = build_lookup(DATA_DIR, SOURCES)
+
+    for source, count in stats['filled'].items():
+        print(f"  {source}: 填入 {count} 个")
+    for source, key, reason in stats['conflicts']:
+        print(f"  [冲突] {source} {key}: {reason}")
+
+    unresolved = verify(lookup)
+    if len(PROFILE_ANGLES) != 12:
+        print(f"\n[FAIL] 人生角色应为 12 种，实际 {len(PROFILE_ANGLES)} 种")
+        sys.exit(1)
+    if stats['conflicts']:
+        print(f"\n[FAIL] 数据文件之间有 {len(stats['conflicts'])} 处冲突，先修正数据文件")
+        print("\n索引表未写出")
+        sys.exit(1)
+    if stats['missing'] or unresolved:
+        print(f"\n[FAIL] 缺少 {len(stats['missing'])} 个交叉，{len(unresolved)} 个 闸门/人生角色 组合查不到：")
+        for gate, angle in stats['missing']:
+            print(f"  {gate}号闸门 {angle}")
+        print("\n索引表未写出")
+        sys.exit(1)
+
+    if cross_integrity is None:
+        print("\n未安装 numpy，跳过完整性检查（pip install numpy）")
+    else:
+        print("\n完整性检查：")
+        table = cross_integrity.build_table(lookup['crosses'])
+        opposites = cross_integrity.load_opposites(os.path.join(DATA_DIR, 'gate_opposites.json'))
+        report = cross_integrity.check_table(table, opposites)
+        cross_integrity.print_report(report)
+        if not report['ok']:
+            print("\n索引表未写出")
+            sys.exit(1)
+
+    print(f"\n[OK] {GATE_COUNT} 个闸门 × {len(ANGLES)} 种角度 = {len(lookup['table'])} 格，"
+          f"{len(PROFILE_ANGLES)} 种人生角色全部可查")
+    for path in write_lookup(lookup, OUTPUT_DIRS):
+        print(f"已保存到: {path}")
+
+if __name__ == '__main__':
+    main()
@@ -4,70 +4,119 @@
 清理王骁老师文章中的重复副本文件
 """
 import os
-from collections import defaultdict
+import re
 
-# 目标文件夹
+from content_hash import iter_files, find_duplicate_groups
+
+# 目标文件夹：只删除这个文件夹中的副本（清理报告也保存在这里）
 TARGET_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章"
 
+# 参与比对的文件夹（递归扫描），可以加入其他文集一起比对；其他文集中的重复只报告，不删除
+SCAN_DIRS = [
+    r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论",
+]
+
+# 扫描时跳过的文件夹：流水线生成的输出（保留原文件名，其中的"副本"是要导入 Dify 的文章，不能当作副本处理）
+EXCLUDE_DIRS = (
+    "王骁老师文章_去重后",
+    "王骁老师文章_免费文章",
+    "王骁老师文章_收费文章",
+    "导入文档",
+)
+
+# 为 True 时忽略行尾空白差异（内容相同但行尾多了空格/换行的副本也视为重复）
+# 大小不同的文件此时也可能相同：带"副本"标记的文件和同名的原文件总是计算摘要，
+# 其他文件仍只对大小相同的计算（它们之间只有行尾空白不同的重复只会漏报，不影响删除）
+IGNORE_TRAILING_WHITESPACE = True
+
+# 文件名中的副本标记（"X - 副本.md"、"X - 副本 (2).md"）
+_COPY_MARK_RE = re.compile(r'\s*- 副本(?:\s*\(\d+\))?')
+
+def is_copy_name(file_name):
+    """文件名中带"副本"标记"""
+    return ' - 副本' in file_name or '- 副本' in file_name
+
+def original_name(file_name):
+    """去掉副本标记后的文件名（"X - 副本 (2).md" -> "X.md"）"""
+    return _COPY_MARK_RE.sub('', file_name)
+
+def copy_partners(paths):
+    """带副本标记的文件，以及去掉标记后与它同名的文件（大小不同也要比较内容）"""
+    names = {path: os.path.basename(path) for path in paths}
+    bases = {original_name(name) for name in names.values() if is_copy_name(name)}
+    return {path for path, name in names.items() if original_name(name) in bases}
+
+def in_target(file_path):
+    """文件在 TARGET_DIR 中"""
+    target = os.path.normcase(os.path.abspath(TARGET_DIR))
+    path = os.path.normcase(os.path.abspath(file_path))
+    try:
+        return os.path.commonpath([target, path]) == target
+    except ValueError:
+        return False   # 不在同一个盘
+
 def main():
     print("=" * 80)
     print("开始清理重复副本文件")
     print("=" * 80)
 
-    # 存储文件信息
-    files_info = []
-
     # 遍历文件
     print("\n正在扫描文件...")
-    for file in os.listdir(TARGET_DIR):
-        if not file.endswith('.md'):
-            continue
-
-        file_path = os.path.join(TARGET_DIR, file)
-        file_size = os.path.getsize(file_path)
-
-        files_info.append({
-            'name': file,
-            'path': file_path,
-            'size': file_size,
-            'is_copy': ' - 副本' in file or '- 副本' in file
-        })
+    files = list(iter_files(SCAN_DIRS, exclude_dirs=EXCLUDE_DIRS))
+    size_of = dict(files)
+    files_info = [
+        {
+            'name': os.path.basename(path),
+            'path': path,
+            'size': size,
+            'is_copy': is_copy_name(os.path.basename(path))
+        }
+        for path, size in files
+    ]
 
     print(f"共找到 {len(files_info)} 个.md文件")
 
-    # 按文件名（去除"副本"）分组
-    grouped_files = defaultdict(list)
-
-    for file_info in files_info:
-        # 获取基础名称（去除"副本"）
-        base_name = file_info['name'].replace(' - 副本', '').replace('- 副本', '')
-        grouped_files[base_name].append(file_info)
+    # 按内容摘要分组（只对大小相同的候选文件计算摘要）
+    print("\n分析重复文件（按内容摘要）...")
+    partners = copy_partners([path for path, size in files]) if IGNORE_TRAILING_WHITESPACE else None
+    groups = find_duplicate_groups(files, normalize=IGNORE_TRAILING_WHITESPACE, unsized=partners)
 
     # 查找需要删除的副本文件
+    # 只删除 TARGET_DIR 中带"副本"标记的文件，并且 TARGET_DIR 中至少保留组内一个文件；
+    # 其他文集中的文件（包括副本）和内容相同但都不是副本的文件只报告不删除
     to_delete = []
-    to_keep_different_size = []
-
-    print("\n分析重复文件...")
-    for base_name, file_list in grouped_files.items():
-        if len(file_list) > 1:
-            # 有重复文件
-            # 按是否是副本排序，原文件在前
-            file_list.sort(key=lambda x: x['is_copy'])
-
-            original = file_list[0]  # 原文件
-            copies = file_list[1:]    # 副本文件
-
-            for copy in copies:
-                if copy['is_copy']:
-                    # 比较文件大小
-                    if copy['size'] == original['size']:
-                        # 大小相同，删除副本
-                        to_delete.append(copy)
-                        print(f"  [将删除] {copy['name']} ({copy['size']} bytes)")
-                    else:
-                        # 大小不同，保留
-                        to_keep_different_size.append(copy)
-                        print(f"  [保留-大小不同] {copy['name']} ({copy['size']} bytes) vs 原文件({original['size']} bytes)")
+    cross_collection = []
+
+    for digest, paths in groups.items():
+        group = [
+            {
+                'name': os.path.basename(path),
+                'path': path,
+                'size': size_of[path],
+                'is_copy': is_copy_name(os.path.basename(path))
+            }
+            for path in paths
+        ]
+        # 目标文件夹中的文件在前，原文件在前；目标文件夹中全部都是副本时保留其中第一个
+        group.sort(key=lambda x: (not in_target(x['path']), x['is_copy']))
+        original = group[0]
+
+        for item in group[1:]:
+            if item['is_copy'] and in_target(item['path']) and in_target(original['path']):
+                to_delete.append(item)
+                print(f"  [将删除] {item['path']} ({item['size']} bytes) = {original['name']}")
+            else:
+                cross_collection.append((item, original))
+                print(f"  [重复-不删除] {item['path']} = {original['path']}")
+
+    # 目标文件夹中带副本标记但内容不同的文件保留
+    grouped_paths = {path for paths in groups.values() for path in paths}
+    to_keep_different_content = [
+        item for item in files_info
+        if item['is_copy'] and in_target(item['path']) and item['path'] not in grouped_paths
+    ]
+    for item in to_keep_different_content:
+        print(f"  [保留-内容不同] {item['name']} ({item['size']} bytes)")
 
     # 统计
     print("\n" + "=" * 80)
@@ -75,7 +124,8 @@ def main():
     print("=" * 80)
     print(f"总文件数: {len(files_info)}")
     print(f"需要删除的副本: {len(to_delete)} 个")
-    print(f"大小不同需保留的副本: {len(to_keep_different_size)} 个")
+    print(f"内容不同需保留的副本: {len(to_keep_different_content)} 个")
+    print(f"未删除的重复文件（仅报告）: {len(cross_collection)} 个")
     print(f"删除后剩余: {len(files_info) - len(to_delete)} 个")
 
     # 确认删除
@@ -106,18 +156,24 @@ def main():
         f.write(f"清理时间: {os.popen('date /t').read().strip()}\n\n")
         f.write(f"原始文件数: {len(files_info)}\n")
         f.write(f"已删除副本: {len(to_delete)}\n")
-        f.write(f"保留的不同大小副本: {len(to_keep_different_size)}\n")
+        f.write(f"保留的内容不同副本: {len(to_keep_different_content)}\n")
+        f.write(f"未删除的重复文件: {len(cross_collection)}\n")
         f.write(f"最终文件数: {len(files_info) - len(to_delete)}\n\n")
 
         if to_delete:
             f.write("已删除的文件:\n")
             for i, file_info in enumerate(to_delete, 1):
-                f.write(f"  {i}. {file_info['name']} ({file_info['size']} bytes)\n")
+                f.write(f"  {i}. {file_info['path']} ({file_info['size']} bytes)\n")
+
+        if to_keep_different_content:
+            f.write("\n保留的内容不同副本:\n")
+            for i, file_info in enumerate(to_keep_different_content, 1):
+                f.write(f"  {i}. {file_info['path']} ({file_info['size']} bytes)\n")
 
-        if to_keep_different_size:
-            f.write("\n保留的不同大小副本:\n")
-            for i, file_info in enumerate(to_keep_different_size, 1):
-                f.write(f"  {i}. {file_info['name']} ({file_info['size']} bytes)\n")
+        if cross_collection:
+            f.write("\n未删除的重复文件:\n")
+            for i, (item, original) in enumerate(cross_collection, 1):
+                f.write(f"  {i}. {item['path']}\n     = {original['path']}\n")
 
     print(f"\n清理报告已保存到: {report_path}")
     print("\n" + "=" * 80)
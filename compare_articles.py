@@ -4,48 +4,46 @@
 对比新旧去重结果，找出差异
 """
 import os
-import re
+
+from article_catalog import (
+    CATALOG_PATH, open_catalog, sync_directory, snapshot_urls, urls_only_in,
+)
 
 # 配置路径
 OLD_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章"
 NEW_FREE_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章_免费文章"
 NEW_PAID_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章_收费文章"
+REPORT_PATH = r"D:\CursorWork\HumanDesignAI\文章对比报告.txt"
 
-def get_article_urls(directory):
-    """获取目录中所有文章的URL"""
-    urls = {}
-    for file in os.listdir(directory):
-        if file.endswith('.md'):
-            file_path = os.path.join(directory, file)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read(1000)
-                    url_match = re.search(r'source_url:\s*"([^"]+)"', content)
-                    title_match = re.search(r'title:\s*"([^"]+)"', content)
-                    if url_match:
-                        urls[url_match.group(1)] = {
-                            'title': title_match.group(1) if title_match else file,
-                            'file': file
-                        }
-            except:
-                pass
-    return urls
+# 目录库中的快照名称（find_paid_articles.py 分类时也会写入 NEW_SNAPSHOT）
+OLD_SNAPSHOT = 'old'
+NEW_SNAPSHOT = 'classified'
 
 def main():
     print("=" * 80)
     print("对比新旧去重结果")
     print("=" * 80)
 
-    print("\n正在读取文章信息...")
+    print("\n正在同步文章目录库（只读取有变化的文章）...")
+
+    conn = open_catalog(CATALOG_PATH)
+    for snapshot, directory, collection, paid in [
+        (OLD_SNAPSHOT, OLD_DIR, None, None),
+        (NEW_SNAPSHOT, NEW_FREE_DIR, '免费文章', False),
+        (NEW_SNAPSHOT, NEW_PAID_DIR, '收费文章', True),
+    ]:
+        stats = sync_directory(conn, snapshot, directory, collection, paid)
+        print(f"   {os.path.basename(directory)}: {stats['scanned']} 篇，"
+              f"更新 {stats['updated']} 篇（{stats['from_pack']} 篇取自文章包），移除 {stats['removed']} 篇")
 
     # 获取旧版文章（173篇）
-    old_urls = get_article_urls(OLD_DIR)
+    old_urls = snapshot_urls(conn, OLD_SNAPSHOT)
 
     # 获取新版免费文章（147篇）
-    new_free_urls = get_article_urls(NEW_FREE_DIR)
+    new_free_urls = snapshot_urls(conn, NEW_SNAPSHOT, paid=False)
 
     # 获取新版收费文章（25篇）
-    new_paid_urls = get_article_urls(NEW_PAID_DIR)
+    new_paid_urls = snapshot_urls(conn, NEW_SNAPSHOT, paid=True)
 
     # 合并新版所有文章
     new_all_urls = {**new_free_urls, **new_paid_urls}
@@ -56,10 +54,11 @@ def main():
     print(f"新版总计: {len(new_all_urls)} 篇")
 
     # 找出新增的文章（在新版中但不在旧版中）
-    new_articles = set(new_all_urls.keys()) - set(old_urls.keys())
+    new_articles = urls_only_in(conn, NEW_SNAPSHOT, OLD_SNAPSHOT)
 
     # 找出缺失的文章（在旧版中但不在新版中）
-    missing_articles = set(old_urls.keys()) - set(new_all_urls.keys())
+    missing_articles = urls_only_in(conn, OLD_SNAPSHOT, NEW_SNAPSHOT)
+    conn.close()
 
     print("\n" + "=" * 80)
     print("差异分析")
@@ -82,7 +81,7 @@ def main():
         print("\n✅ 两个版本的文章URL完全一致！")
 
     # 保存报告
-    report_path = r"D:\CursorWork\HumanDesignAI\文章对比报告.txt"
+    report_path = REPORT_PATH
     with open(report_path, 'w', encoding='utf-8') as f:
         f.write("王骁老师文章新旧版本对比报告\n")
         f.write("=" * 80 + "\n\n")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按文件内容分组查找重复文件
+流式分块计算 BLAKE2 摘要，先按文件大小过滤，只对大小相同的候选文件计算摘要
+"""
+import os
+import hashlib
+from collections import defaultdict
+
+# 每次读取的块大小
+CHUNK_SIZE = 1024 * 1024
+
+def hash_file(file_path, chunk_size=CHUNK_SIZE):
+    """按固定大小分块计算文件的 BLAKE2b 摘要（不会把整个文件读入内存）"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_bytes(data):
+    """对内存中的文件内容计算摘要，与 hash_file 对同一文件的结果相同"""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+def hash_file_normalized(file_path):
+    """
+    计算忽略行尾空白差异后的摘要：
+    每行去掉末尾的空格/制表符/\\r，统一换行符，并忽略文件末尾的空行
+    逐行流式读取，内存占用与单行长度相关
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    pending_blank = 0
+    with open(file_path, 'rb') as f:
+        for line in f:
+            line = line.rstrip(b' \t\r\n')
+            if not line:
+                pending_blank += 1
+                continue
+            if pending_blank:
+                digest.update(b'\n' * pending_blank)
+                pending_blank = 0
+            digest.update(line)
+            digest.update(b'\n')
+    return digest.hexdigest()
+
+def iter_files(root_dirs, extensions=('.md',), exclude_dirs=()):
+    """递归遍历多个目录，返回 (路径, 大小)；exclude_dirs 中的目录名（任意层级）不进入"""
+    for root_dir in root_dirs:
+        for root, dirs, files in os.walk(root_dir):
+            dirs[:] = sorted(d for d in dirs if d not in exclude_dirs)
+            for file in sorted(files):
+                if extensions and not file.endswith(extensions):
+                    continue
+                file_path = os.path.join(root, file)
+                try:
+                    yield file_path, os.path.getsize(file_path)
+                except OSError as e:
+                    print(f"  无法读取文件大小: {file_path} - {e}")
+
+def find_duplicate_groups(files, normalize=False, unsized=None):
+    """
+    查找内容相同的文件组
+
+    files: 可迭代的 (路径, 大小)
+    normalize: 为 True 时忽略行尾空白差异（此时大小不同也可能相同）
+    unsized: normalize 时大小唯一也要计算摘要的路径集合，None 表示全部文件；
+             其余大小唯一的文件不读取（只有行尾空白不同的重复会漏掉）
+
+    返回 {摘要: [路径, ...]}，只包含两个及以上文件的组，组内保持输入顺序
+    """
+    ordered = list(files)
+    size_counts = defaultdict(int)
+    for file_path, size in ordered:
+        size_counts[size] += 1
+
+    # 不忽略空白时，大小唯一的文件不可能有重复，直接跳过，不必读取
+    if normalize:
+        candidates = [
+            path for path, size in ordered
+            if size_counts[size] > 1 or unsized is None or path in unsized
+        ]
+        hasher = hash_file_normalized
+    else:
+        candidates = [path for path, size in ordered if size_counts[size] > 1]
+        hasher = hash_file
+
+    by_digest = defaultdict(list)
+    for file_path in candidates:
+        try:
+            by_digest[hasher(file_path)].append(file_path)
+        except OSError as e:
+            print(f"  无法读取文件: {file_path} - {e}")
+
+    return {digest: paths for digest, paths in by_digest.items() if len(paths) > 1}
@@ -6,6 +6,9 @@
 
 import json
 
+from stage_metrics import instrument, span
+
+@instrument('read')
 def load_data():
     """加载通道和闸门-中心映射数据"""
 
@@ -28,6 +31,7 @@ def load_data():
 
     return channels, gate_to_center
 
+@instrument('build')
 def create_center_connections(channels, gate_to_center):
     """
     创建中心连接关系表
@@ -175,14 +179,15 @@ def main():
     # 保存数据
     output_dir = r'D:\CursorWork\HumanDesignAI\data'
 
-    # 保存按中心连接分组的数据
-    with open(f'{output_dir}\\center_connections.json', 'w', encoding='utf-8') as f:
-        json.dump(center_connections, f, ensure_ascii=False, indent=2)
-    print(f"\n[OK] 中心连接分组数据已保存到: {output_dir}\\center_connections.json")
+    with span('write', files=2):
+        # 保存按中心连接分组的数据
+        with open(f'{output_dir}\\center_connections.json', 'w', encoding='utf-8') as f:
+            json.dump(center_connections, f, ensure_ascii=False, indent=2)
+        print(f"\n[OK] 中心连接分组数据已保存到: {output_dir}\\center_connections.json")
 
-    # 保存扁平化的通道数据（包含中心信息）
-    with open(f'{output_dir}\\channels_with_centers.json', 'w', encoding='utf-8') as f:
-        json.dump(channels_with_centers, f, ensure_ascii=False, indent=2)
+        # 保存扁平化的通道数据（包含中心信息）
+        with open(f'{output_dir}\\channels_with_centers.json', 'w', encoding='utf-8') as f:
+            json.dump(channels_with_centers, f, ensure_ascii=False, indent=2)
     print(f"[OK] 通道详细数据已保存到: {output_dir}\\channels_with_centers.json")
 
     # 分析连接关系
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+人类图轮回交叉全书.txt 的逐行解析
+书中每个交叉的格式为：
+
+    右角度交叉之方向（人面狮身）2
+    Direction（The Sphinx）2——2/1/13/7
+
+即 中文名行 → 英文名行 → "——门/门/门/门"（门通常与英文名在同一行，也允许单独一行；
+行之间可以有空行）。这里用一个小状态机逐行读取，边读边产出交叉记录，内存占用与书的大小无关，
+每条记录带行号，便于对照原书排查
+
+各提取/调试脚本都用 iter_crosses() 读取，不再各自整本读入后用多行正则匹配
+
+以前各脚本正则的差异（英文名必须大写开头、末尾编号必须有、只认角度交叉、破折号写法）
+整理成 PROFILES 中的命名规则集；match_profiles() 只读一遍书就得到每个规则集的结果，
+compare_profiles() 列出各规则集与基准规则集的差别
+
+    python cross_book.py [书的路径]      # 对比所有规则集
+"""
+import re
+import sys
+from collections import namedtuple, Counter
+
+BOOK_PATH = r'D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\人类图轮回交叉全书.txt'
+
+# 交叉类型（中文名的前缀）
+CROSS_TYPES = ('右角度', '左角度', '并列')
+ANGLE_TYPES = ('右角度', '左角度')
+
+# 英文名与门之间的破折号写法
+STANDARD_DASHES = ('——',)
+DASH_VARIANTS = ('——', '—', '――', '－－', '--', '─—')
+
+# name: 规则集名，types: 接受的交叉类型，english_pattern: 英文名须匹配的正则（None 为不限），
+# number_required: 英文名末尾必须带编号，dashes: 接受的破折号写法，description: 说明
+Profile = namedtuple('Profile', ['name', 'types', 'english_pattern', 'number_required', 'dashes', 'description'])
+
+PROFILES = {
+    'strict': Profile('strict', ANGLE_TYPES, r'[A-Z]', True, STANDARD_DASHES,
+                      'extract_crosses.py 的规则：只认角度交叉，英文名大写开头且带编号'),
+    'uppercase': Profile('uppercase', ANGLE_TYPES, r'[A-Z]', False, STANDARD_DASHES,
+                         '早期 extract_crosses_final.py 的规则：只认角度交叉，英文名大写开头'),
+    'angles': Profile('angles', ANGLE_TYPES, None, False, STANDARD_DASHES,
+                      'extract_crosses_final.py：只认角度交叉，英文名不限'),
+    'default': Profile('default', CROSS_TYPES, None, False, STANDARD_DASHES,
+                       'extract_crosses_corrected.py / extract_crosses_complete.py：三种交叉，英文名不限'),
+    'dashes': Profile('dashes', CROSS_TYPES, None, False, DASH_VARIANTS,
+                      '在 default 基础上接受各种破折号写法'),
+}
+
+DEFAULT_PROFILE = 'default'
+
+# line_no: 中文名所在行，gates_line_no: 门所在行，
+# chinese_raw / english_raw: 原文（去掉首尾空白），chinese_name / english_name: 去掉末尾编号后的名称，
+# number: 末尾编号（没有时为 None），english_number: 英文名末尾的编号，type: 右角度/左角度/并列，
+# gates: (个性太阳, 个性地球, 设计太阳, 设计地球)，key: "a-b-c-d"，dash: 门前的破折号
+CrossRecord = namedtuple('CrossRecord', [
+    'line_no', 'gates_line_no', 'chinese_raw', 'english_raw', 'chinese_name', 'english_name',
+    'number', 'english_number', 'type', 'gates', 'key', 'dash'
+])
+
+_HEADER_RE = re.compile(r'^(?:右角度|左角度|并列)交叉之')
+_TRAILING_NUMBER_RE = re.compile(r'\s*(\d+)\s*$')
+_gates_res = {}
+
+def _gates_re(dashes):
+    """门的正则（按破折号写法编译一次；长的写法在前，"——" 不会被当成 "—"）"""
+    pattern = _gates_res.get(dashes)
+    if pattern is None:
+        alternatives = '|'.join(re.escape(d) for d in sorted(dashes, key=len, reverse=True))
+        pattern = _gates_res[dashes] = re.compile(rf'({alternatives})\s*(\d+)/(\d+)/(\d+)/(\d+)')
+    return pattern
+
+# 状态
+_IDLE, _HEADER, _ENGLISH = range(3)
+
+def strip_number(name):
+    """去掉名称末尾的编号，返回 (名称, 编号或 None)"""
+    match = _TRAILING_NUMBER_RE.search(name)
+    if match is None:
+        return name.strip(), None
+    return name[:match.start()].strip(), int(match.group(1))
+
+def cross_type(chinese_name):
+    for t in CROSS_TYPES:
+        if chinese_name.startswith(t):
+            return t
+    return '未知'
+
+def _record(header_line_no, chinese_raw, english_raw, gates_line_no, match):
+    chinese_name, number = strip_number(chinese_raw)
+    english_name, english_number = strip_number(english_raw)
+    gate_texts = match.groups()[1:]
+    return CrossRecord(
+        line_no=header_line_no,
+        gates_line_no=gates_line_no,
+        chinese_raw=chinese_raw,
+        english_raw=english_raw,
+        chinese_name=chinese_name,
+        english_name=english_name,
+        number=number if number is not None else english_number,
+        english_number=english_number,
+        type=cross_type(chinese_name),
+        gates=tuple(int(g) for g in gate_texts),
+        key='-'.join(gate_texts),
+        dash=match.group(1)
+    )
+
+def parse_lines(lines, problems=None, dashes=STANDARD_DASHES):
+    """
+    从逐行文本中产出 CrossRecord（不做规则集筛选）
+    problems 为列表时，记录没有找到门的中文名行：(行号, 原文, 原因)
+    """
+    gates_re = _gates_re(tuple(dashes))
+    state = _IDLE
+    header = header_line_no = english = None
+    for line_no, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text:
+            continue
+
+        if _HEADER_RE.match(text):
+            if state != _IDLE and problems is not None:
+                problems.append((header_line_no, header, '下一个交叉之前没有找到门'))
+            state, header, header_line_no, english = _HEADER, text, line_no, None
+            continue
+
+        if state == _HEADER:
+            match = gates_re.search(text)
+            if match:
+                yield _record(header_line_no, header, text[:match.start()].strip(), line_no, match)
+                state = _IDLE
+            else:
+                english, state = text, _ENGLISH
+        elif state == _ENGLISH:
+            match = gates_re.match(text)
+            if match:
+                yield _record(header_line_no, header, english, line_no, match)
+            elif problems is not None:
+                problems.append((header_line_no, header, f'英文名之后不是门（第{line_no}行）'))
+            state = _IDLE
+
+    if state != _IDLE and problems is not None:
+        problems.append((header_line_no, header, '文件结束前没有找到门'))
+
+class _CompiledProfile:
+    """预编译的规则集"""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.types = frozenset(profile.types)
+        self.dashes = frozenset(profile.dashes)
+        self.english_re = re.compile(profile.english_pattern) if profile.english_pattern else None
+
+    def accepts(self, record):
+        if record.type not in self.types or record.dash not in self.dashes:
+            return False
+        if self.english_re is not None and not self.english_re.match(record.english_raw):
+            return False
+        return not self.profile.number_required or record.english_number is not None
+
+_compiled = {name: _CompiledProfile(profile) for name, profile in PROFILES.items()}
+
+def iter_crosses(file_path=BOOK_PATH, problems=None, profile=DEFAULT_PROFILE):
+    """逐行读取轮回交叉全书，产出符合规则集的 CrossRecord"""
+    compiled = _compiled[profile]
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        for record in parse_lines(f, problems, compiled.profile.dashes):
+            if compiled.accepts(record):
+                yield record
+
+def match_profiles(lines, names=None, problems=None):
+    """
+    一遍扫描，同时按多个规则集筛选：返回 {规则集名: [CrossRecord, ...]}
+    lines 为逐行文本（打开的文件或字符串列表），names 默认为全部规则集
+    """
+    names = list(names or PROFILES)
+    compiled = [(name, _compiled[name]) for name in names]
+    dashes = tuple(sorted({d for name, c in compiled for d in c.profile.dashes}))
+    results = {name: [] for name in names}
+    for record in parse_lines(lines, problems, dashes):
+        for name, c in compiled:
+            if c.accepts(record):
+                results[name].append(record)
+    return results
+
+def match_profiles_file(file_path=BOOK_PATH, names=None, problems=None):
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        return match_profiles(f, names, problems)
+
+def compare_profiles(results, baseline=DEFAULT_PROFILE):
+    """
+    各规则集与基准规则集的差别：{规则集名: {'extra': [基准中没有的记录], 'missing': [基准中有而它没有的记录]}}
+    记录按 (行号, key) 识别
+    """
+    base = {(r.line_no, r.key): r for r in results[baseline]}
+    diffs = {}
+    for name, records in results.items():
+        if name == baseline:
+            continue
+        found = {(r.line_no, r.key): r for r in records}
+        diffs[name] = {
+            'extra': [found[k] for k in sorted(found.keys() - base.keys())],
+            'missing': [base[k] for k in sorted(base.keys() - found.keys())],
+        }
+    return diffs
+
+def cross_data(record):
+    """转成各数据文件使用的格式"""
+    black_sun, black_earth, red_sun, red_earth = record.gates
+    return {
+        'chinese_name': record.chinese_name,
+        'english_name': record.english_name,
+        'type': record.type,
+        'gates': {
+            'black_sun': black_sun,
+            'black_earth': black_earth,
+            'red_sun': red_sun,
+            'red_earth': red_earth
+        },
+        'key': record.key
+    }
+
+def print_profile_report(results, baseline=DEFAULT_PROFILE, limit=10):
+    """打印各规则集的数量统计和与基准的差别"""
+    for name, records in results.items():
+        counts = Counter(r.type for r in records)
+        by_type = '，'.join(f"{t} {counts.get(t, 0)}" for t in CROSS_TYPES)
+        print(f"  [{name}] {len(records)} 个（{by_type}，不同key {len({r.key for r in records})} 个）")
+        print(f"      {PROFILES[name].description}")
+
+    if baseline not in results:
+        return
+    for name, diff in compare_profiles(results, baseline).items():
+        if not diff['extra'] and not diff['missing']:
+            print(f"\n{name} 与 {baseline} 结果相同")
+            continue
+        print(f"\n{name} 与 {baseline} 的差别：多 {len(diff['extra'])} 个，少 {len(diff['missing'])} 个")
+        for label, records in (('多', diff['extra']), ('少', diff['missing'])):
+            for r in records[:limit]:
+                print(f"  {label} 第{r.line_no}行 [{r.type}] {r.chinese_raw} | {r.english_raw} | {r.dash}{r.key}")
+            if len(records) > limit:
+                print(f"  ……另有 {len(records) - limit} 个")
+
+def main():
+    file_path = sys.argv[1] if len(sys.argv) > 1 else BOOK_PATH
+    print("=" * 60)
+    print("轮回交叉提取规则集对比")
+    print("=" * 60)
+
+    problems = []
+    results = match_profiles_file(file_path, problems=problems)
+    print(f"\n书: {file_path}\n")
+    print_profile_report(results)
+
+    if problems:
+        print(f"\n没有找到门的交叉标题: {len(problems)} 个")
+        for line_no, header, reason in problems[:20]:
+            print(f"  第{line_no}行 {header}：{reason}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+轮回交叉数据完整性检查
+把交叉数据一次读入 NumPy 数组（门为 N×4 的 int8 矩阵，类型为代码数组），所有检查都用数组运算完成：
+    总数为 192，三种交叉各 64 个
+    门都在 1~64 之间
+    地球闸门是太阳闸门的对宫（data/gate_opposites.json），个性和设计都检查
+    每个个性太阳闸门的右角度 / 并列 / 左角度各恰好一个（并列即 64 个闸门各一个）
+    同一类型中门组合 key 不重复
+    名称数：右角度 16 个名字各 4 个，左角度 32 个名字各 2 个，并列 64 个名字各 1 个
+        （只作为警告：书中同一交叉有时写法不同，如"四个方向（道路）"和"四方之路"，不影响按闸门查找）
+
+以前分散在 check_missing_juxtaposition.py、extract_crosses_corrected.generate_report()、
+find_triple_keys.py 中的检查都在这里，速度足够在每次重建数据时运行（build_cross_lookup.py 写出索引表前会调用）
+
+    python cross_integrity.py [交叉数据.json]
+"""
+import os
+import sys
+import json
+from collections import namedtuple
+
+import numpy as np
+
+# 数据目录
+DATA_DIR = r"D:\CursorWork\HumanDesignAI\data"
+CROSSES_PATH = os.path.join(DATA_DIR, "incarnation_crosses_complete.json")
+OPPOSITES_PATH = os.path.join(DATA_DIR, "gate_opposites.json")
+
+GATE_COUNT = 64
+
+# 类型代码（数组中的值为下标）
+TYPES = ('右角度', '并列', '左角度')
+
+# 每种类型应有的 (交叉数, 名字数)
+EXPECTED = {
+    '右角度': (64, 16),
+    '并列': (64, 64),
+    '左角度': (64, 32),
+}
+
+# 门的列：个性太阳、个性地球、设计太阳、设计地球
+GATE_FIELDS = ('black_sun', 'black_earth', 'red_sun', 'red_earth')
+
+# gates: N×4 int8，types: N 个类型代码（无法识别的类型为 -1），keys / names: 每条的 key 和中文名
+CrossTable = namedtuple('CrossTable', ['gates', 'types', 'keys', 'names'])
+
+# name: 检查名，ok: 是否通过，message: 一句话结果，details: 出错的条目
+Check = namedtuple('Check', ['name', 'ok', 'message', 'details'])
+
+def _record_gates(record):
+    """数据文件带 gates 字段；索引表中的交叉只有 key（门按同样顺序用 "-" 连接）"""
+    if 'gates' in record:
+        return [record['gates'][field] for field in GATE_FIELDS]
+    return [int(g) for g in record['key'].split('-')]
+
+def build_table(records):
+    """把交叉记录列表转成 CrossTable"""
+    type_codes = {t: i for i, t in enumerate(TYPES)}
+    gates = np.array([_record_gates(r) for r in records], dtype=np.int8).reshape(-1, 4)
+    types = np.array([type_codes.get(r['type'], -1) for r in records], dtype=np.int8)
+    keys = np.array([r['key'] for r in records], dtype=object)
+    names = np.array([r['chinese_name'] for r in records], dtype=object)
+    return CrossTable(gates, types, keys, names)
+
+def load_table(path=CROSSES_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return build_table(json.load(f))
+
+def load_opposites(path=OPPOSITES_PATH):
+    """对宫表：opposites[闸门] = 对宫闸门（下标 0 不用）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        pairs = json.load(f)
+    opposites = np.zeros(GATE_COUNT + 1, dtype=np.int8)
+    for pair in pairs:
+        opposites[pair['gate']] = pair['opposite_gate']
+    return opposites
+
+def _describe(table, rows):
+    return [f"[{TYPES[table.types[i]] if table.types[i] >= 0 else '未知'}] {table.names[i]} ({table.keys[i]})"
+            for i in rows]
+
+def check_counts(table):
+    counts = np.bincount(table.types[table.types >= 0], minlength=len(TYPES))
+    unknown = np.flatnonzero(table.types < 0)
+    details = [f"{t}: {counts[i]}/{EXPECTED[t][0]}" for i, t in enumerate(TYPES) if counts[i] != EXPECTED[t][0]]
+    details += [f"无法识别的类型: {name} ({key})" for name, key in zip(table.names[unknown], table.keys[unknown])]
+    total = sum(expected for expected, names in EXPECTED.values())
+    ok = not details and len(table.types) == total
+    summary = '，'.join(f"{t} {counts[i]}" for i, t in enumerate(TYPES))
+    return Check('类型数量', ok, f"共 {len(table.types)}/{total} 个（{summary}）", details)
+
+def check_gate_range(table):
+    bad = np.flatnonzero(((table.gates < 1) | (table.gates > GATE_COUNT)).any(axis=1))
+    return Check('闸门范围', not bad.size, f"{bad.size} 个交叉的门不在 1~{GATE_COUNT}", _describe(table, bad))
+
+def check_opposites(table, opposites):
+    """个性地球 = 个性太阳的对宫，设计地球 = 设计太阳的对宫"""
+    suns = np.clip(table.gates[:, [0, 2]], 0, GATE_COUNT)
+    bad = np.flatnonzero((opposites[suns] != table.gates[:, [1, 3]]).any(axis=1))
+    return Check('太阳/地球对宫', not bad.size, f"{bad.size} 个交叉的地球闸门不是太阳闸门的对宫",
+                 _describe(table, bad))
+
+def check_gate_angles(table):
+    """每个个性太阳闸门的每种角度恰好一个交叉（64×3 的计数矩阵应全为 1）"""
+    valid = (table.types >= 0) & (table.gates[:, 0] >= 1) & (table.gates[:, 0] <= GATE_COUNT)
+    slots = (table.gates[valid, 0].astype(np.int64) - 1) * len(TYPES) + table.types[valid]
+    counts = np.bincount(slots, minlength=GATE_COUNT * len(TYPES)).reshape(GATE_COUNT, len(TYPES))
+    details = []
+    for gate_index, type_code in np.argwhere(counts != 1):
+        count = counts[gate_index, type_code]
+        state = "缺失" if count == 0 else f"{count} 个"
+        details.append(f"{gate_index + 1}号闸门 {TYPES[type_code]}: {state}")
+    return Check('闸门×角度', not details, f"{len(details)} 个 闸门/角度 组合不是恰好一个交叉", details)
+
+def check_keys(table):
+    """同一类型中 key 不重复（key 与类型编码成一个整数后找重复）"""
+    gates = table.gates.astype(np.int64)
+    codes = (((table.types.astype(np.int64) * 128 + gates[:, 0]) * 128 + gates[:, 1]) * 128
+             + gates[:, 2]) * 128 + gates[:, 3]
+    _, inverse, counts = np.unique(codes, return_inverse=True, return_counts=True)
+    rows = np.flatnonzero(counts[inverse] > 1)
+    return Check('同类型key唯一', not rows.size, f"{np.count_nonzero(counts > 1)} 个 key 在同一类型中重复",
+                 _describe(table, rows))
+
+def check_names(table):
+    """每种类型的名字数和每个名字的交叉数"""
+    details = []
+    for i, t in enumerate(TYPES):
+        expected_count, expected_names = EXPECTED[t]
+        names, counts = np.unique(table.names[table.types == i].astype(str), return_counts=True)
+        per_name = expected_count // expected_names
+        if len(names) != expected_names:
+            details.append(f"{t}: {len(names)}/{expected_names} 个名字")
+        details += [f"{t} {name}: {count}/{per_name}" for name, count in zip(names, counts) if count != per_name]
+    return Check('名称数', not details, f"{len(details)} 处名称数不对", details)
+
+def check_table(table, opposites):
+    """
+    运行全部检查，返回报告 {'total': 交叉数, 'ok': 是否全部通过, 'checks': [Check, ...], 'warnings': [Check, ...]}
+    warnings 中的检查不影响 ok
+    """
+    checks = [
+        check_counts(table),
+        check_gate_range(table),
+        check_opposites(table, opposites),
+        check_gate_angles(table),
+        check_keys(table),
+    ]
+    warnings = [check_names(table)]
+    return {'total': len(table.types), 'ok': all(c.ok for c in checks), 'checks': checks, 'warnings': warnings}
+
+def validate(path=CROSSES_PATH, opposites_path=OPPOSITES_PATH):
+    return check_table(load_table(path), load_opposites(opposites_path))
+
+def print_report(report, limit=20):
+    for check, failed in [(c, 'FAIL') for c in report['checks']] + [(c, 'WARN') for c in report['warnings']]:
+        print(f"  [{'OK' if check.ok else failed}] {check.name}: {check.message}")
+        for detail in check.details[:limit]:
+            print(f"      {detail}")
+        if len(check.details) > limit:
+            print(f"      ……另有 {len(check.details) - limit} 处")
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else CROSSES_PATH
+    print("=" * 60)
+    print("轮回交叉数据完整性检查")
+    print("=" * 60)
+    print(f"\n数据: {path}\n")
+
+    report = validate(path, OPPOSITES_PATH)
+    print_report(report)
+    print(f"\n{'全部通过' if report['ok'] else '有检查未通过'}")
+    if not report['ok']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
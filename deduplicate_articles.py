@@ -5,35 +5,139 @@
 按 source_url 去重，保留每个独立URL的一篇文章
 """
 import os
-import re
-import shutil
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, Counter
+
+from article_manifest import (
+    iter_markdown_files, load_manifest, save_manifest, lookup_metadata,
+    record_metadata, prune_missing, output_is_current, record_output, lookup_minhash, record_minhash,
+)
+from article_catalog import CATALOG_PATH, open_catalog, upsert_articles
+from article_frontmatter import read_frontmatter
+from materialize import materialize, resolve_mode
+from parallel_scan import parallel_map
+from stage_metrics import span
+from near_duplicates import (
+    NGRAM, NUM_PERM, article_signature, signature_from_text, cluster_signatures, write_cluster_report,
+)
 
 # 配置路径
 SOURCE_DIR = r"C:\Users\杜富陶\Downloads\下载文章"
 OUTPUT_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章_去重后"
 
-def extract_metadata(file_path):
-    """从Markdown文件中提取元数据"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+# 增量模式：用清单记录每个文件的 大小+修改时间 和提取结果，
+# 未变化的文件不再打开，未变化的输出不再复制。设为 False 则全量重跑
+INCREMENTAL = True
+MANIFEST_PATH = os.path.join(OUTPUT_DIR, ".去重清单.json")
 
-        # 提取 source_url
-        url_match = re.search(r'source_url:\s*"([^"]+)"', content)
-        title_match = re.search(r'title:\s*"([^"]+)"', content)
+# 输出文件的生成方式：'copy' 复制 / 'hardlink' 硬链接 / 'reflink' 写时复制克隆
+# 硬链接与源文件共用数据（修改输出会同时修改下载目录中的原文），不支持时自动退回复制
+# 硬链接和 reflink 只在 SOURCE_DIR 与 OUTPUT_DIR 在同一个卷上时有效（默认配置一个在 C 盘、一个在 D 盘，
+# 实际会按复制处理，运行时会提示）
+MATERIALIZE_MODE = 'hardlink'
 
+# 把去重结果写入文章目录库（快照名 CATALOG_SNAPSHOT），供 compare_articles.py 等查询
+UPDATE_CATALOG = True
+CATALOG_SNAPSHOT = 'dedup'
+
+# 近似重复检测：URL不同但内容几乎相同的转载文章，只生成报告，不删除
+# 每篇文章的 MinHash 签名保存在增量清单中，只有新增或修改的文章需要读取正文
+NEAR_DUPLICATE_CHECK = True
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+def extract_metadata(file_path):
+    """从Markdown文件的 YAML 头中提取元数据（只读取头部，不读正文）"""
+    try:
+        header = read_frontmatter(file_path)
         return {
-            'source_url': url_match.group(1) if url_match else None,
-            'title': title_match.group(1) if title_match else None,
-            'content': content
+            'source_url': header.source_url,
+            'title': header.title
         }
     except Exception as e:
         print(f"❌ 读取文件失败: {file_path}")
         print(f"   错误: {e}")
         return None
 
+def copy_article(article, manifest, mode=MATERIALIZE_MODE):
+    """
+    把一篇去重后的文章生成到输出目录（按 mode 复制或链接）
+    返回 (结果, 实际使用的方式)，结果为 'copied'（已生成）、'unchanged'（输出已是最新，跳过）或 'failed'
+    """
+    source_path = article['file_path']
+    dest_path = os.path.join(OUTPUT_DIR, article['file_name'])
+
+    if INCREMENTAL and output_is_current(manifest, dest_path, source_path, article['stat']):
+        return 'unchanged', None
+
+    try:
+        used_mode = materialize(source_path, dest_path, mode)
+    except Exception as e:
+        print(f"❌ 复制失败: {article['file_name']}")
+        print(f"   错误: {e}")
+        return 'failed', None
+
+    record_output(manifest, dest_path, source_path, article['stat'])
+    return 'copied', used_mode
+
+def near_duplicate_signatures(articles, manifest):
+    """
+    返回 [(文件路径, 签名), ...] 和新计算的文章数
+    清单中有未变化文件的签名时直接使用，其余文章并行读取正文计算，并记入清单
+    """
+    params = (NGRAM, NUM_PERM)
+    texts = {}
+    to_compute = []
+    for article in articles:
+        cached = lookup_minhash(manifest, article['file_path'], article['stat'], params)
+        if cached is None:
+            to_compute.append(article)
+        else:
+            texts[article['file_path']] = cached
+
+    computed = parallel_map(article_signature, [a['file_path'] for a in to_compute])
+    for article, text in zip(to_compute, computed):
+        if text is None:
+            continue
+        texts[article['file_path']] = text
+        record_minhash(manifest, article['file_path'], article['stat'], params, text)
+
+    signatures = [
+        (a['file_path'], signature_from_text(texts[a['file_path']]))
+        for a in articles if a['file_path'] in texts
+    ]
+    return signatures, len(to_compute)
+
+def format_mode_counts(mode_counts):
+    """{'hardlink': 10, 'copy': 2} -> 'hardlink 10 篇，copy 2 篇'"""
+    return '，'.join(f"{mode} {count} 篇" for mode, count in mode_counts.most_common())
+
+def update_catalog(articles):
+    """把去重后保留的文章写入目录库（元数据已提取，不再读取文件）"""
+    records = []
+    for article in articles:
+        dest_path = os.path.join(OUTPUT_DIR, article['file_name'])
+        try:
+            st = os.stat(dest_path)
+        except OSError:
+            continue
+        records.append({
+            'path': dest_path,
+            'collection': article['collection'],
+            'source_url': article['metadata']['source_url'],
+            'title': article['metadata']['title'],
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns
+        })
+
+    conn = open_catalog(CATALOG_PATH)
+    try:
+        with conn:
+            conn.execute("DELETE FROM articles WHERE snapshot = ?", (CATALOG_SNAPSHOT,))
+        upsert_articles(conn, CATALOG_SNAPSHOT, records)
+    finally:
+        conn.close()
+    print(f"   已写入文章目录库: {CATALOG_PATH}（快照 {CATALOG_SNAPSHOT}，{len(records)} 篇）")
+
 def main():
     print("=" * 80)
     print("开始去重王骁老师文章")
@@ -42,45 +146,73 @@ def main():
     # 创建输出目录
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+    # 读取增量清单
+    manifest = load_manifest(MANIFEST_PATH if INCREMENTAL else None)
+
     # 存储文章信息
     url_to_article = {}  # URL -> 文章信息
     no_url_articles = []  # 没有URL的文章
     total_files = 0
+    seen_paths = set()
 
     # 遍历所有王骁老师的文章
     print("\n正在扫描文章...")
-    for root, dirs, files in os.walk(SOURCE_DIR):
-        for file in files:
-            if file.endswith('.md') and file != 'README.md':
-                total_files += 1
-                file_path = os.path.join(root, file)
-                collection = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
-
-                # 只处理王骁老师的文章
-                if not collection.startswith('王骁老师'):
-                    continue
-
-                metadata = extract_metadata(file_path)
-                if not metadata:
-                    continue
-
-                article_info = {
-                    'file_path': file_path,
-                    'file_name': file,
-                    'collection': collection,
-                    'metadata': metadata
-                }
-
-                # 按URL分类
-                if metadata['source_url']:
-                    url = metadata['source_url']
-                    if url not in url_to_article:
-                        url_to_article[url] = article_info
-                    # else: 如果URL已存在，跳过（保留第一个）
-                else:
-                    no_url_articles.append(article_info)
-
-    print(f"   扫描完成！共找到 {total_files} 个文件")
+    candidates = []  # (文件路径, 文件名, 文集, stat)，保持遍历顺序
+    with span('scan') as s:
+        for file_path, file, stat_result in iter_markdown_files(SOURCE_DIR):
+            total_files += 1
+            collection = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
+
+            # 只处理王骁老师的文章
+            if not collection.startswith('王骁老师'):
+                continue
+
+            seen_paths.add(file_path)
+            candidates.append((file_path, file, collection, stat_result))
+        s.add(files=total_files)
+
+    # 清单中没有或已变化的文件，并行提取元数据
+    cached = {}
+    to_extract = []
+    for file_path, file, collection, stat_result in candidates:
+        metadata = lookup_metadata(manifest, file_path, stat_result)
+        if metadata is not None:
+            cached[file_path] = metadata
+        else:
+            to_extract.append(file_path)
+    cached_files = len(cached)
+
+    with span('parse', files=len(to_extract)):
+        extracted = dict(zip(to_extract, parallel_map(extract_metadata, to_extract)))
+
+    # 按遍历顺序合并结果，保证"保留第一个URL"的结果与单进程一致
+    for file_path, file, collection, stat_result in candidates:
+        if file_path in cached:
+            metadata = cached[file_path]
+        else:
+            metadata = extracted[file_path]
+            if not metadata:
+                continue
+            record_metadata(manifest, file_path, stat_result, metadata)
+
+        article_info = {
+            'file_path': file_path,
+            'file_name': file,
+            'collection': collection,
+            'stat': stat_result,
+            'metadata': metadata
+        }
+
+        # 按URL分类
+        if metadata['source_url']:
+            url = metadata['source_url']
+            if url not in url_to_article:
+                url_to_article[url] = article_info
+            # else: 如果URL已存在，跳过（保留第一个）
+        else:
+            no_url_articles.append(article_info)
+
+    print(f"   扫描完成！共找到 {total_files} 个文件（{cached_files} 个未变化，直接使用清单）")
 
     # 统计信息
     print("\n" + "=" * 80)
@@ -94,45 +226,49 @@ def main():
 
     # 复制去重后的文章
     print("\n" + "=" * 80)
-    print("正在复制去重后的文章...")
+    mode = resolve_mode(SOURCE_DIR, OUTPUT_DIR, MATERIALIZE_MODE)
+    print(f"正在生成去重后的文章（方式: {mode}）...")
     print("=" * 80)
+    if mode != MATERIALIZE_MODE:
+        print(f"⚠️  源目录和输出目录不在同一个卷上，无法使用 {MATERIALIZE_MODE}，改为复制")
 
     copied_count = 0
+    unchanged_count = 0
+    mode_counts = Counter()
 
-    # 复制有URL的文章
-    for url, article in url_to_article.items():
-        source_path = article['file_path']
-        dest_path = os.path.join(OUTPUT_DIR, article['file_name'])
+    # 复制有URL的文章，再复制没有URL的文章
+    with span('write') as s:
+        for article in list(url_to_article.values()) + no_url_articles:
+            result, used_mode = copy_article(article, manifest, mode)
+            if result == 'copied':
+                copied_count += 1
+                mode_counts[used_mode] += 1
+                s.add(files=1, bytes_written=article['stat'].st_size)
+                if copied_count % 50 == 0:
+                    print(f"   已复制 {copied_count} 篇...")
+            elif result == 'unchanged':
+                unchanged_count += 1
 
-        try:
-            shutil.copy2(source_path, dest_path)
-            copied_count += 1
-            if copied_count % 50 == 0:
-                print(f"   已复制 {copied_count} 篇...")
-        except Exception as e:
-            print(f"❌ 复制失败: {article['file_name']}")
-            print(f"   错误: {e}")
-
-    # 复制没有URL的文章
-    for article in no_url_articles:
-        source_path = article['file_path']
-        dest_path = os.path.join(OUTPUT_DIR, article['file_name'])
+    if INCREMENTAL:
+        removed = prune_missing(manifest, seen_paths)
+        save_manifest(MANIFEST_PATH, manifest)
+        if removed:
+            print(f"   清单中移除了 {removed} 个已不存在的文件")
 
-        try:
-            shutil.copy2(source_path, dest_path)
-            copied_count += 1
-        except Exception as e:
-            print(f"❌ 复制失败: {article['file_name']}")
-            print(f"   错误: {e}")
+    print(f"   复制完成！新复制 {copied_count} 篇，{unchanged_count} 篇未变化已跳过")
+    if mode_counts:
+        print(f"   实际方式: {format_mode_counts(mode_counts)}")
+    kept_count = copied_count + unchanged_count
 
-    print(f"   复制完成！共复制 {copied_count} 篇文章")
+    if UPDATE_CATALOG:
+        update_catalog(list(url_to_article.values()) + no_url_articles)
 
     # 生成去重报告
     print("\n" + "=" * 80)
     print("去重完成！")
     print("=" * 80)
     print(f"输出目录: {OUTPUT_DIR}")
-    print(f"文章总数: {copied_count} 篇")
+    print(f"文章总数: {kept_count} 篇")
 
     # 保存去重报告
     report_path = os.path.join(OUTPUT_DIR, "去重报告.txt")
@@ -142,10 +278,37 @@ def main():
         f.write(f"原始文章总数: {total_files}\n")
         f.write(f"独立URL数量: {len(url_to_article)}\n")
         f.write(f"没有URL的文章: {len(no_url_articles)}\n")
-        f.write(f"去重后保留: {copied_count} 篇\n")
-        f.write(f"去除重复: {total_files - copied_count} 篇\n")
+        f.write(f"去重后保留: {kept_count} 篇\n")
+        f.write(f"去除重复: {total_files - kept_count} 篇\n")
+        f.write(f"本次新复制: {copied_count} 篇\n")
+        if mode_counts:
+            f.write(f"生成方式: {format_mode_counts(mode_counts)}\n")
 
     print(f"\n报告已保存到: {report_path}")
 
+    # 近似重复检测
+    if NEAR_DUPLICATE_CHECK:
+        print("\n" + "=" * 80)
+        print("正在检测近似重复文章（URL不同但内容相近）...")
+        print("=" * 80)
+
+        kept_articles = list(url_to_article.values()) + no_url_articles
+        titles = {
+            article['file_path']: article['metadata']['title'] or article['file_name']
+            for article in kept_articles
+        }
+        with span('near_duplicates', files=len(kept_articles)):
+            signatures, computed_count = near_duplicate_signatures(kept_articles, manifest)
+            clusters = cluster_signatures(signatures, threshold=NEAR_DUPLICATE_THRESHOLD)
+        if INCREMENTAL and computed_count:
+            save_manifest(MANIFEST_PATH, manifest)
+        print(f"   {len(kept_articles) - computed_count} 篇使用清单中的签名，{computed_count} 篇重新计算")
+        near_report_path = os.path.join(OUTPUT_DIR, "近似重复报告.txt")
+        write_cluster_report(near_report_path, clusters, titles, NEAR_DUPLICATE_THRESHOLD)
+
+        print(f"   发现 {len(clusters)} 个近似重复簇，"
+              f"涉及 {sum(len(c['members']) for c in clusters)} 篇文章")
+        print(f"   报告已保存到: {near_report_path}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+免费文章分段（上传 Dify 知识库用）
+在 find_paid_articles.py 之后运行：按标题和段落边界把文章切成不超过 MAX_TOKENS 的分段，
+相邻分段重叠 OVERLAP_TOKENS，每个分段都带上文章的 title / source_url，
+输出为 JSONL 分片文件，可直接批量上传，Dify 不必在服务器端重新分段
+
+文章逐行读取，每篇只在内存中保留当前分段；分段结果按文章内容摘要缓存，
+重跑时只有内容变化的文章才会重新分段。
+文章在文章包（article_pack.py）中未变化时用包中记录的摘要查缓存、从包中逐块解压读取正文，不打开原文件
+"""
+import os
+import re
+import json
+import hashlib
+
+from article_frontmatter import read_frontmatter_from
+from article_manifest import file_signature
+from article_pack import PACK_PATH, open_pack, packed_entry, open_article_text
+from content_hash import hash_file
+from parallel_scan import parallel_map
+
+# 配置路径
+ARTICLES_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章_免费文章"
+OUTPUT_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章_Dify分段"
+
+# 分段长度和重叠（与 Dify操作手册 中王骁老师文章的分段配置一致）
+MAX_TOKENS = 800
+OVERLAP_TOKENS = 100
+
+# 每个 JSONL 分片最多包含的分段数
+SHARD_CHUNKS = 2000
+SHARD_PREFIX = "dify_chunks_"
+
+# 分段缓存：每篇文章的分段结果（<摘要>.jsonl）和 路径 -> [签名, 摘要] 索引
+# 缓存按内容摘要存放，内容相同的文章共用一份，所以只保存与文件无关的部分（YAML 头中的标题/链接、
+# 小节标题、序号、token 数、正文）；文件名、分段 id 和没有标题时用文件名代替的标题在写分片时加上
+CACHE_DIR = os.path.join(OUTPUT_DIR, ".分段缓存")
+CACHE_INDEX_PATH = os.path.join(CACHE_DIR, "索引.json")
+
+# 分段规则或缓存格式变化时加一，使所有缓存失效
+CHUNKER_VERSION = 2
+
+# 汉字每个字算一个 token，英文/数字每个词算一个，其他非空白字符各算一个
+_TOKEN_RE = re.compile(r'[\u4e00-\u9fff]|[A-Za-z0-9]+|\S')
+_HEADING_RE = re.compile(r'^#{1,6}\s+\S')
+_SENTENCE_RE = re.compile(r'[^。！？!?；;]+[。！？!?；;]*|[。！？!?；;]+')
+
+def count_tokens(text):
+    return len(_TOKEN_RE.findall(text))
+
+def _split_long(text, max_tokens):
+    """超过 max_tokens 的段落先按句子切开，单句仍然过长时按字数硬切"""
+    pieces = []
+    current, size = [], 0
+    for sentence in _SENTENCE_RE.findall(text):
+        tokens = count_tokens(sentence)
+        if tokens > max_tokens:
+            # 每个 token 至少占一个字符，按 max_tokens 个字符切不会超长
+            for i in range(0, len(sentence), max_tokens):
+                part = sentence[i:i + max_tokens]
+                pieces.append((part, count_tokens(part)))
+            continue
+        if current and size + tokens > max_tokens:
+            pieces.append((''.join(current), size))
+            current, size = [], 0
+        current.append(sentence)
+        size += tokens
+    if current:
+        pieces.append((''.join(current), size))
+    return pieces
+
+def iter_blocks(lines, max_tokens=MAX_TOKENS):
+    """
+    把正文各行合并成块：('heading', 标题行) 或 ('paragraph', 段落)
+    空行分段；单个段落累计超过 max_tokens 时提前输出，保证内存占用有上限
+    """
+    paragraph, size = [], 0
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or _HEADING_RE.match(stripped):
+            if paragraph:
+                yield 'paragraph', '\n'.join(paragraph)
+                paragraph, size = [], 0
+            if stripped:
+                yield 'heading', stripped
+            continue
+        paragraph.append(stripped)
+        size += count_tokens(stripped)
+        if size > max_tokens:
+            yield 'paragraph', '\n'.join(paragraph)
+            paragraph, size = [], 0
+    if paragraph:
+        yield 'paragraph', '\n'.join(paragraph)
+
+def _overlap_tail(units, overlap_tokens):
+    """从当前分段末尾取不超过 overlap_tokens 的内容（整段或段落末尾的几句）作为下一段的开头"""
+    tail, size = [], 0
+    for text, tokens in reversed(units):
+        if size + tokens <= overlap_tokens:
+            tail.insert(0, (text, tokens))
+            size += tokens
+            continue
+        sentences = _SENTENCE_RE.findall(text)
+        picked = []
+        for sentence in reversed(sentences):
+            tokens = count_tokens(sentence)
+            if size + tokens > overlap_tokens:
+                break
+            picked.insert(0, sentence)
+            size += tokens
+        if picked:
+            part = ''.join(picked)
+            tail.insert(0, (part, count_tokens(part)))
+        break
+    return tail
+
+def iter_chunks(blocks, max_tokens=MAX_TOKENS, overlap_tokens=OVERLAP_TOKENS):
+    """
+    把块组合成分段，产出 (所在小节标题, 分段文字, token 数)
+    遇到标题另起一段（不与上一小节重叠），段落之间按 overlap_tokens 重叠
+    """
+    heading = None
+    units, size, fresh = [], 0, 0
+
+    for kind, text in blocks:
+        if kind == 'heading':
+            if fresh:
+                yield heading, '\n\n'.join(t for t, n in units), size
+            heading = text.lstrip('#').strip()
+            tokens = count_tokens(text)
+            units, size, fresh = [(text, tokens)], tokens, 0
+            continue
+
+        tokens = count_tokens(text)
+        pieces = _split_long(text, max_tokens) if tokens > max_tokens else [(text, tokens)]
+        for piece, tokens in pieces:
+            if size + tokens > max_tokens:
+                if fresh:
+                    yield heading, '\n\n'.join(t for t, n in units), size
+                    units = _overlap_tail(units, overlap_tokens)
+                    size, fresh = sum(n for t, n in units), 0
+                # 重叠部分（或小节标题）加上新段落仍然超长时放弃重叠
+                if size + tokens > max_tokens:
+                    units, size = [], 0
+            units.append((piece, tokens))
+            size += tokens
+            fresh += 1
+
+    if fresh:
+        yield heading, '\n\n'.join(t for t, n in units), size
+
+def _format_chunk(title, source_url, text):
+    """分段正文前加上文章的 YAML 头，上传后每个分段都能看出出处"""
+    header = ['---', f'title: {json.dumps(title, ensure_ascii=False)}']
+    if source_url:
+        header.append(f'source_url: {json.dumps(source_url, ensure_ascii=False)}')
+    header.append('---')
+    return '\n'.join(header) + '\n' + text
+
+def cache_key(content_hash):
+    """分段缓存的键：文章内容摘要 + 分段配置"""
+    settings = f"{content_hash}/{MAX_TOKENS}/{OVERLAP_TOKENS}/{CHUNKER_VERSION}"
+    return hashlib.blake2b(settings.encode('ascii'), digest_size=20).hexdigest()
+
+def chunk_article(item):
+    """
+    对一篇文章分段并写入缓存文件（在子进程中运行），内容没变时直接复用缓存
+    item 为 (路径, 文章包路径, 包中的条目或 None)；有条目时摘要取自包的索引，需要分段时从包中逐块解压正文
+    返回 {'key', 'chunks', 'cached'} 或 {'error'}
+    """
+    file_path, pack_path, entry = item
+    try:
+        key = cache_key(entry['content_hash'] if entry else hash_file(file_path))
+        cache_path = os.path.join(CACHE_DIR, key + '.jsonl')
+        if os.path.exists(cache_path):
+            return {'key': key, 'chunks': None, 'cached': True}
+
+        with open_article_text(file_path, entry, pack_path, 'utf-8-sig') as f:
+            header = read_frontmatter_from(f)
+
+        tmp_path = cache_path + f'.{os.getpid()}.tmp'
+        count = 0
+        with open_article_text(file_path, entry, pack_path, 'utf-8-sig') as f, \
+                open(tmp_path, 'w', encoding='utf-8') as out:
+            f.read(header.body_offset)
+            for heading, text, tokens in iter_chunks(iter_blocks(f)):
+                out.write(json.dumps({
+                    'title': header.title,
+                    'source_url': header.source_url,
+                    'heading': heading,
+                    'chunk_index': count,
+                    'tokens': tokens,
+                    'text': text
+                }, ensure_ascii=False) + '\n')
+                count += 1
+        os.replace(tmp_path, cache_path)
+        return {'key': key, 'chunks': count, 'cached': False}
+    except Exception as e:
+        return {'error': str(e)}
+
+def load_cache_index():
+    if not os.path.exists(CACHE_INDEX_PATH):
+        return {}
+    try:
+        with open(CACHE_INDEX_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache_index(index):
+    """写入缓存索引（先写临时文件再替换）"""
+    tmp_path = CACHE_INDEX_PATH + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_path, CACHE_INDEX_PATH)
+
+def article_id(file_name):
+    """分段 id 的前缀：由文件名生成（内容相同的两篇文章 id 不同，文章改名后 id 也随之改变）"""
+    return hashlib.blake2b(file_name.encode('utf-8'), digest_size=8).hexdigest()
+
+def shard_record(cached, file_name):
+    """由缓存中的一条分段加上文件名、分段 id 和标题，生成上传用的记录"""
+    title = cached['title'] or os.path.splitext(file_name)[0]
+    return {
+        'id': f"{article_id(file_name)}-{cached['chunk_index']}",
+        'title': title,
+        'source_url': cached['source_url'],
+        'file': file_name,
+        'heading': cached['heading'],
+        'chunk_index': cached['chunk_index'],
+        'tokens': cached['tokens'],
+        'text': _format_chunk(title, cached['source_url'], cached['text'])
+    }
+
+def write_shards(articles):
+    """
+    按文章顺序把各篇的分段缓存拼接成 JSONL 分片，删除多余的旧分片，返回 (分片数, 分段数)
+    articles 为 [(文章路径, 缓存键), ...]
+    """
+    shard_paths = []
+    out = None
+    in_shard = total = 0
+    for path, key in articles:
+        file_name = os.path.basename(path)
+        with open(os.path.join(CACHE_DIR, key + '.jsonl'), 'r', encoding='utf-8') as f:
+            for line in f:
+                if out is None or in_shard >= SHARD_CHUNKS:
+                    if out:
+                        out.close()
+                    shard_paths.append(os.path.join(OUTPUT_DIR, f"{SHARD_PREFIX}{len(shard_paths) + 1:04d}.jsonl"))
+                    out = open(shard_paths[-1] + '.tmp', 'w', encoding='utf-8')
+                    in_shard = 0
+                out.write(json.dumps(shard_record(json.loads(line), file_name), ensure_ascii=False) + '\n')
+                in_shard += 1
+                total += 1
+    if out:
+        out.close()
+
+    for path in shard_paths:
+        os.replace(path + '.tmp', path)
+    for name in os.listdir(OUTPUT_DIR):
+        path = os.path.join(OUTPUT_DIR, name)
+        if name.startswith(SHARD_PREFIX) and name.endswith('.jsonl') and path not in shard_paths:
+            os.remove(path)
+    return len(shard_paths), total
+
+def main():
+    print("=" * 80)
+    print("免费文章分段（Dify 知识库）")
+    print("=" * 80)
+    print(f"分段长度: {MAX_TOKENS}，分段重叠: {OVERLAP_TOKENS}")
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    index = load_cache_index()
+
+    files = []
+    with os.scandir(ARTICLES_DIR) as it:
+        for entry in it:
+            if entry.name.endswith('.md') and entry.is_file():
+                files.append((entry.path, file_signature(entry.stat())))
+    files.sort()
+
+    # 签名未变化且缓存还在的文章不打开
+    keys = {}
+    changed = []
+    for path, sig in files:
+        entry = index.get(path)
+        if entry and entry[0] == sig and os.path.exists(os.path.join(CACHE_DIR, entry[1] + '.jsonl')):
+            keys[path] = entry[1]
+        else:
+            changed.append((path, sig))
+
+    pack = open_pack(PACK_PATH) if changed else None
+    changed = [(path, sig, packed_entry(pack, path, sig)) for path, sig in changed]
+    if pack is not None:
+        pack.close()
+    # 包中未变化的文章排在前面并按在包中的位置排序，读取包文件时基本是顺序读取
+    changed.sort(key=lambda item: (item[2] is None, item[2]['offset'] if item[2] else 0))
+    from_pack = sum(1 for path, sig, entry in changed if entry is not None)
+
+    print(f"\n找到 {len(files)} 篇文章，{len(changed)} 篇有变化（{from_pack} 篇在文章包中）")
+
+    rechunked = 0
+    items = [(path, PACK_PATH, entry) for path, sig, entry in changed]
+    for (path, sig, entry), result in zip(changed, parallel_map(chunk_article, items)):
+        if 'error' in result:
+            print(f"❌ 分段失败: {os.path.basename(path)}")
+            print(f"   错误: {result['error']}")
+            continue
+        keys[path] = result['key']
+        if not result['cached']:
+            rechunked += 1
+            print(f"  [分段] {os.path.basename(path)}: {result['chunks']} 段")
+
+    # 只保留仍在使用的缓存
+    index = {path: [sig, keys[path]] for path, sig in files if path in keys}
+    used = {key + '.jsonl' for key in keys.values()}
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith('.jsonl') and name not in used:
+            os.remove(os.path.join(CACHE_DIR, name))
+    save_cache_index(index)
+
+    shard_count, chunk_count = write_shards([(path, keys[path]) for path, sig in files if path in keys])
+
+    print("\n" + "=" * 80)
+    print("分段完成")
+    print("=" * 80)
+    print(f"重新分段: {rechunked} 篇，复用缓存: {len(keys) - rechunked} 篇")
+    print(f"共 {chunk_count} 个分段，{shard_count} 个分片文件")
+    print(f"输出目录: {OUTPUT_DIR}")
+
+if __name__ == "__main__":
+    main()
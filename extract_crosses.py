@@ -4,9 +4,10 @@
 从人类图轮回交叉全书.txt中提取192个轮回交叉
 """
 
-import re
 import json
 
+from cross_book import BOOK_PATH, iter_crosses, cross_data
+
 def extract_incarnation_crosses(file_path):
     """
     提取轮回交叉数据
@@ -20,57 +21,11 @@ def extract_incarnation_crosses(file_path):
     Direction（The Sphinx）2——2/1/13/7
     """
 
-    crosses = []
-
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # 查找所有轮回交叉标题和闸门组合
-    # 匹配模式：中文名称 + 英文名称（可选） + 数字——闸门/闸门/闸门/闸门
-    pattern = r'([右左并]角度交叉之[^\n]+?)\s*\n\s*([A-Z][^\n]*?)\s*(\d+)——(\d+)/(\d+)/(\d+)/(\d+)'
-
-    matches = re.findall(pattern, content)
-
-    for match in matches:
-        chinese_name = match[0].strip()
-        english_name = match[1].strip()
-        sun_gate = match[3]  # 黑太阳
-        earth_gate = match[4]  # 黑地球
-        design_sun_gate = match[5]  # 红太阳
-        design_earth_gate = match[6]  # 红地球
-
-        # 清理中文名称（去掉数字）
-        chinese_name = re.sub(r'\d+$', '', chinese_name).strip()
-
-        # 确定类型
-        if chinese_name.startswith('右角度'):
-            cross_type = '右角度'
-        elif chinese_name.startswith('左角度'):
-            cross_type = '左角度'
-        elif chinese_name.startswith('并列'):
-            cross_type = '并列'
-        else:
-            cross_type = '未知'
-
-        cross_data = {
-            'chinese_name': chinese_name,
-            'english_name': english_name,
-            'type': cross_type,
-            'gates': {
-                'black_sun': int(sun_gate),
-                'black_earth': int(earth_gate),
-                'red_sun': int(design_sun_gate),
-                'red_earth': int(design_earth_gate)
-            },
-            'key': f"{sun_gate}-{earth_gate}-{design_sun_gate}-{design_earth_gate}"
-        }
-
-        crosses.append(cross_data)
-
-    return crosses
+    # 规则集 strict：只认角度交叉，英文名大写开头且带编号（见 cross_book.PROFILES）
+    return [cross_data(record) for record in iter_crosses(file_path, profile='strict')]
 
 def main():
-    file_path = r'D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\人类图轮回交叉全书.txt'
+    file_path = BOOK_PATH
 
     print("正在提取轮回交叉数据...")
     crosses = extract_incarnation_crosses(file_path)
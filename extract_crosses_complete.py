@@ -4,63 +4,16 @@
 应该是192个：16右角度×4 + 32左角度×2 + 64并列
 """
 
-import re
 import json
 from collections import defaultdict
 
+from cross_book import BOOK_PATH, iter_crosses, cross_data
+
 def extract_all_crosses(file_path):
     """
     提取所有轮回交叉数据
     """
-
-    crosses = []
-
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # 匹配模式：中文名称 + 数字（可选） + 换行 + 英文名称 + 数字——闸门/闸门/闸门/闸门
-    # 支持三种类型：右角度、左角度、并列
-    pattern = r'([右左并]角度交叉之[^\n]+?)\s*\n\s*([A-Z][^\n]*?)\s*(\d+)——(\d+)/(\d+)/(\d+)/(\d+)'
-
-    matches = re.findall(pattern, content, re.MULTILINE)
-
-    for match in matches:
-        chinese_name_raw = match[0].strip()
-        english_name = match[1].strip()
-        sun_gate = match[3]
-        earth_gate = match[4]
-        design_sun_gate = match[5]
-        design_earth_gate = match[6]
-
-        # 清理中文名称（去掉末尾数字）
-        chinese_name = re.sub(r'\s*\d+\s*$', '', chinese_name_raw).strip()
-
-        # 确定类型
-        if chinese_name.startswith('右角度'):
-            cross_type = '右角度'
-        elif chinese_name.startswith('左角度'):
-            cross_type = '左角度'
-        elif chinese_name.startswith('并列'):
-            cross_type = '并列'
-        else:
-            cross_type = '未知'
-
-        cross_data = {
-            'chinese_name': chinese_name,
-            'english_name': english_name,
-            'type': cross_type,
-            'gates': {
-                'black_sun': int(sun_gate),
-                'black_earth': int(earth_gate),
-                'red_sun': int(design_sun_gate),
-                'red_earth': int(design_earth_gate)
-            },
-            'key': f"{sun_gate}-{earth_gate}-{design_sun_gate}-{design_earth_gate}"
-        }
-
-        crosses.append(cross_data)
-
-    return crosses
+    return [cross_data(record) for record in iter_crosses(file_path)]
 
 def analyze_crosses(crosses):
     """
@@ -89,7 +42,7 @@ def analyze_crosses(crosses):
     }
 
 def main():
-    file_path = r'D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\人类图轮回交叉全书.txt'
+    file_path = BOOK_PATH
 
     print("正在提取轮回交叉数据...")
     crosses = extract_all_crosses(file_path)
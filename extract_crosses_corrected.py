@@ -4,74 +4,21 @@
 修复：去掉英文名开头的 [A-Z\s] 限制，允许所有英文名格式
 """
 
-import re
 import json
 from collections import defaultdict, Counter
 
+from cross_book import BOOK_PATH, iter_crosses, cross_data
+
 def extract_all_crosses(file_path):
     """
     提取所有轮回交叉数据
     """
-    crosses = []
-
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # 修正后的模式：
-    # 1. 右角度/左角度：右角度交叉之... / 左角度交叉之...
-    # 2. 并列：并列交叉之...（注意：没有"角度"二字！）
-    # 匹配：中文名\n英文名——门1/门2/门3/门4
-    pattern = r'((?:右角度|左角度|并列)交叉之[^\n]+)\s*\n\s*([^\n]+?)——(\d+)/(\d+)/(\d+)/(\d+)'
-
-    matches = re.findall(pattern, content, re.MULTILINE)
-
-    for match in matches:
-        chinese_name_raw = match[0].strip()
-        english_name_raw = match[1].strip()
-        sun_gate = match[2]
-        earth_gate = match[3]
-        design_sun_gate = match[4]
-        design_earth_gate = match[5]
-
-        # 清理名称
-        # 1. 去掉中文名末尾的数字（所有类型都去掉，因为这些数字只是用于区分4种/2种变体）
-        chinese_name = re.sub(r'\s*\d+\s*$', '', chinese_name_raw).strip()
-
-        # 2. 去掉英文名末尾的数字
-        english_name = re.sub(r'\s*\d+\s*$', '', english_name_raw).strip()
-
-        # 确定类型
-        if chinese_name.startswith('右角度'):
-            cross_type = '右角度'
-        elif chinese_name.startswith('左角度'):
-            cross_type = '左角度'
-        elif chinese_name.startswith('并列'):
-            cross_type = '并列'
-        else:
-            cross_type = '未知'
-
-        cross_data = {
-            'chinese_name': chinese_name,
-            'english_name': english_name,
-            'type': cross_type,
-            'gates': {
-                'black_sun': int(sun_gate),
-                'black_earth': int(earth_gate),
-                'red_sun': int(design_sun_gate),
-                'red_earth': int(design_earth_gate)
-            },
-            'key': f"{sun_gate}-{earth_gate}-{design_sun_gate}-{design_earth_gate}"
-        }
-
-        crosses.append(cross_data)
-
     # 去重（基于type+key，因为同样的4个门可以形成不同类型的交叉）
     unique_crosses = {}
-    for cross in crosses:
-        # 使用type+key作为唯一标识
-        unique_key = f"{cross['type']}-{cross['key']}"
+    for record in iter_crosses(file_path):
+        unique_key = f"{record.type}-{record.key}"
         if unique_key not in unique_crosses:
-            unique_crosses[unique_key] = cross
+            unique_crosses[unique_key] = cross_data(record)
 
     return list(unique_crosses.values())
 
@@ -153,7 +100,7 @@ def generate_report(analysis, output_file):
             f.write("【完全缺失】需要检查提取逻辑\n")
 
 def main():
-    file_path = r'D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\人类图轮回交叉全书.txt'
+    file_path = BOOK_PATH
 
     print("正在提取轮回交叉数据...")
     crosses = extract_all_crosses(file_path)
@@ -4,79 +4,25 @@
 192个：16右角度×4 + 32左角度×2 + 64并列
 """
 
-import re
 import json
 from collections import defaultdict
 
+from cross_book import BOOK_PATH, iter_crosses, cross_data
+from stage_metrics import instrument, span
+
+@instrument('parse')
 def extract_all_crosses(file_path):
     """
-    提取所有轮回交叉数据
+    提取所有轮回交叉数据（规则集 angles：只取右角度/左角度交叉；同一组门只保留第一个）
     """
-    crosses = []
-
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # 匹配模式：支持三种类型
-    # 右角度/左角度：可能带数字
-    # 并列：去掉末尾数字
-    pattern = r'([右左并]角度交叉之[^\n]+?)\s*\n\s*([A-Z\s][^\n]*?)\s*(\d+)?——(\d+)/(\d+)/(\d+)/(\d+)'
-
-    matches = re.findall(pattern, content, re.MULTILINE)
-
-    for match in matches:
-        chinese_name_raw = match[0].strip()
-        english_name = match[1].strip()
-        # match[2] 是数字（可能为空）
-        sun_gate = match[3]
-        earth_gate = match[4]
-        design_sun_gate = match[5]
-        design_earth_gate = match[6]
-
-        # 清理中文名称
-        # 对于并列交叉：去掉末尾的所有数字
-        # 对于右角度/左角度：保留原样（因为需要区分不同的组合）
-        if '并列' in chinese_name_raw:
-            # 并列交叉去掉末尾数字
-            chinese_name = re.sub(r'\s*\d+\s*$', '', chinese_name_raw).strip()
-        else:
-            # 右角度/左角度保留原样，稍后去重
-            chinese_name = re.sub(r'\s*\d+\s*$', '', chinese_name_raw).strip()
-
-        # 确定类型
-        if chinese_name.startswith('右角度'):
-            cross_type = '右角度'
-        elif chinese_name.startswith('左角度'):
-            cross_type = '左角度'
-        elif chinese_name.startswith('并列'):
-            cross_type = '并列'
-        else:
-            cross_type = '未知'
-
-        cross_data = {
-            'chinese_name': chinese_name,
-            'english_name': english_name,
-            'type': cross_type,
-            'gates': {
-                'black_sun': int(sun_gate),
-                'black_earth': int(earth_gate),
-                'red_sun': int(design_sun_gate),
-                'red_earth': int(design_earth_gate)
-            },
-            'key': f"{sun_gate}-{earth_gate}-{design_sun_gate}-{design_earth_gate}"
-        }
-
-        crosses.append(cross_data)
-
-    # 去重（基于key）
     unique_crosses = {}
-    for cross in crosses:
-        key = cross['key']
-        if key not in unique_crosses:
-            unique_crosses[key] = cross
+    for record in iter_crosses(file_path, profile='angles'):
+        if record.key not in unique_crosses:
+            unique_crosses[record.key] = cross_data(record)
 
     return list(unique_crosses.values())
 
+@instrument('analyze')
 def analyze_crosses(crosses):
     """
     分析轮回交叉数据
@@ -104,7 +50,7 @@ def analyze_crosses(crosses):
     }
 
 def main():
-    file_path = r'D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\人类图轮回交叉全书.txt'
+    file_path = BOOK_PATH
 
     print("正在提取轮回交叉数据...")
     crosses = extract_all_crosses(file_path)
@@ -123,7 +69,7 @@ def main():
 
     # 保存JSON
     output_file = r'D:\CursorWork\HumanDesignAI\data\incarnation_crosses_final.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
+    with span('write', files=1), open(output_file, 'w', encoding='utf-8') as f:
         json.dump(crosses, f, ensure_ascii=False, indent=2)
     print(f"\n数据已保存到: {output_file}")
 
@@ -2,108 +2,265 @@
 # -*- coding: utf-8 -*-
 """
 找出收费文章并剪切到单独文件夹
+
+分两个阶段：先并行分类，把移动计划写入 PLAN_PATH（JSONL），再按计划批量移动。
+中途崩溃后重跑 apply 会从断点继续，不会出现去重目录被清空一半的情况。
+
+    python find_paid_articles.py            # 生成计划并执行（RUN_MODE）
+    python find_paid_articles.py plan       # 只分类、写计划，不动任何文章
+    python find_paid_articles.py dry-run    # 显示计划中尚未执行的操作
+    python find_paid_articles.py apply      # 按已有计划执行（可断点续做）
 """
 import os
-import re
-import shutil
+import sys
 from pathlib import Path
 
+from article_catalog import CATALOG_PATH, open_catalog, upsert_articles
+from article_frontmatter import MAX_HEADER_CHARS, parse_frontmatter
+from article_manifest import file_signature
+from content_hash import hash_bytes
+from materialize import materialize
+from move_plan import write_plan, load_plan, apply_plan
+from paywall_classifier import find_first_marker, find_first_marker_bytes
+from paywall_split import FREE_SEGMENTS_NAME, body_start, split_paywall, open_article, save_free_segments
+from parallel_scan import parallel_map
+from stage_metrics import span
+
 # 配置路径
 ARTICLES_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章_去重后"
 PAID_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章_收费文章"
 FREE_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章_免费文章"
 
-# 收费文章的关键词（会出现在收费文章中）
-PAID_KEYWORDS = [
-    "付费",
-    "收费",
-    "准备好了吗？准备好了，就付费吧",
-    "上文.*字.*下文.*字",  # 如：(上文2520字，下文12512字)
-    "付费阅读",
-    "¥",
-    "元/篇",
-    "购买",
-]
+# 分类结果的生成方式：'move' 剪切（默认，去重目录会被清空）；
+# 'hardlink' / 'reflink' 保留去重目录不动，几乎瞬间生成收费/免费目录且不占额外空间；'copy' 复制
+MATERIALIZE_MODE = 'move'
 
-def is_paid_article(content):
-    """判断是否是收费文章"""
-    # 检查是否包含收费关键词
-    for keyword in PAID_KEYWORDS:
-        if re.search(keyword, content, re.IGNORECASE):
-            return True
+# 移动计划文件（执行日志为同名 .done 文件）
+PLAN_PATH = os.path.join(os.path.dirname(ARTICLES_DIR), "收费文章分类计划.jsonl")
 
-    # 检查字数统计模式（收费文章常见）
-    if re.search(r'\(上文\d+字.*下文\d+字', content):
-        return True
+# 把分类结果写入文章目录库（快照名与 compare_articles.NEW_SNAPSHOT 一致）
+UPDATE_CATALOG = True
+CATALOG_SNAPSHOT = 'classified'
 
-    return False
+# 默认运行方式：'plan+apply' / 'plan' / 'apply' / 'dry-run'，命令行第一个参数可覆盖
+RUN_MODE = 'plan+apply'
 
-def main():
-    print("=" * 80)
-    print("开始分类收费和免费文章")
-    print("=" * 80)
+def is_paid_article(content):
+    """判断是否是收费文章（宽松规则，关键词见 paywall_classifier.LOOSE_RULES）"""
+    return find_first_marker(content, 'loose') is not None
 
-    # 创建输出目录
-    os.makedirs(PAID_DIR, exist_ok=True)
-    os.makedirs(FREE_DIR, exist_ok=True)
+def classify_file(file_path):
+    """
+    读取并分类一篇文章（在子进程中运行）
+    返回 {'title', 'source_url', 'is_paid', 'rule', 'content_hash', 'paywall'}，rule 为命中的付费规则，
+    paywall 为收费文章的免费/付费分界（见 paywall_split.PaywallSplit，没有分界标识时为 None）；
+    读取失败时返回 {'error'}
 
-    paid_count = 0
-    free_count = 0
-    paid_articles = []
+    文件只读一次（大文件用 mmap，见 paywall_split.open_article），付费标识、分界和内容摘要都在同一份数据上计算
+    """
+    try:
+        with open_article(file_path) as data:
+            return _classify_buffer(file_path, data)
+    except (OSError, ValueError) as e:
+        return {'error': str(e)}
 
-    print("\n正在扫描文章...")
+def _classify_buffer(file_path, data):
+    if isinstance(data, bytes):
+        content = data.decode('utf-8')
+        header = parse_frontmatter(content)
+        marker = find_first_marker(content, 'loose')
+    else:
+        # mmap：只解码 YAML 头，付费标识直接在字节上查找
+        header = parse_frontmatter(bytes(data[:MAX_HEADER_CHARS * 4]).decode('utf-8', 'ignore'))
+        marker = find_first_marker_bytes(data, 'loose')
 
-    # 遍历所有文章
-    for file in os.listdir(ARTICLES_DIR):
-        if not file.endswith('.md') or file == '去重报告.txt':
-            continue
+    # 提取标题（只在 YAML 头中查找）
+    title = header.title or os.path.basename(file_path)
 
-        file_path = os.path.join(ARTICLES_DIR, file)
+    paywall = None
+    if marker is not None:
+        split = split_paywall(data, body_start(data, header.body_offset))
+        if split is not None:
+            paywall = split._asdict()
+    return {
+        'title': title,
+        'source_url': header.source_url,
+        'is_paid': marker is not None,
+        'rule': marker.rule if marker else None,
+        'content_hash': hash_bytes(data),
+        'paywall': paywall
+    }
 
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # 提取标题
-            title_match = re.search(r'title:\s*"([^"]+)"', content)
-            title = title_match.group(1) if title_match else file
-
-            # 判断是否是收费文章
-            if is_paid_article(content):
-                # 剪切到收费文章文件夹
-                dest_path = os.path.join(PAID_DIR, file)
-                shutil.move(file_path, dest_path)
-                paid_count += 1
-                paid_articles.append(title)
-                print(f"  [收费] {title}")
-            else:
-                # 剪切到免费文章文件夹
-                dest_path = os.path.join(FREE_DIR, file)
-                shutil.move(file_path, dest_path)
-                free_count += 1
-
-        except Exception as e:
+def build_plan():
+    """并行分类所有文章，生成移动计划条目（不移动任何文件）"""
+    files = [
+        file for file in os.listdir(ARTICLES_DIR)
+        if file.endswith('.md') and file != '去重报告.txt'
+    ]
+
+    # 并行读取和分类，结果按文件顺序返回
+    with span('classify', files=len(files)):
+        results = parallel_map(classify_file, [os.path.join(ARTICLES_DIR, f) for f in files])
+
+    entries = []
+    for file, result in zip(files, results):
+        if 'error' in result:
             print(f"处理文件失败: {file}")
-            print(f"错误: {e}")
+            print(f"错误: {result['error']}")
+            continue
 
-    # 统计结果
-    print("\n" + "=" * 80)
-    print("分类完成")
-    print("=" * 80)
-    print(f"收费文章: {paid_count} 篇")
-    print(f"免费文章: {free_count} 篇")
-    print(f"总计: {paid_count + free_count} 篇")
+        target_dir = PAID_DIR if result['is_paid'] else FREE_DIR
+        entries.append({
+            'id': len(entries),
+            'file': file,
+            'src': os.path.join(ARTICLES_DIR, file),
+            'dest': os.path.join(target_dir, file),
+            'paid': result['is_paid'],
+            'title': result['title'],
+            'source_url': result['source_url'],
+            'rule': result['rule'],
+            'content_hash': result['content_hash'],
+            'paywall': result['paywall']
+        })
+        if result['is_paid']:
+            print(f"  [收费] {result['title']}  （命中: {result['rule']}）")
+
+    return entries
 
-    # 保存收费文章列表
+def write_paid_report(entries):
+    """保存收费文章列表"""
+    paid_articles = [entry['title'] for entry in entries if entry['paid']]
     report_path = os.path.join(PAID_DIR, "收费文章列表.txt")
     with open(report_path, 'w', encoding='utf-8') as f:
         f.write("收费文章列表\n")
         f.write("=" * 80 + "\n\n")
-        f.write(f"总计: {paid_count} 篇\n\n")
+        f.write(f"总计: {len(paid_articles)} 篇\n\n")
         for i, title in enumerate(paid_articles, 1):
             f.write(f"{i}. {title}\n")
+    return report_path
+
+def write_free_segments(entries):
+    """
+    保存收费文章的免费部分（JSONL，每行一篇），复核/检索时直接使用，不必再打开收费文章截取
+    sig 为写入时文件的 [大小, 修改时间]，文件之后被改动时使用方会重新读取
+    """
+    segments_path = os.path.join(PAID_DIR, FREE_SEGMENTS_NAME)
+    records = []
+    for entry in entries:
+        paywall = entry.get('paywall')
+        if not entry['paid'] or not paywall:
+            continue
+        try:
+            sig = file_signature(os.stat(entry['dest']))
+        except OSError:
+            continue
+        records.append({
+            'file': entry['file'],
+            'path': entry['dest'],
+            'sig': sig,
+            'title': entry['title'],
+            'source_url': entry.get('source_url'),
+            **paywall
+        })
+    save_free_segments(segments_path, records)
+    return segments_path, len(records)
+
+def update_catalog(entries):
+    """把分类结果写入目录库（分类时已提取元数据和内容摘要，不再读取文件）"""
+    records = []
+    for entry in entries:
+        try:
+            st = os.stat(entry['dest'])
+        except OSError:
+            continue
+        records.append({
+            'path': entry['dest'],
+            'collection': '收费文章' if entry['paid'] else '免费文章',
+            'source_url': entry.get('source_url'),
+            'title': entry['title'],
+            'paid': entry['paid'],
+            'content_hash': entry.get('content_hash'),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns
+        })
+
+    conn = open_catalog(CATALOG_PATH)
+    try:
+        upsert_articles(conn, CATALOG_SNAPSHOT, records)
+    finally:
+        conn.close()
+    print(f"已写入文章目录库: {CATALOG_PATH}（快照 {CATALOG_SNAPSHOT}，{len(records)} 篇）")
+
+def main():
+    run_mode = sys.argv[1] if len(sys.argv) > 1 else RUN_MODE
+    if run_mode not in ('plan+apply', 'plan', 'apply', 'dry-run'):
+        print(f"未知的运行方式: {run_mode}（可选: plan+apply / plan / apply / dry-run）")
+        return
+
+    print("=" * 80)
+    print("开始分类收费和免费文章")
+    print("=" * 80)
+
+    # 第一阶段：分类并写入计划
+    if run_mode in ('plan+apply', 'plan'):
+        print("\n正在扫描文章...")
+        entries = build_plan()
+        write_plan(PLAN_PATH, entries, {
+            'articles_dir': ARTICLES_DIR,
+            'materialize_mode': MATERIALIZE_MODE
+        })
+
+        paid_count = sum(1 for entry in entries if entry['paid'])
+        free_count = len(entries) - paid_count
+
+        # 统计结果
+        print("\n" + "=" * 80)
+        print("分类完成")
+        print("=" * 80)
+        print(f"收费文章: {paid_count} 篇")
+        print(f"免费文章: {free_count} 篇")
+        print(f"总计: {paid_count + free_count} 篇")
+        print(f"\n移动计划已保存到: {PLAN_PATH}")
+
+        if run_mode == 'plan':
+            return
+
+    # 第二阶段：按计划执行
+    if run_mode == 'dry-run':
+        print(f"\n计划文件: {PLAN_PATH}（仅显示，不执行）")
+        stats = apply_plan(PLAN_PATH, None, dry_run=True)
+        print(f"\n待执行: {stats['pending']} 条，已完成: {stats['resumed']} 条")
+        return
+
+    header, entries = load_plan(PLAN_PATH)
+    mode = header.get('materialize_mode', MATERIALIZE_MODE)
+
+    print("\n" + "=" * 80)
+    print(f"按计划执行（方式: {mode}）...")
+    print("=" * 80)
+
+    # 创建输出目录
+    os.makedirs(PAID_DIR, exist_ok=True)
+    os.makedirs(FREE_DIR, exist_ok=True)
+
+    with span('write', files=len(entries)):
+        stats = apply_plan(PLAN_PATH, lambda src, dest: materialize(src, dest, mode))
+    for entry, error in stats['failed']:
+        print(f"处理文件失败: {entry['file']}")
+        print(f"错误: {error}")
+
+    print(f"本次执行: {stats['applied']} 条")
+    print(f"此前已完成: {stats['resumed']} 条")
+    print(f"失败: {len(stats['failed'])} 条（重跑 apply 会重试）")
+
+    report_path = write_paid_report(entries)
+    segments_path, segment_count = write_free_segments(entries)
+
+    if UPDATE_CATALOG:
+        update_catalog(entries)
 
     print(f"\n收费文章列表已保存到: {report_path}")
+    print(f"收费文章的免费部分（{segment_count} 篇）已保存到: {segments_path}")
     print(f"\n收费文章目录: {PAID_DIR}")
     print(f"免费文章目录: {FREE_DIR}")
 
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+人类图术语表
+从 create_gate_centers.py 和 data 目录中的通道/轮回交叉数据整理出闸门、通道、交叉、中心的名称，
+供文章检索（分词词典）等脚本使用
+"""
+import os
+import re
+import json
+
+from create_gate_centers import CENTERS, GATE_NAMES
+
+# 数据目录
+DATA_DIR = r"D:\CursorWork\HumanDesignAI\data"
+
+# 数据文件中没有、但文章里常见的术语
+BASE_TERMS = [
+    '人类图', '能量类型', '生产者', '显示生产者', '显示者', '投射者', '反映者',
+    '策略', '内在权威', '情绪权威', '荐骨权威', '直觉权威', '意志力权威', '自我投射权威',
+    '人生角色', '定义', '未定义', '开放中心', '通道', '闸门', '爻', '轮回交叉',
+    '右角度', '左角度', '并列', '非自己', '设计', '个性', '意识', '潜意识',
+    '太阳', '地球', '月亮', '北交点', '南交点', '等待回应', '等待邀请', '告知',
+    '满足', '挫败', '成功', '苦涩', '平和', '愤怒', '失望', '惊喜',
+]
+
+def load_channels(data_dir=DATA_DIR):
+    """36 条通道"""
+    with open(os.path.join(data_dir, 'channels_36_complete.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_crosses(data_dir=DATA_DIR):
+    """轮回交叉"""
+    with open(os.path.join(data_dir, 'incarnation_crosses_final.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def cross_name_parts(chinese_name):
+    """
+    交叉名称拆成可单独检索的部分：
+    "右角度交叉之方向（人面狮身）" -> ['右角度交叉之方向（人面狮身）', '方向', '人面狮身']
+    """
+    parts = [chinese_name]
+    match = re.match(r'^(?:右角度|左角度|并列)交叉之([^（(]+)(?:[（(]([^）)]+)[）)])?', chinese_name)
+    if match:
+        parts.extend(part.strip() for part in match.groups() if part)
+    return parts
+
+def dictionary_terms(data_dir=DATA_DIR):
+    """分词用的术语词典（两个字以上的词）"""
+    terms = set(BASE_TERMS)
+    terms.update(center['chinese'] for center in CENTERS.values())
+    terms.update(name for name in GATE_NAMES.values() if len(name) >= 2)
+    for channel in load_channels(data_dir):
+        name = channel['chinese_name']
+        terms.add(name)
+        terms.add(name[:-len('的通道')] if name.endswith('的通道') else name)
+    for cross in load_crosses(data_dir):
+        terms.update(cross_name_parts(cross['chinese_name']))
+    return sorted(term for term in terms if len(term) >= 2)
+
+def _cross_aliases(chinese_name):
+    """
+    交叉名称的各种写法：
+    "右角度交叉之方向（人面狮身）" -> 原名、"右角度交叉之方向"、"右角度交叉之人面狮身"
+    """
+    aliases = {chinese_name}
+    match = re.match(r'^(右角度|左角度|并列)交叉之([^（(]+)(?:[（(]([^）)]+)[）)])?', chinese_name)
+    if match:
+        angle, base, alias = match.groups()
+        aliases.add(f"{angle}交叉之{base.strip()}")
+        if alias:
+            aliases.add(f"{angle}交叉之{alias.strip()}")
+    return aliases
+
+def mention_patterns(data_dir=DATA_DIR):
+    """
+    文章中提到闸门/通道/交叉的固定写法：[(实体, 文字), ...]
+    实体为 'gate:34' / 'channel:20-34' / 'cross:右角度交叉之方向（人面狮身）'
+    闸门和通道的数字写法需要检查前后不是数字（"闸门3" 不能匹配 "闸门34"）
+    """
+    patterns = []
+    for gate in range(1, 65):
+        entity = f"gate:{gate}"
+        for form in (f"{gate}号闸门", f"闸门{gate}", f"{gate}闸门", f"第{gate}闸门",
+                     f"{gate}号门", f"{GATE_NAMES[gate]}卦"):
+            patterns.append((entity, form))
+
+    for channel in load_channels(data_dir):
+        a, b = channel['gates']
+        entity = f"channel:{a}-{b}"
+        patterns.append((entity, channel['chinese_name']))
+        for first, second in ((a, b), (b, a)):
+            for form in (f"{first}-{second}通道", f"通道{first}-{second}",
+                         f"{first}-{second}的通道", f"{first}－{second}通道"):
+                patterns.append((entity, form))
+
+    for name in sorted({cross['chinese_name'] for cross in load_crosses(data_dir)}):
+        for alias in sorted(_cross_aliases(name)):
+            patterns.append((f"cross:{name}", alias))
+    return patterns
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导入知识库中的 DOCX / TXT 文档
+知识库里除了 .md 文章还有不少 .docx 和 .txt 资料，文章处理脚本都读不了。
+这里把它们的正文提取出来，转成与文章相同的 YAML 头 + 正文 格式（.md），
+检索、分段等脚本就可以和文章一样处理
+
+    DOCX  直接流式解析 zip 中的 word/document.xml，逐段读取，不建立整个文档树
+    TXT   依次尝试 UTF-8 / GB18030 解码
+
+提取在进程池中并行进行；提取结果按文件内容摘要缓存，重跑时未变化的文档不会再次解析
+"""
+import os
+import json
+import zipfile
+import xml.etree.ElementTree as ET
+
+from article_manifest import file_signature
+from content_hash import hash_file
+from parallel_scan import parallel_map
+
+# 配置路径
+KB_ROOT = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库"
+OUTPUT_DIR = os.path.join(KB_ROOT, "01_核心理论", "导入文档")
+
+# 导入的文档类型
+EXTENSIONS = ('.docx', '.txt')
+
+# 各脚本生成的报告，不导入
+SKIP_NAMES = {
+    "知识库结构分析.txt", "去重报告.txt", "近似重复报告.txt", "清理报告.txt",
+    "收费文章列表.txt", "收费文章列表_核实后.txt", "文章对比报告.txt",
+}
+
+# 提取缓存：<内容摘要>.txt 为提取出的正文，索引.json 记录 源文件 -> [签名, 摘要, 输出文件, 输出格式]
+CACHE_DIR = os.path.join(OUTPUT_DIR, ".导入缓存")
+CACHE_INDEX_PATH = os.path.join(CACHE_DIR, "索引.json")
+
+# 输出文件格式变化时加一，已导入的文档重写输出文件（正文取自提取缓存，不重新提取）
+RECORD_FORMAT = 2
+
+# TXT 文件依次尝试的编码
+TEXT_ENCODINGS = ('utf-8-sig', 'gb18030')
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_DC_TITLE = '{http://purl.org/dc/elements/1.1/}title'
+
+def _heading_level(style):
+    """段落样式对应的标题级别（Heading1 / 标题 1 / 1 等），不是标题时返回 0"""
+    if not style:
+        return 0
+    digits = ''.join(ch for ch in style if ch.isdigit())
+    lowered = style.lower()
+    if digits and ('heading' in lowered or '标题' in style or style.isdigit()):
+        return min(int(digits), 6)
+    if lowered == 'title':
+        return 1
+    return 0
+
+def iter_docx_paragraphs(file_path):
+    """逐段产出 DOCX 正文（标题段落转成 markdown 的 #），每段处理完立即释放"""
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open('word/document.xml') as stream:
+            for event, elem in ET.iterparse(stream, events=('end',)):
+                if elem.tag != _W + 'p':
+                    continue
+                parts = []
+                for node in elem.iter():
+                    if node.tag == _W + 't' and node.text:
+                        parts.append(node.text)
+                    elif node.tag == _W + 'tab':
+                        parts.append('\t')
+                    elif node.tag in (_W + 'br', _W + 'cr'):
+                        parts.append('\n')
+                text = ''.join(parts).strip()
+                style = elem.find(f'{_W}pPr/{_W}pStyle')
+                level = _heading_level(style.get(_W + 'val') if style is not None else None)
+                elem.clear()
+                if text:
+                    yield ('#' * level + ' ' + text) if level else text
+
+def docx_title(file_path):
+    """DOCX 文档属性中的标题（没有时返回 None）"""
+    with zipfile.ZipFile(file_path) as archive:
+        try:
+            with archive.open('docProps/core.xml') as stream:
+                for event, elem in ET.iterparse(stream, events=('end',)):
+                    if elem.tag == _DC_TITLE:
+                        return (elem.text or '').strip() or None
+        except KeyError:
+            pass
+    return None
+
+def read_text_file(file_path):
+    """读取 TXT，依次尝试 TEXT_ENCODINGS"""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    for encoding in TEXT_ENCODINGS:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode('utf-8', 'replace')
+
+def extract_document(file_path):
+    """
+    提取一篇文档的正文（在子进程中运行），同样内容的文档直接使用缓存
+    返回 {'content_hash', 'title', 'cached'} 或 {'error'}
+    """
+    try:
+        content_hash = hash_file(file_path)
+        cache_path = os.path.join(CACHE_DIR, content_hash + '.txt')
+        title = None
+        if file_path.lower().endswith('.docx'):
+            title = docx_title(file_path)
+        if os.path.exists(cache_path):
+            return {'content_hash': content_hash, 'title': title, 'cached': True}
+
+        tmp_path = cache_path + f'.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            if file_path.lower().endswith('.docx'):
+                for paragraph in iter_docx_paragraphs(file_path):
+                    out.write(paragraph + '\n\n')
+            else:
+                out.write(read_text_file(file_path).replace('\r\n', '\n').strip() + '\n')
+        os.replace(tmp_path, cache_path)
+        return {'content_hash': content_hash, 'title': title, 'cached': False}
+    except Exception as e:
+        return {'error': str(e)}
+
+def _header_value(value):
+    """
+    YAML 头的字段值：与语料中其他文章一样写成 "值"
+    article_frontmatter 只去掉两侧的引号、不处理转义，所以值中的双引号换成单引号，换行换成空格
+    """
+    value = str(value).replace('"', "'").replace('\r', ' ').replace('\n', ' ')
+    return f'"{value}"'
+
+def write_record(output_path, source_path, title, content_hash):
+    """写出 YAML 头 + 正文 的 .md 文件（正文取自提取缓存）"""
+    header = {
+        'title': title,
+        'source_file': os.path.relpath(source_path, KB_ROOT),
+        'source_format': os.path.splitext(source_path)[1].lstrip('.').lower(),
+        'content_hash': content_hash,
+    }
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as out, \
+            open(os.path.join(CACHE_DIR, content_hash + '.txt'), 'r', encoding='utf-8') as body:
+        out.write('---\n')
+        for key, value in header.items():
+            out.write(f"{key}: {_header_value(value)}\n")
+        out.write('---\n\n')
+        for line in body:
+            out.write(line)
+    os.replace(tmp_path, output_path)
+
+def iter_documents(root_dir):
+    """遍历知识库中要导入的文档（跳过输出目录和 . 开头的目录）"""
+    for current, dirs, files in os.walk(root_dir):
+        dirs[:] = sorted(
+            d for d in dirs
+            if not d.startswith('.') and os.path.join(current, d) != OUTPUT_DIR
+        )
+        for name in sorted(files):
+            if name.lower().endswith(EXTENSIONS) and name not in SKIP_NAMES and not name.startswith('~$'):
+                yield os.path.join(current, name)
+
+def output_path_for(source_path, used):
+    """输出文件路径：与知识库相同的目录结构，文件名改为 .md（同名冲突时保留原扩展名）"""
+    rel = os.path.relpath(source_path, KB_ROOT)
+    output_path = os.path.join(OUTPUT_DIR, os.path.splitext(rel)[0] + '.md')
+    if output_path in used:
+        output_path = os.path.join(OUTPUT_DIR, rel + '.md')
+    used.add(output_path)
+    return output_path
+
+def load_cache_index():
+    if not os.path.exists(CACHE_INDEX_PATH):
+        return {}
+    try:
+        with open(CACHE_INDEX_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache_index(index):
+    """写入缓存索引（先写临时文件再替换）"""
+    tmp_path = CACHE_INDEX_PATH + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_path, CACHE_INDEX_PATH)
+
+def main():
+    print("=" * 80)
+    print("导入 DOCX / TXT 文档")
+    print("=" * 80)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    index = load_cache_index()
+
+    used = set()
+    documents = []
+    changed = []
+    for path in iter_documents(KB_ROOT):
+        sig = file_signature(os.stat(path))
+        output_path = output_path_for(path, used)
+        documents.append((path, sig, output_path))
+        entry = index.get(path)
+        if not (entry and entry[0] == sig and entry[2] == output_path and entry[3:] == [RECORD_FORMAT]
+                and os.path.exists(output_path)):
+            changed.append((path, sig, output_path))
+
+    print(f"\n找到 {len(documents)} 个文档，{len(changed)} 个有变化")
+
+    changed_paths = {path for path, sig, output_path in changed}
+    new_index = {path: index[path] for path, sig, output_path in documents
+                 if path in index and path not in changed_paths}
+    extracted = 0
+    results = parallel_map(extract_document, [path for path, sig, output_path in changed])
+    for (path, sig, output_path), result in zip(changed, results):
+        if 'error' in result:
+            print(f"❌ 提取失败: {path}")
+            print(f"   错误: {result['error']}")
+            continue
+        title = result['title'] or os.path.splitext(os.path.basename(path))[0]
+        write_record(output_path, path, title, result['content_hash'])
+        new_index[path] = [sig, result['content_hash'], output_path, RECORD_FORMAT]
+        if not result['cached']:
+            extracted += 1
+        print(f"  [导入] {os.path.relpath(path, KB_ROOT)}")
+
+    # 清理已删除文档的输出和不再使用的缓存
+    outputs = {entry[2] for entry in new_index.values()}
+    for path, entry in index.items():
+        if path not in new_index and entry[2] not in outputs and os.path.exists(entry[2]):
+            os.remove(entry[2])
+    hashes = {entry[1] + '.txt' for entry in new_index.values()}
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith('.txt') and name not in hashes:
+            os.remove(os.path.join(CACHE_DIR, name))
+    save_cache_index(new_index)
+
+    print("\n" + "=" * 80)
+    print("导入完成")
+    print("=" * 80)
+    print(f"文档总数: {len(documents)}")
+    print(f"重新提取: {extracted} 个，复用缓存: {len(new_index) - extracted} 个")
+    print(f"输出目录: {OUTPUT_DIR}")
+
+if __name__ == "__main__":
+    main()
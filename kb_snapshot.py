@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识库快照与对比（Merkle 树）
+每个快照记录 目录 -> 文件 -> 内容摘要 的树，每个目录的摘要由其下所有文件和子目录的摘要算出。
+对比两个快照时从根开始，只进入摘要不同的子目录，未变化的部分一眼跳过；
+报告新增、删除、移动（内容相同、位置不同）、修改的文件，以及同一URL下内容变化的文章
+（compare_articles.py 只比较URL集合，发现不了这种变化）
+
+拍快照时 大小/修改时间 与上一个快照相同的文件直接沿用上次的摘要，不再读取
+
+    python kb_snapshot.py take [名称]      # 拍快照（默认用当前时间命名）
+    python kb_snapshot.py list             # 列出快照
+    python kb_snapshot.py diff 旧 新        # 对比两个快照（省略"新"时与最新快照对比）
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+
+from article_frontmatter import read_frontmatter
+from article_manifest import file_signature
+from content_hash import hash_file
+from parallel_scan import parallel_map
+
+# 配置路径
+KB_ROOT = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库"
+SNAPSHOT_DIR = os.path.join(KB_ROOT, ".知识库快照")
+
+def scan_file(file_path):
+    """计算文件摘要，.md 文章同时读取 source_url（在子进程中运行）"""
+    try:
+        result = {'hash': hash_file(file_path), 'url': None}
+        if file_path.endswith('.md'):
+            result['url'] = read_frontmatter(file_path).source_url
+        return result
+    except Exception as e:
+        return {'error': str(e)}
+
+def _node_hash(node):
+    """目录摘要：按名称排序的 子目录摘要 + 文件摘要"""
+    digest = hashlib.blake2b(digest_size=20)
+    for name in sorted(node['dirs']):
+        digest.update(f"d\0{name}\0{node['dirs'][name]['hash']}\n".encode('utf-8'))
+    for name in sorted(node['files']):
+        digest.update(f"f\0{name}\0{node['files'][name]['hash']}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def _walk(path, previous, pending):
+    """
+    建立目录节点；文件签名与上个快照相同时沿用摘要，否则先留空并记入 pending 等待并行计算
+    """
+    node = {'hash': None, 'dirs': {}, 'files': {}}
+    previous = previous or {'dirs': {}, 'files': {}}
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return node
+    for entry in entries:
+        if entry.name.startswith('.'):
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                node['dirs'][entry.name] = _walk(entry.path, previous['dirs'].get(entry.name), pending)
+                continue
+            sig = file_signature(entry.stat())
+        except OSError:
+            continue
+        old = previous['files'].get(entry.name)
+        if old and old['sig'] == sig:
+            node['files'][entry.name] = old
+        else:
+            record = {'sig': sig, 'hash': None, 'url': None}
+            node['files'][entry.name] = record
+            pending.append((entry.path, record))
+    return node
+
+def _finish(node):
+    """自底向上计算目录摘要（去掉读取失败的文件）"""
+    node['files'] = {name: f for name, f in node['files'].items() if f['hash'] is not None}
+    for child in node['dirs'].values():
+        _finish(child)
+    node['hash'] = _node_hash(node)
+
+def take_snapshot(root_dir=KB_ROOT, previous=None):
+    """拍快照，返回 (树, 重新读取的文件数, 失败列表)"""
+    pending = []
+    tree = _walk(root_dir, previous, pending)
+    failed = []
+    results = parallel_map(scan_file, [path for path, record in pending])
+    for (path, record), result in zip(pending, results):
+        if 'error' in result:
+            failed.append((path, result['error']))
+            continue
+        record['hash'] = result['hash']
+        record['url'] = result['url']
+    _finish(tree)
+    return tree, len(pending) - len(failed), failed
+
+def snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, name + '.json')
+
+def list_snapshots():
+    """按名称（默认即时间）排序的快照名"""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    return sorted(name[:-5] for name in os.listdir(SNAPSHOT_DIR) if name.endswith('.json'))
+
+def load_snapshot(name):
+    with open(snapshot_path(name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_snapshot(name, tree):
+    """写入快照（先写临时文件再替换）"""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp_path = snapshot_path(name) + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'root': KB_ROOT, 'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'tree': tree},
+                  f, ensure_ascii=False)
+    os.replace(tmp_path, snapshot_path(name))
+
+def _collect(node, prefix, out):
+    """子树中所有文件：{相对路径: 文件记录}"""
+    for name, record in node['files'].items():
+        out[prefix + name] = record
+    for name, child in node['dirs'].items():
+        _collect(child, prefix + name + '/', out)
+    return out
+
+def _diff_nodes(old, new, prefix, removed, added, modified, stats):
+    """只进入摘要不同的子树"""
+    stats['visited'] += 1
+    if old['hash'] == new['hash']:
+        return
+    for name in old['files'].keys() | new['files'].keys():
+        a, b = old['files'].get(name), new['files'].get(name)
+        if b is None:
+            removed[prefix + name] = a
+        elif a is None:
+            added[prefix + name] = b
+        elif a['hash'] != b['hash']:
+            modified[prefix + name] = (a, b)
+    for name in old['dirs'].keys() | new['dirs'].keys():
+        a, b = old['dirs'].get(name), new['dirs'].get(name)
+        if b is None:
+            _collect(a, prefix + name + '/', removed)
+        elif a is None:
+            _collect(b, prefix + name + '/', added)
+        else:
+            _diff_nodes(a, b, prefix + name + '/', removed, added, modified, stats)
+
+def diff_snapshots(old_tree, new_tree):
+    """
+    对比两个快照，返回：
+        {'added': [路径], 'removed': [路径], 'moved': [(旧路径, 新路径)],
+         'modified': [路径], 'url_changed': [(URL, 旧路径, 新路径)], 'visited': 访问的目录数}
+    """
+    removed, added, modified = {}, {}, {}
+    stats = {'visited': 0}
+    _diff_nodes(old_tree, new_tree, '', removed, added, modified, stats)
+
+    # 内容相同的 删除 + 新增 视为移动
+    added_by_hash = {}
+    for path, record in sorted(added.items()):
+        added_by_hash.setdefault(record['hash'], []).append(path)
+    moved = []
+    for path, record in sorted(removed.items()):
+        targets = added_by_hash.get(record['hash'])
+        if targets:
+            moved.append((path, targets.pop(0)))
+    for old_path, new_path in moved:
+        del removed[old_path]
+        del added[new_path]
+
+    # 同一URL下内容变化：原地修改，或换了位置又改了内容
+    url_changed = [
+        (b['url'], path, path) for path, (a, b) in sorted(modified.items())
+        if b['url'] and a['url'] == b['url']
+    ]
+    added_by_url = {}
+    for path, record in sorted(added.items()):
+        if record['url']:
+            added_by_url.setdefault(record['url'], path)
+    for path, record in sorted(removed.items()):
+        new_path = added_by_url.get(record['url']) if record['url'] else None
+        if new_path:
+            url_changed.append((record['url'], path, new_path))
+
+    return {
+        'added': sorted(added),
+        'removed': sorted(removed),
+        'moved': moved,
+        'modified': sorted(modified),
+        'url_changed': url_changed,
+        'visited': stats['visited']
+    }
+
+def print_diff(old_name, new_name, diff):
+    print(f"\n对比快照: {old_name} -> {new_name}（访问了 {diff['visited']} 个目录）")
+    sections = [
+        ('新增', diff['added']),
+        ('删除', diff['removed']),
+        ('移动', [f"{a} -> {b}" for a, b in diff['moved']]),
+        ('修改', diff['modified']),
+        ('同一URL内容变化', [f"{url}\n      {a}" + (f" -> {b}" if a != b else '')
+                          for url, a, b in diff['url_changed']]),
+    ]
+    for title, items in sections:
+        print(f"\n{title}: {len(items)}")
+        for item in items:
+            print(f"  - {item}")
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'take'
+
+    if command == 'list':
+        for name in list_snapshots():
+            print(name)
+        return
+
+    if command == 'diff':
+        names = list_snapshots()
+        if len(sys.argv) < 3 or not names:
+            print("用法: python kb_snapshot.py diff 旧快照 [新快照]")
+            return
+        old_name = sys.argv[2]
+        new_name = sys.argv[3] if len(sys.argv) > 3 else names[-1]
+        old, new = load_snapshot(old_name), load_snapshot(new_name)
+        print_diff(old_name, new_name, diff_snapshots(old['tree'], new['tree']))
+        return
+
+    if command != 'take':
+        print(f"未知的命令: {command}（可选: take / list / diff）")
+        return
+
+    print("=" * 80)
+    print("拍摄知识库快照")
+    print("=" * 80)
+
+    name = sys.argv[2] if len(sys.argv) > 2 else time.strftime('%Y%m%d-%H%M%S')
+    names = list_snapshots()
+    previous = load_snapshot(names[-1])['tree'] if names else None
+
+    tree, rehashed, failed = take_snapshot(KB_ROOT, previous)
+    for path, error in failed:
+        print(f"❌ 读取文件失败: {path}")
+        print(f"   错误: {error}")
+    save_snapshot(name, tree)
+
+    total = len(_collect(tree, '', {}))
+    print(f"\n文件: {total} 个（重新计算摘要 {rehashed} 个）")
+    print(f"根摘要: {tree['hash']}")
+    print(f"快照已保存: {snapshot_path(name)}")
+
+    if names:
+        print_diff(names[-1], name, diff_snapshots(previous, tree))
+
+if __name__ == "__main__":
+    main()
@@ -332,6 +332,37 @@ function loadIncarnationCrosses() {
   return incarnationCrossesDB;
 }
 
+/**
+ * 加载轮回交叉直接索引表（build_cross_lookup.py 生成）
+ * table[(个性太阳闸门 - 1) * angles.length + profile_angle[人生角色]] 为 crosses 中的下标
+ */
+let incarnationCrossLookup;
+function loadIncarnationCrossLookup() {
+  if (incarnationCrossLookup === undefined) {
+    try {
+      incarnationCrossLookup = require('../data/incarnation_cross_lookup.json');
+    } catch (error) {
+      console.error('[Bodygraph] 无法加载轮回交叉索引表，改为逐个查找:', error.message);
+      incarnationCrossLookup = null;
+    }
+  }
+  return incarnationCrossLookup;
+}
+
+/**
+ * 按个性太阳闸门和人生角色直接取轮回交叉；没有索引表时按门组合 key 逐个查找
+ */
+function findIncarnationCross(pSunGate, profile, key) {
+  const lookup = loadIncarnationCrossLookup();
+  if (lookup) {
+    const angle = lookup.profile_angle[profile];
+    if (angle === undefined) return null;
+    const index = lookup.table[(pSunGate - 1) * lookup.angles.length + angle];
+    return index >= 0 ? lookup.crosses[index] : null;
+  }
+  return loadIncarnationCrosses().find(cross => cross.key === key) || null;
+}
+
 /**
  * 格式化英文名：添加空格，首字母大写
  * THEMAYA -> The Maya
@@ -408,8 +439,8 @@ function calculateIncarnationCross(personality, design) {
   const gates = `${pSunGate}/${pEarthGate} | ${dSunGate}/${dEarthGate}`;
 
   // 从数据库查找完整名称（优先使用数据库）
-  const crossesDB = loadIncarnationCrosses();
-  const found = crossesDB.find(cross => cross.key === key);
+  const profile = `${pSunLine}/${design.Sun.line}`;
+  const found = findIncarnationCross(pSunGate, profile, key);
 
   let crossType = '';
   let crossNameEN = '';
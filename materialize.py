@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输出文件的生成方式（复制 / 硬链接 / reflink / 移动）
+硬链接和 reflink 不复制文件内容，生成几千篇文章的输出目录几乎是瞬间完成，也不占用额外空间
+
+    copy      复制文件（shutil.copy2）
+    hardlink  硬链接，与源文件共用同一份数据；跨磁盘等不支持时退回复制
+    reflink   写时复制克隆（Linux btrfs/XFS 的 FICLONE、macOS APFS 的 clonefile），
+              修改任一文件不影响另一个；不支持时退回复制
+    move      移动（同一磁盘内只是改名）
+
+硬链接和 reflink 只在源文件和输出在同一个卷（同一个盘符 / 同一个文件系统）上时有效，
+跨卷时每个文件都会先失败一次再复制，用 resolve_mode() 提前判断，直接按复制处理
+"""
+import os
+import sys
+import errno
+import shutil
+
+MODES = ('copy', 'hardlink', 'reflink', 'move')
+
+# Linux ioctl FICLONE = _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+def _reflink_linux(src, dest):
+    import fcntl
+    with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.remove(dest)
+            raise
+    shutil.copystat(src, dest)
+
+def _reflink_macos(src, dest):
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.clonefile(os.fsencode(src), os.fsencode(dest), 0) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err), dest)
+
+def reflink(src, dest):
+    """创建写时复制克隆，文件系统不支持时抛出 OSError"""
+    if sys.platform.startswith('linux'):
+        _reflink_linux(src, dest)
+    elif sys.platform == 'darwin':
+        _reflink_macos(src, dest)
+    else:
+        raise OSError(errno.EOPNOTSUPP, "当前系统不支持 reflink", dest)
+
+def _remove_existing(dest):
+    """硬链接和 clonefile 要求目标不存在"""
+    if os.path.lexists(dest):
+        os.remove(dest)
+
+def resolve_mode(src_dir, dest_dir, mode):
+    """
+    源目录和输出目录不在同一个卷时，hardlink / reflink 不可能成功，返回 'copy'；其他情况返回 mode
+    目录无法访问时不做判断，原样返回
+    """
+    if mode not in ('hardlink', 'reflink'):
+        return mode
+    try:
+        same_volume = os.stat(src_dir).st_dev == os.stat(dest_dir).st_dev
+    except OSError:
+        return mode
+    return mode if same_volume else 'copy'
+
+def materialize(src, dest, mode='copy'):
+    """
+    按指定方式把 src 生成到 dest（已存在则覆盖）
+    返回实际使用的方式：'copy' / 'hardlink' / 'reflink' / 'move'
+    """
+    if mode not in MODES:
+        raise ValueError(f"未知的生成方式: {mode}（可选: {', '.join(MODES)}）")
+
+    if mode == 'move':
+        # 目标是源文件的硬链接时 rename 什么也不做，源文件会留在原处
+        if os.path.lexists(dest) and os.path.samefile(src, dest):
+            os.remove(src)
+            return 'move'
+        shutil.move(src, dest)
+        return 'move'
+
+    if mode == 'hardlink':
+        if os.path.lexists(dest) and os.path.samefile(src, dest):
+            return 'hardlink'
+        _remove_existing(dest)
+        try:
+            os.link(src, dest)
+            return 'hardlink'
+        except OSError:
+            pass
+
+    elif mode == 'reflink':
+        _remove_existing(dest)
+        try:
+            reflink(src, dest)
+            return 'reflink'
+        except (OSError, AttributeError):
+            pass
+
+    # 先删除旧文件：如果它是源文件的硬链接，直接覆盖写入会连源文件一起改掉
+    _remove_existing(dest)
+    shutil.copy2(src, dest)
+    return 'copy'
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+闸门/通道/轮回交叉 文章索引
+把 64 个闸门、36 条通道和所有轮回交叉名称的各种写法编译成一个多关键词自动机，
+每篇文章只扫描一遍，输出 实体 -> {文章: [出现位置, ...]} 的倒排文件；
+之后根据人类图查相关文章只是一次字典查找
+
+按 文件大小+修改时间 增量更新，只重新扫描变化过的文章；闸门/通道/交叉数据变化时全部重扫。
+要重新扫描的文章在文章包（article_pack.py）中未变化时从包中读取，不打开原文件
+
+    python mention_index.py                  # 更新索引
+    python mention_index.py gate:34 channel:20-34
+"""
+import os
+import sys
+import json
+import hashlib
+
+from article_manifest import iter_markdown_files, file_signature
+from article_pack import PACK_PATH, open_pack, packed_entry, read_article
+from hd_terms import mention_patterns
+from multi_pattern import AhoCorasick
+from parallel_scan import parallel_map
+
+# 配置路径
+KB_ROOT = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库"
+INDEX_PATH = os.path.join(KB_ROOT, "01_核心理论", "人类图实体索引.json")
+CACHE_PATH = os.path.join(KB_ROOT, "01_核心理论", ".人类图实体索引缓存.json")
+
+INDEX_VERSION = 1
+
+_automaton = None
+
+def _get_automaton():
+    """实体自动机（每个进程只编译一次）"""
+    global _automaton
+    if _automaton is None:
+        _automaton = AhoCorasick(mention_patterns())
+    return _automaton
+
+def patterns_digest():
+    """所有写法的摘要，数据变化时缓存失效"""
+    digest = hashlib.blake2b(digest_size=16)
+    for entity, text in mention_patterns():
+        digest.update(f"{entity}\0{text}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def find_mentions(content):
+    """
+    文章中提到的实体：{实体: [起始位置, ...]}
+    数字写法前后紧挨数字的不算；同一实体相互重叠的写法（如"第34闸门"和"34闸门"）只记一次
+    """
+    mentions = {}
+    last_end = {}
+    for start, end, entity in _get_automaton().iter_matches(content):
+        text = content[start:end]
+        if text[0].isdigit() and start > 0 and content[start - 1].isdigit():
+            continue
+        if text[-1].isdigit() and end < len(content) and content[end].isdigit():
+            continue
+        positions = mentions.setdefault(entity, [])
+        if start < last_end.get(entity, -1):
+            # 与同一实体的上一处重叠：合并为一处，取较早的起始位置
+            positions[-1] = min(positions[-1], start)
+            last_end[entity] = max(last_end[entity], end)
+        else:
+            positions.append(start)
+            last_end[entity] = end
+    return mentions
+
+def scan_article(item):
+    """读取一篇文章并查找实体（在子进程中运行），item 为 (路径, 文章包路径, 包中的条目或 None)"""
+    file_path, pack_path, entry = item
+    try:
+        return {'mentions': find_mentions(read_article(file_path, entry, pack_path))}
+    except Exception as e:
+        return {'error': str(e)}
+
+def load_cache(cache_path, digest):
+    """读取上次的扫描结果 {路径: {'sig', 'mentions'}}，版本或数据不一致时返回空"""
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != INDEX_VERSION or cache.get('patterns') != digest:
+        return {}
+    return cache.get('articles', {})
+
+def _write_json(path, data):
+    """写入 JSON（先写临时文件再替换）"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def build_postings(articles):
+    """由每篇文章的实体生成倒排：{实体: {文章路径: [位置, ...]}}，实体和文章都按顺序排列"""
+    postings = {}
+    for path in sorted(articles):
+        for entity, positions in articles[path]['mentions'].items():
+            postings.setdefault(entity, {})[path] = positions
+    return {entity: postings[entity] for entity in sorted(postings)}
+
+def update_index(root_dir=KB_ROOT, index_path=INDEX_PATH, cache_path=CACHE_PATH, pack_path=PACK_PATH):
+    """
+    增量更新索引，返回 {'articles': 文章数, 'rescanned': 重新扫描数, 'from_pack': 其中从文章包读取的数量,
+                        'entities': 实体数, 'failed': [...]}
+    """
+    digest = patterns_digest()
+    cached = load_cache(cache_path, digest)
+
+    articles = {}
+    changed = []
+    for path, name, st in iter_markdown_files(root_dir):
+        sig = file_signature(st)
+        entry = cached.get(path)
+        if entry and entry['sig'] == sig:
+            articles[path] = entry
+        else:
+            changed.append((path, sig))
+
+    pack = open_pack(pack_path) if changed else None
+    changed = [(path, sig, packed_entry(pack, path, sig)) for path, sig in changed]
+    if pack is not None:
+        pack.close()
+    # 包中未变化的文章排在前面并按在包中的位置排序，读取包文件时基本是顺序读取
+    changed.sort(key=lambda item: (item[2] is None, item[2]['offset'] if item[2] else 0))
+    from_pack = sum(1 for path, sig, entry in changed if entry is not None)
+
+    failed = []
+    results = parallel_map(scan_article, [(path, pack_path, entry) for path, sig, entry in changed])
+    for (path, sig, entry), result in zip(changed, results):
+        if 'error' in result:
+            failed.append((path, result['error']))
+            continue
+        articles[path] = {'sig': sig, 'mentions': result['mentions']}
+
+    postings = build_postings(articles)
+    _write_json(index_path, {'version': INDEX_VERSION, 'postings': postings})
+    _write_json(cache_path, {'version': INDEX_VERSION, 'patterns': digest, 'articles': articles})
+
+    return {
+        'articles': len(articles),
+        'rescanned': len(changed) - len(failed),
+        'from_pack': from_pack,
+        'entities': len(postings),
+        'failed': failed
+    }
+
+def load_postings(index_path=INDEX_PATH):
+    """读取倒排文件：{实体: {文章路径: [位置, ...]}}"""
+    with open(index_path, 'r', encoding='utf-8') as f:
+        return json.load(f)['postings']
+
+def main():
+    if len(sys.argv) > 1:
+        postings = load_postings(INDEX_PATH)
+        for entity in sys.argv[1:]:
+            articles = postings.get(entity, {})
+            print(f"\n{entity}: {len(articles)} 篇文章")
+            for path, positions in articles.items():
+                print(f"  {os.path.basename(path)}（{len(positions)} 处）")
+        return
+
+    print("=" * 80)
+    print("更新闸门/通道/交叉文章索引")
+    print("=" * 80)
+
+    stats = update_index(KB_ROOT, INDEX_PATH, CACHE_PATH)
+
+    for path, error in stats['failed']:
+        print(f"❌ 读取文件失败: {path}")
+        print(f"   错误: {error}")
+
+    print(f"\n文章: {stats['articles']} 篇（重新扫描 {stats['rescanned']} 篇，其中 {stats['from_pack']} 篇读自文章包）")
+    print(f"提到的实体: {stats['entities']} 个")
+    print(f"索引已保存到: {INDEX_PATH}")
+
+if __name__ == "__main__":
+    main()
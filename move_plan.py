@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+两阶段批量移动：先生成计划（JSONL），再按计划执行
+    1. 计划阶段只读文件、不动文件，可以随时重跑
+    2. 执行阶段按计划逐条移动，每完成一条记入日志文件（批量 fsync）；
+       中途崩溃后重跑会跳过已完成的条目，已经移动过但来不及记日志的条目也能识别出来
+"""
+import os
+import json
+
+# 每执行多少条 fsync 一次日志
+FSYNC_BATCH = 200
+
+def journal_path_for(plan_path):
+    """执行日志与计划文件放在一起"""
+    return plan_path + '.done'
+
+def write_plan(plan_path, entries, header=None):
+    """
+    写入计划文件：第一行为计划信息，之后每行一条 {'id', 'src', 'dest', ...}
+    先写临时文件再替换，同时清除旧计划的执行日志
+    """
+    tmp_path = plan_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'type': 'header', 'count': len(entries), **(header or {})},
+                           ensure_ascii=False) + '\n')
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, plan_path)
+
+    journal_path = journal_path_for(plan_path)
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+
+def load_plan(plan_path):
+    """读取计划文件，返回 (计划信息, 条目列表)"""
+    header = {}
+    entries = []
+    with open(plan_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get('type') == 'header':
+                header = record
+            else:
+                entries.append(record)
+    return header, entries
+
+def load_done(journal_path):
+    """
+    读取已完成条目的 id
+    最后一行可能因崩溃只写了一半（例如 "12" 只写了 "1"），没有换行结尾的行不算
+    """
+    done = set()
+    if not os.path.exists(journal_path):
+        return done
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.endswith('\n') and line.strip().isdigit():
+                done.add(int(line))
+    return done
+
+def _truncate_partial_line(journal_path):
+    """截掉上次崩溃留下的半行，避免和本次写入的 id 连在一起"""
+    if not os.path.exists(journal_path):
+        return
+    with open(journal_path, 'r+b') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+def _fsync_dirs(dirs):
+    """同步目录项，保证改名操作落盘（Windows 不支持打开目录，跳过）"""
+    for directory in dirs:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+def apply_plan(plan_path, action, dry_run=False, fsync_batch=FSYNC_BATCH):
+    """
+    按计划执行 action(src, dest)，返回统计结果：
+        {'applied': 本次执行数, 'resumed': 之前已完成数, 'failed': [(条目, 错误信息), ...]}
+
+    dry_run=True 时只读取计划和日志，打印将要执行的操作，不访问任何文章文件
+    """
+    header, entries = load_plan(plan_path)
+    journal_path = journal_path_for(plan_path)
+    done = load_done(journal_path)
+
+    stats = {'applied': 0, 'resumed': 0, 'failed': []}
+    pending = [entry for entry in entries if entry['id'] not in done]
+    stats['resumed'] = len(entries) - len(pending)
+
+    if dry_run:
+        for entry in pending:
+            print(f"  [计划] {entry['src']} -> {entry['dest']}")
+        stats['pending'] = len(pending)
+        return stats
+
+    touched_dirs = set()
+    _truncate_partial_line(journal_path)
+    with open(journal_path, 'a', encoding='utf-8') as journal:
+        unsynced = 0
+        for entry in pending:
+            src, dest = entry['src'], entry['dest']
+            try:
+                if not os.path.exists(src) and os.path.exists(dest):
+                    # 上次已经移动完成，只是没来得及写日志
+                    stats['resumed'] += 1
+                else:
+                    action(src, dest)
+                    stats['applied'] += 1
+                    touched_dirs.add(os.path.dirname(dest))
+                    touched_dirs.add(os.path.dirname(src))
+            except Exception as e:
+                stats['failed'].append((entry, str(e)))
+                continue
+
+            journal.write(f"{entry['id']}\n")
+            unsynced += 1
+            if unsynced >= fsync_batch:
+                _fsync_dirs(touched_dirs)
+                journal.flush()
+                os.fsync(journal.fileno())
+                unsynced = 0
+
+        _fsync_dirs(touched_dirs)
+        journal.flush()
+        os.fsync(journal.fileno())
+
+    return stats
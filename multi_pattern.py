@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多模式字符串匹配（Aho-Corasick 自动机）
+把任意数量的关键词编译成一个自动机，一次扫描文本就能找出所有关键词的出现位置
+"""
+import re
+from collections import deque
+
+class AhoCorasick:
+    """
+    patterns: 可迭代的 (标识, 关键词)，同一个关键词可以对应多个标识
+
+    扫描时处于根状态（没有部分匹配）的位置，直接用正则跳到下一个可能开始匹配的字符，
+    中文正文里大部分字符都可以这样在C层面跳过
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for key, word in patterns:
+            if not word:
+                continue
+            state = 0
+            for ch in word:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = nxt
+            self._output[state] += ((key, len(word)),)
+
+        # 广度优先计算失败指针（根的子状态失败指针为根），并把失败状态的输出合并进来
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._output[nxt] += self._output[self._fail[nxt]]
+
+        first_chars = ''.join(sorted(self._goto[0]))
+        self._skip = re.compile('[' + re.escape(first_chars) + ']') if first_chars else None
+
+    def __bool__(self):
+        return bool(self._goto[0])
+
+    def iter_matches(self, text, start=0, end=None):
+        """
+        按结束位置顺序产出所有匹配（包括相互重叠的匹配）：(起始位置, 结束位置, 标识)
+        """
+        if self._skip is None:
+            return
+        end = len(text) if end is None else end
+        goto, fail, output = self._goto, self._fail, self._output
+        skip = self._skip.search
+
+        state = 0
+        i = start
+        while i < end:
+            if state == 0:
+                m = skip(text, i, end)
+                if m is None:
+                    return
+                i = m.start()
+            ch = text[i]
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            i += 1
+            if output[state]:
+                for key, length in output[state]:
+                    yield i - length, i, key
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+近似重复文章检测（MinHash + LSH）
+同一篇文章以不同URL转载时 source_url 不同，按URL去重无法发现。
+这里把正文切成中文字符 n-gram，计算 MinHash 签名，再用 LSH 分桶找出候选对，
+不需要两两比较所有文章，可以扩展到数万篇
+
+签名可以用 signature_to_text() 存入清单，文件未变化时直接复用（deduplicate_articles.py），
+只对新增或修改的文章用 article_signature() 读取正文计算签名，再用 cluster_signatures() 分桶。
+单独运行时，在文章包（article_pack.py）中未变化的文章从包中读取
+"""
+import os
+import re
+import base64
+import hashlib
+from array import array
+from collections import defaultdict
+
+from article_manifest import file_signature
+from article_pack import PACK_PATH, open_pack, packed_entry, read_article
+
+# 配置路径
+ARTICLES_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章_去重后"
+REPORT_NAME = "近似重复报告.txt"
+
+# 默认参数
+NGRAM = 5            # 字符 n-gram 长度
+NUM_PERM = 128       # 签名长度
+THRESHOLD = 0.8      # Jaccard 相似度阈值
+
+_EMPTY = (1 << 64) - 1
+_FRONTMATTER_RE = re.compile(r'\A---\s*\n.*?\n---\s*\n', re.S)
+
+def normalize_text(text):
+    """去掉 YAML 头，只保留文字和数字（去掉空白、标点和 Markdown 符号）"""
+    text = _FRONTMATTER_RE.sub('', text, count=1)
+    return ''.join(ch for ch in text if ch.isalnum())
+
+def shingle_hashes(text, ngram=NGRAM):
+    """把文本切成字符 n-gram，返回去重后的 64 位哈希集合"""
+    text = normalize_text(text)
+    if len(text) < ngram:
+        grams = {text} if text else set()
+    else:
+        grams = {text[i:i + ngram] for i in range(len(text) - ngram + 1)}
+    return {
+        int.from_bytes(hashlib.blake2b(g.encode('utf-8'), digest_size=8).digest(), 'little')
+        for g in grams
+    }
+
+def minhash_signature(hashes, num_perm=NUM_PERM):
+    """
+    计算 MinHash 签名（单次哈希 + 分箱 + 致密化，One Permutation Hashing）
+    每个 n-gram 只哈希一次，按哈希值分到 num_perm 个箱子，每个箱子取最小值；
+    空箱子从右侧最近的非空箱子借值，保证签名可以逐位比较
+    返回 array('Q')，空文本返回 None
+    """
+    if not hashes:
+        return None
+
+    sig = array('Q', [_EMPTY]) * num_perm
+    for h in hashes:
+        b = h % num_perm
+        v = h // num_perm
+        if v < sig[b]:
+            sig[b] = v
+
+    if _EMPTY in sig:
+        filled = list(sig)
+        for i in range(num_perm):
+            if sig[i] != _EMPTY:
+                continue
+            for dist in range(1, num_perm):
+                j = (i + dist) % num_perm
+                if sig[j] != _EMPTY:
+                    # 借用的值加上偏移量，避免不同空箱子总是取到同一个值
+                    filled[i] = (sig[j] + dist * 0x9E3779B97F4A7C15) & 0x1FFFFFFFFFFFFFF
+                    break
+        sig = array('Q', filled)
+
+    return sig
+
+def signature_to_text(sig):
+    """签名转成可存入 JSON 的文本（None 转为 ''）"""
+    return base64.b64encode(sig.tobytes()).decode('ascii') if sig is not None else ''
+
+def signature_from_text(text):
+    """signature_to_text() 的逆操作"""
+    if not text:
+        return None
+    sig = array('Q')
+    sig.frombytes(base64.b64decode(text))
+    return sig
+
+def article_signature(file_path, ngram=NGRAM, num_perm=NUM_PERM):
+    """
+    读取一篇文章计算签名文本（模块顶层函数，可以用 parallel_map 在子进程中运行）
+    正文为空时返回 ''，读取失败时返回 None
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except Exception as e:
+        print(f"❌ 读取文件失败: {file_path}")
+        print(f"   错误: {e}")
+        return None
+    return signature_to_text(minhash_signature(shingle_hashes(text, ngram), num_perm))
+
+def estimate_jaccard(sig_a, sig_b):
+    """用签名中相等位置的比例估计 Jaccard 相似度"""
+    same = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+    return same / len(sig_a)
+
+def choose_bands(num_perm, threshold):
+    """
+    选择 LSH 的分段数 b 和每段行数 r（b * r = num_perm），
+    使 S 曲线的拐点 (1/b)^(1/r) 最接近阈值
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        turning_point = (1 / bands) ** (1 / rows)
+        score = abs(turning_point - threshold)
+        if best is None or score < best[0]:
+            best = (score, bands, rows)
+    return best[1], best[2]
+
+def find_near_duplicates(documents, threshold=THRESHOLD, num_perm=NUM_PERM, ngram=NGRAM):
+    """
+    查找近似重复文章
+
+    documents: 可迭代的 (文章ID, 文本)，逐篇处理，不会同时保留所有正文
+    返回簇列表，按簇大小降序：
+        [{'members': [文章ID, ...], 'similarity': {文章ID: 与第一篇的相似度}}, ...]
+    """
+    signatures = (
+        (doc_id, minhash_signature(shingle_hashes(text, ngram), num_perm))
+        for doc_id, text in documents
+    )
+    return cluster_signatures(signatures, threshold, num_perm)
+
+def cluster_signatures(signatures, threshold=THRESHOLD, num_perm=NUM_PERM):
+    """
+    按已算好的签名查找近似重复文章
+    signatures: 可迭代的 (文章ID, 签名)，签名为 None 的文章跳过；返回值与 find_near_duplicates() 相同
+    """
+    bands, rows = choose_bands(num_perm, threshold)
+
+    doc_ids = []
+    signatures_by_index = []
+    buckets = defaultdict(list)
+
+    for doc_id, sig in signatures:
+        if sig is None:
+            continue
+        index = len(doc_ids)
+        doc_ids.append(doc_id)
+        signatures_by_index.append(sig)
+        for band in range(bands):
+            key = (band, sig[band * rows:(band + 1) * rows].tobytes())
+            buckets[key].append(index)
+
+    # 同一个桶里的文章是候选对，只对候选对计算相似度
+    parent = list(range(len(doc_ids)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    checked = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for pos, a in enumerate(members):
+            for b in members[pos + 1:]:
+                if (a, b) in checked:
+                    continue
+                checked.add((a, b))
+                if estimate_jaccard(signatures_by_index[a], signatures_by_index[b]) >= threshold:
+                    root_a, root_b = find(a), find(b)
+                    if root_a != root_b:
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups = defaultdict(list)
+    for i in range(len(doc_ids)):
+        groups[find(i)].append(i)
+
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        head = members[0]
+        clusters.append({
+            'members': [doc_ids[i] for i in members],
+            'similarity': {
+                doc_ids[i]: estimate_jaccard(signatures_by_index[head], signatures_by_index[i])
+                for i in members
+            },
+        })
+
+    clusters.sort(key=lambda c: -len(c['members']))
+    return clusters
+
+def write_cluster_report(report_path, clusters, titles=None, threshold=THRESHOLD):
+    """保存近似重复簇报告，titles 为 {文章ID: 标题}"""
+    titles = titles or {}
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write("近似重复文章报告\n")
+        f.write("=" * 80 + "\n\n")
+        f.write(f"相似度阈值: {threshold}\n")
+        f.write(f"近似重复簇: {len(clusters)} 个\n")
+        f.write(f"涉及文章: {sum(len(c['members']) for c in clusters)} 篇\n\n")
+
+        for i, cluster in enumerate(clusters, 1):
+            f.write(f"簇 {i}（{len(cluster['members'])} 篇）\n")
+            for doc_id in cluster['members']:
+                sim = cluster['similarity'][doc_id]
+                title = titles.get(doc_id, os.path.basename(str(doc_id)))
+                f.write(f"  [{sim:.2f}] {title}\n")
+                f.write(f"         {doc_id}\n")
+            f.write("\n")
+
+def iter_article_texts(paths, pack_path=PACK_PATH):
+    """逐篇读取文章正文（在文章包中未变化的从包中读取），读取失败的文章跳过"""
+    pack = open_pack(pack_path)
+    for file_path in paths:
+        try:
+            entry = packed_entry(pack, file_path, file_signature(os.stat(file_path)))
+            yield file_path, read_article(file_path, entry, pack_path)
+        except Exception as e:
+            print(f"❌ 读取文件失败: {file_path}")
+            print(f"   错误: {e}")
+    if pack is not None:
+        pack.close()
+
+def main():
+    print("=" * 80)
+    print("近似重复文章检测")
+    print("=" * 80)
+
+    paths = [
+        os.path.join(ARTICLES_DIR, file)
+        for file in sorted(os.listdir(ARTICLES_DIR))
+        if file.endswith('.md')
+    ]
+    print(f"\n共 {len(paths)} 篇文章，阈值 {THRESHOLD}")
+
+    clusters = find_near_duplicates(iter_article_texts(paths))
+
+    print(f"\n发现 {len(clusters)} 个近似重复簇")
+    for i, cluster in enumerate(clusters, 1):
+        names = ', '.join(os.path.basename(p) for p in cluster['members'])
+        print(f"  {i}. {names}")
+
+    report_path = os.path.join(ARTICLES_DIR, REPORT_NAME)
+    write_cluster_report(report_path, clusters)
+    print(f"\n报告已保存到: {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章脚本共用的并行扫描层
+用进程池把"读取文件 + 正则提取"分散到多个CPU核心，按块分发任务，
+结果按输入顺序返回，保证输出与单线程运行完全一致
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# 进程数：环境变量 ARTICLE_SCAN_WORKERS 优先，默认使用全部CPU核心；设为 1 则单进程运行
+WORKERS_ENV = 'ARTICLE_SCAN_WORKERS'
+
+# 文件数少于这个值时直接单进程处理（启动进程池的开销比扫描本身还大）
+MIN_PARALLEL_ITEMS = 64
+
+# 每个进程平均分到的块数，块越多负载越均衡，块越少进程间通信越少
+CHUNKS_PER_WORKER = 4
+
+def default_workers():
+    """读取进程数配置"""
+    value = os.environ.get(WORKERS_ENV)
+    if value:
+        try:
+            return max(1, int(value))
+        except ValueError:
+            print(f"⚠️  {WORKERS_ENV}={value} 不是有效数字，使用默认值")
+    return os.cpu_count() or 1
+
+def chunk_size_for(item_count, workers):
+    """按进程数计算每块的任务数"""
+    return max(1, -(-item_count // (workers * CHUNKS_PER_WORKER)))
+
+def parallel_map(func, items, workers=None, chunksize=None):
+    """
+    并行执行 func(item)，按 items 的顺序返回结果列表
+
+    func 必须是模块顶层函数（子进程需要能导入它）；
+    调用方脚本必须有 if __name__ == "__main__" 保护（Windows 下子进程会重新导入主模块）
+    """
+    items = list(items)
+    workers = workers or default_workers()
+
+    if workers <= 1 or len(items) < MIN_PARALLEL_ITEMS:
+        return [func(item) for item in items]
+
+    workers = min(workers, len(items))
+    chunksize = chunksize or chunk_size_for(len(items), workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # executor.map 按输入顺序产出结果，不受完成先后影响
+        return list(executor.map(func, items, chunksize=chunksize))
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+收费文章判断（单次扫描，多关键词同时匹配）
+所有固定关键词编译成一个 Aho-Corasick 自动机，"上文N字…下文M字" 由触发词"上文"引出后
+在原位置做一次锚定匹配；每篇文章只扫描一遍，并报告命中的规则和位置
+
+规则分两套：
+    loose  —— find_paid_articles.py 初筛用（宽松，"付费""购买"等都算）
+    strict —— recheck_paid_articles.py 复核用（必须包含明确的付费标识）
+
+find_first_marker_bytes() 用同样的规则直接在字节上查找（一个正则），用于 mmap 打开的大文件，不必整篇解码
+"""
+import re
+from collections import namedtuple
+
+from multi_pattern import AhoCorasick
+
+# name: 规则名，marker: 固定关键词或触发词，pattern: 触发后在触发位置锚定匹配的正则（固定关键词为 None）
+Rule = namedtuple('Rule', ['name', 'marker', 'pattern'])
+
+# rule: 命中的规则名，start/end: 在文章中的字符位置，text: 命中的文字
+PaywallMatch = namedtuple('PaywallMatch', ['rule', 'start', 'end', 'text'])
+
+# "(上文2520字，下文12512字)" 这类字数统计（同一行内）
+WORD_COUNT_PATTERN = r'上文.*字.*下文.*字'
+
+# 收费文章的关键词（会出现在收费文章中）
+LOOSE_RULES = [
+    Rule('付费', '付费', None),
+    Rule('收费', '收费', None),
+    Rule('付费提示', '准备好了吗？准备好了，就付费吧', None),
+    Rule('字数统计', '上文', WORD_COUNT_PATTERN),  # 如：(上文2520字，下文12512字)
+    Rule('付费阅读', '付费阅读', None),
+    Rule('价格', '¥', None),
+    Rule('单价', '元/篇', None),
+    Rule('购买', '购买', None),
+]
+
+# 严格的收费文章标识（必须包含）
+STRICT_RULES = [
+    Rule('下文为付费阅读', '下文为付费阅读', None),
+    Rule('付费阅读', '付费阅读', None),
+    Rule('付费提示', '准备好了吗？准备好了，就付费吧', None),
+    Rule('付费后可见', '付费后可见', None),
+    Rule('付费内容', '付费内容', None),
+    Rule('以下为付费', '以下为付费', None),
+]
+
+PROFILES = {
+    'loose': LOOSE_RULES,
+    'strict': STRICT_RULES,
+}
+
+_engines = {}
+
+def _get_engine(profile):
+    """按规则集编译自动机和触发后的正则（每个进程只编译一次）"""
+    engine = _engines.get(profile)
+    if engine is None:
+        rules = PROFILES[profile]
+        automaton = AhoCorasick((rule, rule.marker) for rule in rules)
+        patterns = {rule: re.compile(rule.pattern) for rule in rules if rule.pattern}
+        engine = _engines[profile] = (automaton, patterns)
+    return engine
+
+def iter_markers(content, profile='loose'):
+    """按位置顺序产出文章中所有命中的付费标识（PaywallMatch）"""
+    automaton, patterns = _get_engine(profile)
+    for start, end, rule in automaton.iter_matches(content):
+        pattern = patterns.get(rule)
+        if pattern is not None:
+            match = pattern.match(content, start)
+            if match is None:
+                continue
+            end = match.end()
+        yield PaywallMatch(rule.name, start, end, content[start:end])
+
+def find_first_marker(content, profile='loose'):
+    """返回第一个付费标识（PaywallMatch），没有则返回 None；找到即停止扫描"""
+    return next(iter_markers(content, profile), None)
+
+_byte_engines = {}
+
+def _get_byte_engine(profile):
+    """
+    规则集的字节正则：整体正则（每条规则一个分组）用来找最左边的命中，
+    每条规则的触发词正则和锚定正则用来在这个命中范围内按自动机的顺序（触发词结束位置）选出第一个
+    """
+    engine = _byte_engines.get(profile)
+    if engine is None:
+        rules = PROFILES[profile]
+        full = [rule.pattern.encode('utf-8') if rule.pattern else re.escape(rule.marker.encode('utf-8'))
+                for rule in rules]
+        combined = re.compile(b'|'.join(b'(?:' + p + b')' for p in full))
+        triggers = [re.compile(re.escape(rule.marker.encode('utf-8'))) for rule in rules]
+        anchored = [re.compile(p) for p in full]
+        engine = _byte_engines[profile] = (combined, rules, triggers, anchored)
+    return engine
+
+def find_first_marker_bytes(buf, profile='loose'):
+    """
+    在 bytes / mmap 中查找第一个付费标识，返回 PaywallMatch（start/end 为字节位置），没有则返回 None
+    与 find_first_marker() 对同一篇文章命中同一条规则
+    """
+    combined, rules, triggers, anchored = _get_byte_engine(profile)
+    leftmost = combined.search(buf)
+    if leftmost is None:
+        return None
+
+    # 自动机按触发词的结束位置产出，第一个命中一定从 leftmost 开始之后、在 leftmost 结束之前触发
+    best = None
+    for rule, trigger, pattern in zip(rules, triggers, anchored):
+        pos = leftmost.start()
+        while True:
+            hit = trigger.search(buf, pos, leftmost.end())
+            if hit is None:
+                break
+            match = pattern.match(buf, hit.start())
+            if match is not None:
+                if best is None or hit.end() < best[0]:
+                    best = (hit.end(), rule, match)
+                break
+            pos = hit.start() + 1
+    end, rule, match = best
+    return PaywallMatch(rule.name, match.start(), match.end(), match.group().decode('utf-8', 'replace'))
+
+def marker_context(content, match, width=20):
+    """付费标识前后的文字（用于人工确认）"""
+    start = max(0, match.start - width)
+    end = min(len(content), match.end + width)
+    return content[start:end].replace('\n', ' ')
+
+def marker_context_bytes(buf, match, width=20):
+    """find_first_marker_bytes() 结果前后的文字（按字节截取，截断的字符丢弃）"""
+    start = max(0, match.start - width * 4)
+    end = min(len(buf), match.end + width * 4)
+    before = bytes(buf[start:match.start]).decode('utf-8', 'ignore')[-width:]
+    after = bytes(buf[match.end:end]).decode('utf-8', 'ignore')[:width]
+    return (before + match.text + after).replace('\n', ' ')
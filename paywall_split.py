@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+收费文章的免费/付费分界
+一次扫描找到付费分界标识（"下文为付费阅读"、"准备好了吗？准备好了，就付费吧"、
+"(上文N字，下文M字)"），给出免费部分的结束位置、上文/下文字数和可直接索引的免费部分正文
+
+直接在字节上匹配，既可以用已读入的 bytes，也可以用 mmap（大文件不必整个读进内存）；
+open_article() 按文件大小决定读入还是 mmap，分类和复核都通过它打开文章
+
+收费文章的免费部分由 find_paid_articles.py 写入收费文章目录中的 FREE_SEGMENTS_NAME（JSONL），
+每行带文件的 大小+修改时间，recheck_paid_articles.py 用 load_free_segments() 读取，文件未变化时不再打开
+"""
+import os
+import re
+import json
+import mmap
+import codecs
+import contextlib
+from collections import namedtuple
+
+from article_frontmatter import MAX_HEADER_CHARS, parse_frontmatter
+from paywall_classifier import WORD_COUNT_PATTERN
+
+# 超过这个大小的文件用 mmap 扫描
+MMAP_THRESHOLD = 1024 * 1024
+
+# 收费文章免费部分的输出文件名（保存在收费文章目录）
+FREE_SEGMENTS_NAME = "收费文章免费部分.jsonl"
+
+# 付费部分开始的标识；免费部分截止到标识所在行的行首
+BOUNDARY_MARKERS = [
+    '下文为付费阅读',
+    '准备好了吗？准备好了，就付费吧',
+]
+
+# 在分界行之后多远以内查找上文/下文字数
+WORD_COUNT_WINDOW = 1024
+
+# rule: 命中的标识，free_end: 免费部分结束的字节位置（分界行行首），
+# words_before / words_after: "(上文N字，下文M字)" 中的 N / M（没有时为 None），
+# free_text: 免费部分正文（不含 YAML 头）
+PaywallSplit = namedtuple('PaywallSplit', ['rule', 'free_end', 'words_before', 'words_after', 'free_text'])
+
+# 字数统计只在同一行内匹配（与 paywall_classifier 的字数统计规则一致）
+_WORD_COUNT_BYTES = WORD_COUNT_PATTERN.replace('.', '[^\n]').encode('utf-8')
+_BOUNDARY_RE = re.compile(
+    b'|'.join([re.escape(marker.encode('utf-8')) for marker in BOUNDARY_MARKERS]
+              + [b'(?:' + _WORD_COUNT_BYTES + b')'])
+)
+_WORD_COUNTS_RE = re.compile(r'上文\s*(\d+)\s*字[^\n]*?下文\s*(\d+)\s*字'.encode('utf-8'))
+
+def body_start(buf, body_offset):
+    """把 ArticleHeader.body_offset（字符位置，不含BOM）换算成字节位置"""
+    start = len(codecs.BOM_UTF8) if buf[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+    if not body_offset:
+        return start
+    # 每个字符最多 4 个字节
+    head = bytes(buf[start:start + body_offset * 4]).decode('utf-8', 'ignore')
+    return start + len(head[:body_offset].encode('utf-8'))
+
+def split_paywall(buf, body_start=0):
+    """
+    在 buf（bytes 或 mmap）中查找付费分界，返回 PaywallSplit；没有分界标识时返回 None
+    body_start 为正文开始的字节位置，免费部分正文从这里开始
+    """
+    match = _BOUNDARY_RE.search(buf, body_start)
+    if match is None:
+        return None
+
+    free_end = max(buf.rfind(b'\n', body_start, match.start()) + 1, body_start)
+    marker = match.group()
+    rule = next((m for m in BOUNDARY_MARKERS if m.encode('utf-8') == marker), '字数统计')
+
+    words_before = words_after = None
+    counts = _WORD_COUNTS_RE.search(buf, free_end, match.end() + WORD_COUNT_WINDOW)
+    if counts:
+        words_before, words_after = int(counts.group(1)), int(counts.group(2))
+
+    free_text = bytes(buf[body_start:free_end]).decode('utf-8', 'replace').strip()
+    return PaywallSplit(rule, free_end, words_before, words_after, free_text)
+
+def _split_buffer(buf):
+    head = bytes(buf[:MAX_HEADER_CHARS * 4]).decode('utf-8', 'ignore')
+    return split_paywall(buf, body_start(buf, parse_frontmatter(head).body_offset))
+
+@contextlib.contextmanager
+def open_article(file_path, mmap_threshold=MMAP_THRESHOLD):
+    """
+    打开文章，产出文件内容：小于 mmap_threshold 的文件读入为 bytes，大文件为只读 mmap
+    （调用方用 isinstance(buf, bytes) 区分；mmap 在 with 结束时关闭）
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < mmap_threshold or size == 0:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+def split_paywall_file(file_path, mmap_threshold=MMAP_THRESHOLD):
+    """读取文章并查找付费分界；大文件用 mmap 扫描"""
+    with open_article(file_path, mmap_threshold) as buf:
+        return _split_buffer(buf) if len(buf) else None
+
+def save_free_segments(segments_path, records):
+    """写入收费文章免费部分（每行一篇，先写临时文件再替换）"""
+    tmp_path = segments_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, segments_path)
+
+def append_free_segment(segments_path, record):
+    """在文件末尾追加一篇（同一文件名的多条记录以最后一条为准，见 load_free_segments）"""
+    with open(segments_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+def load_free_segments(segments_path):
+    """读取收费文章免费部分：{文件名: 记录}，文件不存在时返回空字典"""
+    segments = {}
+    if not os.path.exists(segments_path):
+        return segments
+    with open(segments_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                segments[record['file']] = record
+    return segments
@@ -2,31 +2,72 @@
 # -*- coding: utf-8 -*-
 """
 重新严格检查收费文章 - 必须包含明确的付费标识
+分类时记录的免费部分（paywall_split.FREE_SEGMENTS_NAME）中，分界标识本身就是严格付费标识、
+文件也没有变化的文章直接判定，不再打开；其余文章读取后检查（在文章包中未变化的从包中读取，
+否则读取原文件，大文件用 mmap）
 """
 import os
-import re
 import shutil
+from contextlib import nullcontext
+
+from article_frontmatter import MAX_HEADER_CHARS, parse_frontmatter
+from article_manifest import file_signature
+from article_pack import PACK_PATH, open_pack, packed_entry, read_packed
+from paywall_classifier import find_first_marker, marker_context, find_first_marker_bytes, marker_context_bytes
+from paywall_split import FREE_SEGMENTS_NAME, open_article, load_free_segments, save_free_segments
+from parallel_scan import parallel_map
 
 # 配置路径
 PAID_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章_收费文章"
 FREE_DIR = r"D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\王骁老师文章_免费文章"
 
-# 严格的收费文章标识（必须包含）
-STRICT_PAID_PATTERNS = [
-    r"下文为付费阅读",
-    r"付费阅读",
-    r"准备好了吗？准备好了，就付费吧",
-    r"付费后可见",
-    r"付费内容",
-    r"以下为付费",
-]
-
 def is_strictly_paid(content):
-    """严格判断是否是收费文章"""
-    for pattern in STRICT_PAID_PATTERNS:
-        if re.search(pattern, content, re.IGNORECASE):
-            return True
-    return False
+    """严格判断是否是收费文章（付费标识见 paywall_classifier.STRICT_RULES）"""
+    return find_first_marker(content, 'strict') is not None
+
+def check_file(item):
+    """
+    读取并严格检查一篇文章（在子进程中运行），item 为 (路径, 文章包路径, 包中的条目或 None)
+    返回 {'title', 'is_paid', 'context'}，context 为付费标识前后的文字；读取失败时返回 {'error'}
+    """
+    file_path, pack_path, entry = item
+    try:
+        source = nullcontext(read_packed(pack_path, entry)) if entry else open_article(file_path)
+        with source as data:
+            if isinstance(data, bytes):
+                content = data.decode('utf-8')
+                header = parse_frontmatter(content)
+                # 找到付费标识的具体位置（用于确认）
+                marker = find_first_marker(content, 'strict')
+                context = marker_context(content, marker) if marker else None
+            else:
+                header = parse_frontmatter(bytes(data[:MAX_HEADER_CHARS * 4]).decode('utf-8', 'ignore'))
+                marker = find_first_marker_bytes(data, 'strict')
+                context = marker_context_bytes(data, marker) if marker else None
+    except (OSError, ValueError) as e:
+        return {'error': str(e)}
+
+    # 提取标题（只在 YAML 头中查找）
+    title = header.title or os.path.basename(file_path)
+
+    return {'title': title, 'is_paid': marker is not None, 'context': context}
+
+def check_from_segment(file_path, segment):
+    """
+    用分类时记录的免费部分判定（不打开文章）：文件未变化、且分界标识本身是严格付费标识时返回检查结果，否则返回 None
+    """
+    if not segment or segment.get('sig') is None:
+        return None
+    try:
+        if file_signature(os.stat(file_path)) != segment['sig']:
+            return None
+    except OSError:
+        return None
+    # 分界是字数统计等非严格标识时，仍需读取全文检查
+    if find_first_marker(segment['rule'], 'strict') is None:
+        return None
+    tail = segment.get('free_text', '')[-20:].replace('\n', ' ')
+    return {'title': segment['title'], 'is_paid': True, 'context': f"{tail}{segment['rule']}"}
 
 def main():
     print("=" * 80)
@@ -39,50 +80,57 @@ def main():
     print("\n正在检查每篇文章...")
 
     # 遍历收费文章文件夹
-    for file in os.listdir(PAID_DIR):
-        if not file.endswith('.md'):
-            continue
-
-        file_path = os.path.join(PAID_DIR, file)
-
+    files = [file for file in os.listdir(PAID_DIR) if file.endswith('.md')]
+
+    # 分类时已记录分界的文章直接判定，其余的并行读取和检查，结果按文件顺序返回
+    segments_path = os.path.join(PAID_DIR, FREE_SEGMENTS_NAME)
+    segments = load_free_segments(segments_path)
+    results = [check_from_segment(os.path.join(PAID_DIR, f), segments.get(f)) for f in files]
+    to_check = [i for i, result in enumerate(results) if result is None]
+    pack = open_pack(PACK_PATH) if to_check else None
+    items = []
+    for i in to_check:
+        path = os.path.join(PAID_DIR, files[i])
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # 提取标题
-            title_match = re.search(r'title:\s*"([^"]+)"', content)
-            title = title_match.group(1) if title_match else file
-
-            # 严格检查是否是收费文章
-            if is_strictly_paid(content):
-                truly_paid.append({
-                    'title': title,
-                    'file': file,
-                    'path': file_path
-                })
-                print(f"  [真收费] {title}")
+            entry = packed_entry(pack, path, file_signature(os.stat(path)))
+        except OSError:
+            entry = None
+        items.append((path, PACK_PATH, entry))
+    if pack is not None:
+        pack.close()
+    for i, result in zip(to_check, parallel_map(check_file, items)):
+        results[i] = result
+    from_pack = sum(1 for path, pack_path, entry in items if entry is not None)
+    print(f"  {len(files) - len(to_check)} 篇使用分类时记录的付费分界，{len(to_check)} 篇读取全文检查"
+          f"（{from_pack} 篇读自文章包）")
+
+    for file, result in zip(files, results):
+        file_path = os.path.join(PAID_DIR, file)
 
-                # 找到付费标识的具体位置（用于确认）
-                for pattern in STRICT_PAID_PATTERNS:
-                    match = re.search(pattern, content)
-                    if match:
-                        # 显示付费标识前后的文字
-                        start = max(0, match.start() - 20)
-                        end = min(len(content), match.end() + 20)
-                        context = content[start:end].replace('\n', ' ')
-                        print(f"            → 付费标识: ...{context}...")
-                        break
-            else:
-                not_paid.append({
-                    'title': title,
-                    'file': file,
-                    'path': file_path
-                })
-                print(f"  [非收费] {title}")
-
-        except Exception as e:
+        if 'error' in result:
             print(f"处理文件失败: {file}")
-            print(f"错误: {e}")
+            print(f"错误: {result['error']}")
+            continue
+
+        title = result['title']
+
+        # 严格检查是否是收费文章
+        if result['is_paid']:
+            truly_paid.append({
+                'title': title,
+                'file': file,
+                'path': file_path
+            })
+            print(f"  [真收费] {title}")
+            if result['context']:
+                print(f"            → 付费标识: ...{result['context']}...")
+        else:
+            not_paid.append({
+                'title': title,
+                'file': file,
+                'path': file_path
+            })
+            print(f"  [非收费] {title}")
 
     # 统计结果
     print("\n" + "=" * 80)
@@ -103,6 +151,11 @@ def main():
             except Exception as e:
                 print(f"  移动失败: {article['title']} - {e}")
 
+        # 移回免费文章文件夹的文章从免费部分记录中去掉
+        moved = {article['file'] for article in not_paid if not os.path.exists(article['path'])}
+        if moved & segments.keys():
+            save_free_segments(segments_path, [r for f, r in segments.items() if f not in moved])
+
     # 保存真正的收费文章列表
     report_path = os.path.join(PAID_DIR, "收费文章列表_核实后.txt")
     with open(report_path, 'w', encoding='utf-8') as f:
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章处理流水线（带缓存）
+依次运行 去重 → 收费分类 → 收费复核 → 打包 → Dify 分段 → 新旧对比 → 导入 DOCX/TXT → 知识库统计，每一步声明自己的输入和输出。
+每一步的输入（文件 大小+修改时间、脚本代码、配置常量）算出一个指纹，
+指纹和上次成功运行后记录的一致、输出也没有被改动时直接跳过，并回放上次的运行输出；
+什么都没变时重跑整条流水线只需要 stat 文件，不打开任何文章
+
+大小/修改时间有变化时（touch、保留内容的复制等）再按内容判断：代码、输入和输出文件的内容摘要
+（content_hash.hash_file）与上次记录的一致时同样跳过。每一步的内容指纹和各输出的内容摘要记录在
+流水线状态.json 中；每个文件的摘要按 大小+修改时间 缓存，只有 stat 变化的文件才重新读取。
+快速判断只看 stat：输出被改写但大小和修改时间都没变时不会被发现，这种情况请指定步骤强制重跑
+
+    python run_pipeline.py                 # 运行（跳过未变化的步骤）
+    python run_pipeline.py classify ...    # 强制重跑指定步骤（及其后受影响的步骤）
+"""
+import io
+import os
+import sys
+import json
+import hashlib
+import importlib
+import contextlib
+from collections import namedtuple
+
+from content_hash import hash_file
+from stage_metrics import span
+
+# 缓存目录：每一步的指纹（流水线状态.json）、运行输出（<步骤>-<指纹>.log）
+# 和文件内容摘要缓存（路径 -> [大小, 修改时间, 摘要]）
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".流水线缓存")
+STATE_PATH = os.path.join(CACHE_DIR, "流水线状态.json")
+DIGESTS_PATH = os.path.join(CACHE_DIR, "内容摘要缓存.json")
+
+# name: 步骤名，module: 脚本模块名，
+# inputs/outputs: 根据模块配置返回路径列表的函数（文件或目录，目录递归统计）
+Stage = namedtuple('Stage', ['name', 'module', 'inputs', 'outputs'])
+
+STAGES = [
+    Stage('dedup', 'deduplicate_articles',
+          lambda m: [m.SOURCE_DIR],
+          lambda m: [m.OUTPUT_DIR]),
+    Stage('classify', 'find_paid_articles',
+          lambda m: [m.ARTICLES_DIR],
+          lambda m: [m.PAID_DIR, m.FREE_DIR, m.PLAN_PATH, m.PLAN_PATH + '.done']),
+    Stage('recheck', 'recheck_paid_articles',
+          lambda m: [m.PAID_DIR],
+          lambda m: [m.PAID_DIR, m.FREE_DIR]),
+    Stage('pack', 'article_pack',
+          lambda m: list(m.PACK_DIRS.values()),
+          lambda m: [m.PACK_PATH]),
+    Stage('chunk', 'dify_chunker',
+          lambda m: [m.ARTICLES_DIR],
+          lambda m: [m.OUTPUT_DIR]),
+    Stage('compare', 'compare_articles',
+          lambda m: [m.OLD_DIR, m.NEW_FREE_DIR, m.NEW_PAID_DIR],
+          lambda m: [m.REPORT_PATH]),
+    Stage('ingest', 'ingest_documents',
+          lambda m: [m.KB_ROOT],
+          lambda m: [m.OUTPUT_DIR]),
+    Stage('analyze', 'analyze_knowledge_base',
+          lambda m: [m.KB_ROOT],
+          lambda m: [os.path.join(m.KB_ROOT, "知识库结构分析.txt")]),
+]
+
+def _iter_tree(path):
+    """目录树中的文件：产出 (相对路径, 路径, stat)（跳过 . 开头的缓存文件）"""
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            try:
+                if entry.is_dir():
+                    stack.append(entry.path)
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            yield os.path.relpath(entry.path, path), entry.path, st
+
+def _walk_signatures(path, digest):
+    """把目录树中每个文件的 相对路径/大小/修改时间 写入摘要"""
+    for rel, file_path, st in _iter_tree(path):
+        digest.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\n".encode('utf-8'))
+
+def fingerprint_paths(paths):
+    """一组文件/目录的指纹（只用 stat，不读文件内容）"""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        digest.update(f"@{path}\n".encode('utf-8'))
+        if os.path.isdir(path):
+            _walk_signatures(path, digest)
+        elif os.path.exists(path):
+            st = os.stat(path)
+            digest.update(f"{st.st_size}\0{st.st_mtime_ns}\n".encode('utf-8'))
+        else:
+            digest.update(b"missing\n")
+    return digest.hexdigest()
+
+def _file_digest(file_path, st, digests):
+    """文件内容摘要；digests 中记录的 大小/修改时间 与 st 一致时直接使用，否则读取文件并更新记录"""
+    sig = [st.st_size, st.st_mtime_ns]
+    cached = digests.get(file_path)
+    if cached and cached[:2] == sig:
+        return cached[2]
+    value = hash_file(file_path)
+    digests[file_path] = sig + [value]
+    return value
+
+def content_fingerprint(paths, digests):
+    """
+    一组文件/目录的内容指纹（相对路径 + 每个文件的内容摘要），文件被 touch 或复制后不变
+    digests 为文件摘要缓存（见 _file_digest），就地更新
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        digest.update(f"@{path}\n".encode('utf-8'))
+        try:
+            if os.path.isdir(path):
+                for rel, file_path, st in _iter_tree(path):
+                    digest.update(f"{rel}\0{_file_digest(file_path, st, digests)}\n".encode('utf-8'))
+            elif os.path.exists(path):
+                digest.update(f"{_file_digest(path, os.stat(path), digests)}\n".encode('utf-8'))
+            else:
+                digest.update(b"missing\n")
+        except OSError:
+            digest.update(b"unreadable\n")
+    return digest.hexdigest()
+
+def output_digests(stage, module, digests):
+    """步骤每个输出的内容摘要：{输出路径: 指纹}"""
+    return {path: content_fingerprint([path], digests) for path in stage.outputs(module)}
+
+def _module_settings(module):
+    """模块中的配置常量（全大写的字符串/数字/布尔值）"""
+    return {
+        name: value for name, value in vars(module).items()
+        if name.isupper() and isinstance(value, (str, int, float, bool))
+    }
+
+def code_sources():
+    """本目录下所有已加载的脚本（任何共用模块改动都会让所有步骤重跑）"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    return sorted(
+        module.__file__ for module in list(sys.modules.values())
+        if getattr(module, '__file__', None)
+        and os.path.dirname(os.path.abspath(module.__file__)) == here
+    )
+
+def code_fingerprint():
+    """本目录下所有已加载脚本的 大小+修改时间"""
+    return fingerprint_paths(code_sources())
+
+def stage_key(stage, module, code_fp, inputs_fp=None):
+    """步骤的输入指纹：代码 + 配置 + 输入文件（inputs_fp 默认为输入的 stat 指纹）"""
+    if inputs_fp is None:
+        inputs_fp = fingerprint_paths(stage.inputs(module))
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(code_fp.encode())
+    digest.update(json.dumps(_module_settings(module), sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    digest.update(inputs_fp.encode())
+    return digest.hexdigest()
+
+def stage_content_key(stage, module, code_content_fp, digests):
+    """步骤的内容指纹：代码内容 + 配置 + 输入文件内容"""
+    return stage_key(stage, module, code_content_fp, content_fingerprint(stage.inputs(module), digests))
+
+def _load_json(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def load_state():
+    return _load_json(STATE_PATH)
+
+def load_digests():
+    return _load_json(DIGESTS_PATH)
+
+def save_digests(digests):
+    """写入文件摘要缓存，去掉已不存在的文件（先写临时文件再替换）"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = DIGESTS_PATH + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({path: value for path, value in digests.items() if os.path.exists(path)},
+                  f, ensure_ascii=False)
+    os.replace(tmp_path, DIGESTS_PATH)
+
+def save_state(state):
+    """写入流水线状态（先写临时文件再替换）"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = STATE_PATH + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, STATE_PATH)
+
+class _Tee(io.TextIOBase):
+    """同时输出到控制台和日志"""
+
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, text):
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+    def flush(self):
+        for stream in self.streams:
+            stream.flush()
+
+def run_stage(stage, module, log_path):
+    """运行一个步骤的 main()，输出同时保存到日志（开启 stage_metrics 时按步骤统计耗时）"""
+    argv = sys.argv
+    sys.argv = [module.__file__]
+    try:
+        with open(log_path, 'w', encoding='utf-8') as log, \
+                contextlib.redirect_stdout(_Tee(sys.stdout, log)), span(stage.name):
+            module.main()
+    finally:
+        sys.argv = argv
+
+def replay_log(log_path):
+    """回放跳过步骤上次的运行输出"""
+    if not log_path or not os.path.exists(log_path):
+        print("   （没有找到上次的运行输出）")
+        return
+    with open(log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            sys.stdout.write(line)
+    print(f"   （上次运行输出: {log_path}）")
+
+def main():
+    forced = set(sys.argv[1:])
+    unknown = forced - {stage.name for stage in STAGES}
+    if unknown:
+        print(f"未知的步骤: {', '.join(sorted(unknown))}（可选: {', '.join(s.name for s in STAGES)}）")
+        return
+
+    print("=" * 80)
+    print("文章处理流水线")
+    print("=" * 80)
+
+    modules = {stage.name: importlib.import_module(stage.module) for stage in STAGES}
+    code_fp = code_fingerprint()
+    state = load_state()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    # 内容指纹只在 stat 有变化时才计算（需要读取 stat 变化过的文件）
+    digests = None
+    code_content_fp = None
+
+    def content_state():
+        nonlocal digests, code_content_fp
+        if digests is None:
+            digests = load_digests()
+            code_content_fp = content_fingerprint(code_sources(), digests)
+        return digests, code_content_fp
+
+    ran = []
+    for stage in STAGES:
+        module = modules[stage.name]
+        key = stage_key(stage, module, code_fp)
+        outputs_fp = fingerprint_paths(stage.outputs(module))
+        previous = state.get(stage.name, {})
+
+        reason = None
+        if stage.name not in forced and previous.get('key') == key and previous.get('outputs') == outputs_fp:
+            reason = "输入未变化"
+        elif stage.name not in forced and previous.get('content_key'):
+            # 文件 大小/修改时间 变了：按内容再判断一次
+            stage_digests, code_content = content_state()
+            if (stage_content_key(stage, module, code_content, stage_digests) == previous['content_key']
+                    and output_digests(stage, module, stage_digests) == previous.get('output_digests')):
+                reason = "文件时间有变化但内容未变"
+                previous.update(key=key, outputs=outputs_fp)
+
+        if reason:
+            print(f"\n[{stage.name}] {reason}，跳过（以下为上次的运行输出）")
+            replay_log(os.path.join(CACHE_DIR, previous['log']) if previous.get('log') else None)
+            continue
+
+        print(f"\n[{stage.name}] 运行 {stage.module}.main()")
+        log_name = f"{stage.name}-{key}.log"
+        try:
+            run_stage(stage, module, os.path.join(CACHE_DIR, log_name))
+        except Exception as e:
+            print(f"\n❌ 步骤 {stage.name} 失败: {e}")
+            state.pop(stage.name, None)
+            save_state(state)
+            return
+
+        # 旧日志只保留最新一份
+        if previous.get('log') and previous['log'] != log_name:
+            old_log = os.path.join(CACHE_DIR, previous['log'])
+            if os.path.exists(old_log):
+                os.remove(old_log)
+        state[stage.name] = {'log': log_name}
+        ran.append(stage.name)
+
+    # 后面的步骤可能改动前面步骤的输入/输出（例如分类把文章移出去重目录），
+    # 所以全部运行完后再统一记录最终状态，下次什么都没变时每一步都能命中
+    # stat 指纹与记录一致、已有内容指纹的步骤不重新计算内容指纹
+    for stage in STAGES:
+        if stage.name in state:
+            module = modules[stage.name]
+            record = state[stage.name]
+            key = stage_key(stage, module, code_fp)
+            outputs_fp = fingerprint_paths(stage.outputs(module))
+            if record.get('key') != key or record.get('outputs') != outputs_fp or 'content_key' not in record:
+                stage_digests, code_content = content_state()
+                record['content_key'] = stage_content_key(stage, module, code_content, stage_digests)
+                record['output_digests'] = output_digests(stage, module, stage_digests)
+            record['key'] = key
+            record['outputs'] = outputs_fp
+    save_state(state)
+    if digests is not None:
+        save_digests(digests)
+
+    print("\n" + "=" * 80)
+    if ran:
+        print(f"本次运行: {', '.join(ran)}")
+    else:
+        print("所有步骤的输入都未变化，没有需要运行的步骤")
+    print("=" * 80)
+
+if __name__ == "__main__":
+    main()
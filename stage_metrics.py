@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+脚本各阶段的耗时与资源统计
+用 span() 包住读取、解析、分类、写出等阶段（或用 @instrument 装饰函数），记录：
+    耗时、CPU 时间（只含本进程，不含进程池子进程）
+    文件数、读写字节数（脚本用 span.add() 报告；Linux 下另外记录 /proc/self/io 的变化）
+    Python 内存分配峰值（tracemalloc）
+
+默认什么都不记录，开销只是一次环境变量检查：
+    HD_METRICS=metrics.jsonl      每个阶段结束时向该文件追加一行 JSON
+    HD_PROFILE_DIR=目录           每个最外层阶段额外用 cProfile 分析，结果存为 <脚本>-<阶段>-<进程号>.prof
+                                  （python -m pstats 文件名 查看）
+
+阶段可以嵌套，记录中的 span 为 "外层/内层" 形式的路径
+
+    with span('parse') as s:
+        ...
+        s.add(files=len(paths), bytes_read=total)
+"""
+import os
+import sys
+import json
+import time
+import cProfile
+import functools
+import tracemalloc
+import contextlib
+
+METRICS_ENV = 'HD_METRICS'
+PROFILE_ENV = 'HD_PROFILE_DIR'
+
+class Span:
+    """一个阶段的计数器"""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.files = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.peak = 0   # 已结束的内层阶段的内存峰值
+
+    def add(self, files=0, bytes_read=0, bytes_written=0):
+        self.files += files
+        self.bytes_read += bytes_read
+        self.bytes_written += bytes_written
+
+class _NullSpan:
+    """未开启统计时使用，什么都不记录"""
+
+    def add(self, files=0, bytes_read=0, bytes_written=0):
+        pass
+
+_NULL_SPAN = _NullSpan()
+_stack = []
+_profiling = False
+
+def _read_proc_io():
+    """/proc/self/io 中的读写统计（不是 Linux 时返回 None）"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            return {key: int(value) for key, value in (line.split(':') for line in f)}
+    except OSError:
+        return None
+
+def _script_name():
+    return os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]
+
+def _write_record(path, record):
+    """追加一行 JSON（每行一次写入，多个进程写同一个文件也不会交错）"""
+    line = json.dumps(record, ensure_ascii=False) + '\n'
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line)
+
+@contextlib.contextmanager
+def span(name, **fields):
+    """
+    统计一个阶段；fields 是附加到记录中的字段（如 files=文件数）
+    未设置 HD_METRICS / HD_PROFILE_DIR 时直接运行，不做任何统计
+    """
+    global _profiling
+    metrics_path = os.environ.get(METRICS_ENV)
+    profile_dir = os.environ.get(PROFILE_ENV)
+    if not metrics_path and not profile_dir:
+        yield _NULL_SPAN
+        return
+
+    current = Span(name, fields)
+    path = '/'.join([s.name for s in _stack] + [name])
+
+    # 内存峰值：进入内层阶段前把外层到目前为止的峰值记下来，再重新开始计峰值
+    started_tracing = False
+    if metrics_path:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        elif _stack:
+            _stack[-1].peak = max(_stack[-1].peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+    profiler = None
+    if profile_dir and not _profiling:
+        profiler = cProfile.Profile()
+        _profiling = True
+        profiler.enable()
+
+    _stack.append(current)
+    io_before = _read_proc_io()
+    cpu_before = time.process_time()
+    start = time.perf_counter()
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - cpu_before
+        io_after = _read_proc_io()
+        _stack.pop()
+
+        if profiler is not None:
+            profiler.disable()
+            _profiling = False
+            os.makedirs(profile_dir, exist_ok=True)
+            safe_name = path.replace('/', '.')
+            profiler.dump_stats(os.path.join(profile_dir, f"{_script_name()}-{safe_name}-{os.getpid()}.prof"))
+
+        if metrics_path:
+            peak = max(current.peak, tracemalloc.get_traced_memory()[1])
+            if started_tracing:
+                tracemalloc.stop()
+            elif _stack:
+                _stack[-1].peak = max(_stack[-1].peak, peak)
+
+            record = {
+                'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'script': _script_name(),
+                'pid': os.getpid(),
+                'span': path,
+                'wall_seconds': round(wall, 6),
+                'cpu_seconds': round(cpu, 6),
+                'files': current.files,
+                'bytes_read': current.bytes_read,
+                'bytes_written': current.bytes_written,
+                'peak_memory_kb': peak // 1024,
+                'io': None,
+            }
+            if io_before and io_after:
+                record['io'] = {key: io_after[key] - io_before[key] for key in io_after}
+            record.update(fields)
+            if error:
+                record['error'] = error
+            _write_record(metrics_path, record)
+
+def instrument(name=None):
+    """装饰器：把整个函数作为一个阶段统计（阶段名默认为函数名）"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def summarize(metrics_path):
+    """按阶段汇总 JSON-lines 记录：{span: {'count', 'wall_seconds', 'cpu_seconds', 'files', 'peak_memory_kb'}}"""
+    summary = {}
+    with open(metrics_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            item = summary.setdefault(record['span'], {
+                'count': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'files': 0, 'peak_memory_kb': 0
+            })
+            item['count'] += 1
+            item['wall_seconds'] += record['wall_seconds']
+            item['cpu_seconds'] += record['cpu_seconds']
+            item['files'] += record['files']
+            item['peak_memory_kb'] = max(item['peak_memory_kb'], record['peak_memory_kb'])
+    return summary
+
+def main():
+    """python stage_metrics.py metrics.jsonl —— 按耗时列出各阶段"""
+    metrics_path = sys.argv[1] if len(sys.argv) > 1 else os.environ.get(METRICS_ENV)
+    if not metrics_path:
+        print(f"用法: python stage_metrics.py metrics.jsonl（或设置 {METRICS_ENV}）")
+        return
+    summary = summarize(metrics_path)
+    print(f"{'阶段':<40}{'次数':>6}{'耗时(s)':>12}{'CPU(s)':>12}{'文件':>10}{'内存峰值(KB)':>16}")
+    for name, item in sorted(summary.items(), key=lambda x: -x[1]['wall_seconds']):
+        print(f"{name:<40}{item['count']:>6}{item['wall_seconds']:>12.3f}{item['cpu_seconds']:>12.3f}"
+              f"{item['files']:>10}{item['peak_memory_kb']:>16}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成文章语料
+生成与"下载文章"目录结构相同的中文 markdown 文章（YAML 头 + 正文），供基准测试使用：
+    <输出目录>/王骁老师文集<k>/<子目录>/<文章>.md
+
+同样的参数和随机种子总是生成完全相同的语料；可以配置
+    重复文章比例   同一URL、同一内容的文章出现在另一个文集中（去重要处理的情况）
+    副本比例       同目录下的 "xxx - 副本.md"（clean_duplicates.py 要清理的情况）
+    收费文章比例   正文中带 "下文为付费阅读" 和 "(上文N字，下文M字)"
+    文章长度分布   对数正态分布（中位数、离散程度、上下限，单位为字）
+
+    python synthetic_corpus.py 输出目录 [文章数]
+"""
+import os
+import sys
+import json
+import math
+import random
+import shutil
+
+# 默认参数
+DEFAULT_PARAMS = {
+    'count': 1000,            # 文章数（不含重复文章和副本）
+    'seed': 20251012,
+    'duplicate_ratio': 0.10,
+    'copy_ratio': 0.03,
+    'paywall_ratio': 0.15,
+    'median_chars': 3000,
+    'sigma': 0.8,
+    'min_chars': 200,
+    'max_chars': 50000,
+    'collections': 4,         # 文集数
+    'per_subdir': 500,        # 每个子目录的文章数
+}
+
+# 记录生成参数的文件，参数相同时不重新生成
+PARAMS_NAME = "语料参数.json"
+
+# 组成正文的词汇
+TERMS = [
+    '人类图', '荐骨', '荐骨权威', '情绪权威', '脾直觉', '等待回应', '生产者', '显示生产者', '投射者',
+    '显示者', '反映者', '人生角色', '轮回交叉', '闸门', '通道', '能量中心', '情绪中心', '喉咙中心',
+    '意志力中心', 'G中心', '根部中心', '直觉中心', '逻辑中心', '头脑中心', '策略', '内在权威', '定义',
+    '空白中心', '非自己', '条件化', '去条件化', '个体人', '部落人', '集体人', '人面狮身', '爱之船',
+]
+COMMON_CHARS = (
+    '的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过'
+    '子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体'
+    '制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内'
+    '数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提'
+)
+PUNCTUATION = '，，，、；：'
+
+# 收费文章中的付费分界
+PAYWALL_LINES = [
+    '下文为付费阅读',
+    '准备好了吗？准备好了，就付费吧',
+]
+
+def _sentence(rng):
+    parts = []
+    for i in range(rng.randint(3, 8)):
+        if rng.random() < 0.35:
+            parts.append(rng.choice(TERMS))
+        else:
+            parts.append(''.join(rng.choice(COMMON_CHARS) for i in range(rng.randint(2, 9))))
+        if rng.random() < 0.25:
+            parts.append(rng.choice(PUNCTUATION))
+    return ''.join(parts) + rng.choice('。。。！？')
+
+def _article_length(rng, params):
+    length = rng.lognormvariate(math.log(params['median_chars']), params['sigma'])
+    return int(min(max(length, params['min_chars']), params['max_chars']))
+
+def _body(rng, sentences, length):
+    """由句子池拼出约 length 字的正文，每 3~6 句一段"""
+    paragraphs = []
+    total = 0
+    while total < length:
+        paragraph = ''.join(rng.choice(sentences) for i in range(rng.randint(3, 6)))
+        paragraphs.append(paragraph)
+        total += len(paragraph)
+    return paragraphs
+
+def _render(title, url, paragraphs, paywall_at, rng):
+    lines = ['---', f'title: "{title}"', f'source_url: "{url}"', '---', '', f'# {title}', '']
+    for i, paragraph in enumerate(paragraphs):
+        if i == paywall_at:
+            before = sum(len(p) for p in paragraphs[:i])
+            after = sum(len(p) for p in paragraphs[i:])
+            lines.append(rng.choice(PAYWALL_LINES))
+            lines.append(f'(上文{before}字，下文{after}字)')
+            lines.append('')
+        lines.append(paragraph)
+        lines.append('')
+    return '\n'.join(lines)
+
+def iter_articles(params):
+    """
+    按生成顺序产出 (相对路径, 文本)；同样的参数总是产出同样的序列
+    """
+    rng = random.Random(params['seed'])
+    sentences = [_sentence(rng) for i in range(4000)]
+    collections = [f"王骁老师文集{k + 1}" for k in range(params['collections'])]
+
+    for i in range(params['count']):
+        collection = collections[i % len(collections)]
+        subdir = f"第{i // params['per_subdir'] + 1}批"
+        title = f"{rng.choice(TERMS)}{rng.choice(TERMS)}之{i + 1}"
+        url = f"https://mp.weixin.qq.com/s/synthetic{i:07d}"
+        paragraphs = _body(rng, sentences, _article_length(rng, params))
+        paywall_at = None
+        if rng.random() < params['paywall_ratio'] and len(paragraphs) > 1:
+            paywall_at = rng.randint(1, len(paragraphs) - 1)
+        text = _render(title, url, paragraphs, paywall_at, rng)
+
+        file_name = f"{i + 1:06d}_{title}.md"
+        yield os.path.join(collection, subdir, file_name), text
+        if rng.random() < params['copy_ratio']:
+            yield os.path.join(collection, subdir, file_name[:-3] + ' - 副本.md'), text
+        if rng.random() < params['duplicate_ratio']:
+            other = collections[(i + 1) % len(collections)] if len(collections) > 1 else collection + '_重复'
+            yield os.path.join(other, subdir, file_name), text
+
+def generate_corpus(output_dir, **overrides):
+    """
+    生成语料，返回 {'files': 文件数, 'bytes': 总字节数, 'generated': 是否重新生成}
+    输出目录中已有同样参数生成的语料时直接复用，参数不同时删除旧语料重新生成
+    """
+    params = dict(DEFAULT_PARAMS, **overrides)
+    params_path = os.path.join(output_dir, PARAMS_NAME)
+    if os.path.exists(params_path):
+        with open(params_path, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+        if existing['params'] == params:
+            return {'files': existing['files'], 'bytes': existing['bytes'], 'generated': False}
+        # 目录中是旧参数生成的语料，整个删除后重新生成
+        shutil.rmtree(output_dir)
+
+    files = 0
+    total_bytes = 0
+    for rel_path, text in iter_articles(params):
+        path = os.path.join(output_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = text.encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(data)
+        files += 1
+        total_bytes += len(data)
+
+    # 参数文件最后写入，生成中断时下次会重新生成
+    with open(params_path, 'w', encoding='utf-8') as f:
+        json.dump({'params': params, 'files': files, 'bytes': total_bytes}, f, ensure_ascii=False, indent=2)
+    return {'files': files, 'bytes': total_bytes, 'generated': True}
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python synthetic_corpus.py 输出目录 [文章数]")
+        return
+    output_dir = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PARAMS['count']
+
+    print(f"生成合成语料: {count} 篇 -> {output_dir}")
+    stats = generate_corpus(output_dir, count=count)
+    state = "已生成" if stats['generated'] else "参数相同，复用已有语料"
+    print(f"{state}: {stats['files']} 个文件，{stats['bytes'] / 1024 / 1024:.1f}MB")
+
+if __name__ == "__main__":
+    main()
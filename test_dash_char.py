@@ -1,56 +1,32 @@
 # -*- coding: utf-8 -*-
 """
 检查破折号字符
+（规则集 dashes 接受各种破折号写法，与只认 "——" 的 default 对比）
 """
 
-import re
+from collections import Counter
 
-# 从文件读取实际内容
-file_path = r'D:\CursorWork\download_gongzhonghao\人类图AI高我知识库\01_核心理论\人类图轮回交叉全书.txt'
+from cross_book import BOOK_PATH, match_profiles_file, compare_profiles
 
-with open(file_path, 'r', encoding='utf-8') as f:
-    content = f.read()
+results = match_profiles_file(BOOK_PATH, names=['default', 'dashes'])
 
-# 找到并列交叉的行
-juxtaposition_lines = []
-for line in content.split('\n'):
-    if '并列交叉之' in line and '——' in line:
-        juxtaposition_lines.append(line)
-        if len(juxtaposition_lines) >= 3:
-            break
+# 书中实际使用的破折号
+dash_counts = Counter(record.dash for record in results['dashes'])
+print("破折号写法统计:")
+for dash, count in dash_counts.most_common():
+    print(f"  '{dash}' {[hex(ord(c)) for c in dash]} {dash.encode('utf-8')}: {count} 个")
 
-print(f"找到 {len(juxtaposition_lines)} 行并列交叉")
-for i, line in enumerate(juxtaposition_lines, 1):
-    print(f"\n行 {i}:")
-    print(f"内容: {line}")
+# 前3个并列交叉
+juxtaposition = [record for record in results['dashes'] if record.type == '并列']
+print(f"\n找到 {len(juxtaposition)} 个并列交叉")
+for i, record in enumerate(juxtaposition[:3], 1):
+    print(f"\n行 {record.gates_line_no}:")
+    print(f"  {record.chinese_raw} | {record.english_raw} | {record.dash}{record.key}")
 
-    # 检查破折号字符
-    if '——' in line:
-        idx = line.index('——')
-        dash_chars = line[idx:idx+2]
-        print(f"破折号: '{dash_chars}'")
-        print(f"破折号字节: {dash_chars.encode('utf-8')}")
-        print(f"破折号Unicode: {[hex(ord(c)) for c in dash_chars]}")
-
-# 测试正则表达式
-print("\n" + "="*60)
-print("测试正则匹配")
-print("="*60)
-
-# 提取包含门组合的段落
-pattern1 = r'并列交叉之[^\n]+\n[^\n]+——\d+/\d+/\d+/\d+'
-matches1 = re.findall(pattern1, content)
-print(f"\n简单模式匹配数: {len(matches1)}")
-if matches1:
-    print("前3个匹配:")
-    for m in matches1[:3]:
-        print(f"  {m[:60]}...")
-
-# 完整提取模式
-pattern2 = r'(并列交叉之[^\n]+)\s*\n\s*([^\n]+?)——(\d+)/(\d+)/(\d+)/(\d+)'
-matches2 = re.findall(pattern2, content)
-print(f"\n完整模式匹配数: {len(matches2)}")
-if matches2:
-    print("前3个匹配:")
-    for m in matches2[:3]:
-        print(f"  {m[0]} | {m[1]} | {m[2]}-{m[3]}-{m[4]}-{m[5]}")
+print("\n" + "=" * 60)
+print("只认 '——' 时漏掉的交叉")
+print("=" * 60)
+diff = compare_profiles(results)['dashes']
+print(f"default: {len(results['default'])} 个，dashes: {len(results['dashes'])} 个")
+for record in diff['extra']:
+    print(f"  第{record.line_no}行 [{record.type}] {record.chinese_raw} | {record.english_raw} | '{record.dash}'")
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 """
-测试正则表达式为什么不匹配并列交叉
+测试各提取规则集为什么不匹配并列交叉
+（规则集见 cross_book.PROFILES，一次扫描同时检查所有规则集）
 """
 
-import re
+from cross_book import PROFILES, match_profiles
 
 # 测试文本
 test_samples = [
@@ -24,40 +25,17 @@ The Driver 2——2/1/49/4""",
 DEFIANCE 4——1/2/4/49"""
 ]
 
-# 当前的正则模式
-pattern = r'([右左并]角度交叉之[^\n]+?)\s*\n\s*([A-Z\s][^\n]*?)\s*(\d+)?——(\d+)/(\d+)/(\d+)/(\d+)'
-
-print("=" * 60)
-print("测试当前正则模式")
 print("=" * 60)
-
-for i, sample in enumerate(test_samples, 1):
-    print(f"\n测试样本 {i}:")
-    print(sample[:50] + "...")
-    match = re.search(pattern, sample, re.MULTILINE)
-    if match:
-        print("[OK] 匹配成功")
-        print(f"  中文名: {match.group(1)}")
-        print(f"  英文名: {match.group(2)}")
-        print(f"  门组合: {match.group(4)}-{match.group(5)}-{match.group(6)}-{match.group(7)}")
-    else:
-        print("[FAIL] 匹配失败")
-
-# 尝试更宽松的模式
-pattern2 = r'([右左并]角度交叉之[^\n]+)\s*\n\s*([^\n]+?)——(\d+)/(\d+)/(\d+)/(\d+)'
-
-print("\n\n" + "=" * 60)
-print("测试更宽松的正则模式（去掉 [A-Z\\s] 限制）")
+print("测试各规则集")
 print("=" * 60)
 
 for i, sample in enumerate(test_samples, 1):
     print(f"\n测试样本 {i}:")
     print(sample[:50] + "...")
-    match = re.search(pattern2, sample, re.MULTILINE)
-    if match:
-        print("[OK] 匹配成功")
-        print(f"  中文名: {match.group(1)}")
-        print(f"  英文名: {match.group(2)}")
-        print(f"  门组合: {match.group(3)}-{match.group(4)}-{match.group(5)}-{match.group(6)}")
-    else:
-        print("[FAIL] 匹配失败")
+    results = match_profiles(sample.split('\n'))
+    for name in PROFILES:
+        if results[name]:
+            record = results[name][0]
+            print(f"  [OK] {name}: {record.chinese_name} | {record.english_name} | {record.key}")
+        else:
+            print(f"  [FAIL] {name}")
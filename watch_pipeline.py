@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识库增量处理（监视模式）
+常驻运行，监视文章下载目录；新下载或修改过的 .md 文章在写入完成（一段时间无变化）后，
+逐篇完成 去重 → 收费判断 → 写入目录库，直接出现在免费/收费文件夹中，
+不需要再手动依次重跑 deduplicate_articles.py → find_paid_articles.py → recheck_paid_articles.py
+
+Linux 下使用 inotify，其他系统定时轮询目录
+目录和生成方式沿用 deduplicate_articles.py / find_paid_articles.py 中的配置
+"""
+import os
+import sys
+import time
+import select
+import struct
+
+import deduplicate_articles as dedup
+import find_paid_articles as classify
+from article_catalog import CATALOG_PATH, open_catalog, upsert_articles
+from article_frontmatter import parse_frontmatter
+from article_manifest import iter_markdown_files, file_signature
+from content_hash import hash_bytes
+from materialize import materialize
+from paywall_classifier import find_first_marker
+from paywall_split import FREE_SEGMENTS_NAME, body_start, split_paywall, append_free_segment
+
+# 轮询间隔（秒），inotify 模式下为最长等待时间
+POLL_INTERVAL = 0.5
+
+# 文件最后一次变化后等待多久再处理（秒），避免处理写了一半的文章
+DEBOUNCE_SECONDS = 0.3
+
+# Linux 下优先使用 inotify
+USE_INOTIFY = sys.platform.startswith('linux')
+
+# 启动时是否处理下载目录中已有但目录库里还没有的文章（默认只处理启动之后的新文章）
+PROCESS_EXISTING = False
+
+class PollingWatcher:
+    """定时比较目录中所有 .md 文件的 大小+修改时间，返回有变化的文件"""
+
+    def __init__(self, root):
+        self.root = root
+        self.signatures = self._scan()
+
+    def _scan(self):
+        return {
+            path: file_signature(st)
+            for path, name, st in iter_markdown_files(self.root)
+        }
+
+    def all_files(self):
+        return list(self.signatures)
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+        current = self._scan()
+        changed = {
+            path for path, sig in current.items()
+            if self.signatures.get(path) != sig
+        }
+        self.signatures = current
+        return changed
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """通过 inotify 监视目录树（新建的子目录自动加入监视）"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    _EVENT = struct.Struct('iIII')
+
+    def __init__(self, root):
+        import ctypes
+        self.root = root
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.watches = {}
+        self._add_tree(root)
+
+    def _add_tree(self, directory):
+        """监视目录及其所有子目录，返回其中已有的 .md 文件"""
+        found = []
+        for current, dirs, files in os.walk(directory):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(current), self.WATCH_MASK)
+            if wd >= 0:
+                self.watches[wd] = current
+            found.extend(os.path.join(current, f) for f in files if f.endswith('.md'))
+        return found
+
+    def all_files(self):
+        return [path for path, name, st in iter_markdown_files(self.root)]
+
+    def wait(self, timeout):
+        changed = set()
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return changed
+
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # 事件队列溢出，退回全量扫描
+                changed.update(self.all_files())
+                continue
+
+            directory = self.watches.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, name)
+
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    # 新目录：加入监视前就已写入的文件也要处理
+                    changed.update(self._add_tree(path))
+            elif name.endswith('.md'):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+def load_state(conn):
+    """从目录库读取已经保留的文章：{source_url: 下载目录中的源文件路径或 None}"""
+    urls = {}
+    for (url,) in conn.execute(
+            "SELECT DISTINCT source_url FROM articles "
+            "WHERE snapshot IN (?, ?) AND source_url IS NOT NULL",
+            (dedup.CATALOG_SNAPSHOT, classify.CATALOG_SNAPSHOT)):
+        urls[url] = None
+    return urls
+
+def _has_output(file_name):
+    """去重/免费/收费目录中是否已有同名文章"""
+    return any(os.path.exists(os.path.join(directory, file_name))
+               for directory in (dedup.OUTPUT_DIR, classify.PAID_DIR, classify.FREE_DIR))
+
+def process_article(file_path, kept_urls, conn):
+    """
+    处理一篇新下载或修改过的文章，返回处理结果说明
+    与批处理相同：只处理王骁老师文集中的文章，同一URL保留最先出现的一篇，
+    收费判断使用严格规则（相当于 find_paid_articles.py + recheck_paid_articles.py 的最终结果）
+    """
+    file_name = os.path.basename(file_path)
+    collection = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
+    if not collection.startswith('王骁老师') or file_name == 'README.md':
+        return None
+
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        content = data.decode('utf-8')
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        return f"❌ 读取失败: {file_name} - {e}"
+
+    header = parse_frontmatter(content)
+    url = header.source_url
+    title = header.title or file_name
+
+    if url:
+        owner = kept_urls.get(url, file_path)
+        if owner is None and _has_output(file_name):
+            # 启动前已处理过的同一篇文章（再次下载或被修改）
+            owner = file_path
+        if owner != file_path:
+            return f"[重复URL-跳过] {title}"
+        kept_urls[url] = file_path
+
+    # 去重：生成到去重目录
+    dedup_path = os.path.join(dedup.OUTPUT_DIR, file_name)
+    materialize(file_path, dedup_path, dedup.MATERIALIZE_MODE)
+
+    # 收费判断：生成到免费/收费目录（如果之前分到了另一边，先删掉旧的）
+    marker = find_first_marker(content, 'strict')
+    target_dir = classify.PAID_DIR if marker else classify.FREE_DIR
+    other_dir = classify.FREE_DIR if marker else classify.PAID_DIR
+    final_path = os.path.join(target_dir, file_name)
+    stale_path = os.path.join(other_dir, file_name)
+    if os.path.exists(stale_path):
+        os.remove(stale_path)
+    materialize(dedup_path, final_path, classify.MATERIALIZE_MODE)
+
+    # 收费文章的免费部分追加到分类时的记录中，recheck_paid_articles.py 不必再打开这篇文章
+    if marker:
+        split = split_paywall(data, body_start(data, header.body_offset))
+        if split is not None:
+            append_free_segment(os.path.join(classify.PAID_DIR, FREE_SEGMENTS_NAME), {
+                'file': file_name,
+                'path': final_path,
+                'sig': file_signature(os.stat(final_path)),
+                'title': title,
+                'source_url': url,
+                **split._asdict()
+            })
+
+    # 写入目录库
+    content_hash = hash_bytes(data)
+    records = {dedup.CATALOG_SNAPSHOT: dedup_path, classify.CATALOG_SNAPSHOT: final_path}
+    for snapshot, path in records.items():
+        if not os.path.exists(path):
+            continue
+        st = os.stat(path)
+        upsert_articles(conn, snapshot, [{
+            'path': path,
+            'collection': collection if snapshot == dedup.CATALOG_SNAPSHOT
+                          else ('收费文章' if marker else '免费文章'),
+            'source_url': url,
+            'title': header.title,
+            'paid': None if snapshot == dedup.CATALOG_SNAPSHOT else bool(marker),
+            'content_hash': content_hash,
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns
+        }])
+    with conn:
+        conn.execute("DELETE FROM articles WHERE snapshot = ? AND path = ?",
+                     (classify.CATALOG_SNAPSHOT, stale_path))
+
+    label = f"收费-{marker.rule}" if marker else "免费"
+    return f"[{label}] {title}"
+
+def main():
+    print("=" * 80)
+    print("知识库监视模式（Ctrl+C 退出）")
+    print("=" * 80)
+
+    for directory in (dedup.OUTPUT_DIR, classify.PAID_DIR, classify.FREE_DIR):
+        os.makedirs(directory, exist_ok=True)
+
+    conn = open_catalog(CATALOG_PATH)
+    kept_urls = load_state(conn)
+
+    if USE_INOTIFY:
+        try:
+            watcher = InotifyWatcher(dedup.SOURCE_DIR)
+            print(f"\n使用 inotify 监视: {dedup.SOURCE_DIR}")
+        except (OSError, AttributeError) as e:
+            print(f"\ninotify 不可用（{e}），改为轮询")
+            watcher = PollingWatcher(dedup.SOURCE_DIR)
+    else:
+        watcher = PollingWatcher(dedup.SOURCE_DIR)
+        print(f"\n每 {POLL_INTERVAL} 秒轮询: {dedup.SOURCE_DIR}")
+
+    print(f"目录库中已有 {len(kept_urls)} 个URL")
+
+    # 待处理文件 -> 最后一次变化的时间
+    pending = {}
+    if PROCESS_EXISTING:
+        now = time.monotonic()
+        pending.update((path, now) for path in watcher.all_files())
+
+    processed = 0
+    try:
+        while True:
+            timeout = POLL_INTERVAL
+            if pending:
+                timeout = min(timeout, DEBOUNCE_SECONDS)
+
+            now = time.monotonic()
+            for path in watcher.wait(timeout):
+                pending[path] = now
+
+            now = time.monotonic()
+            ready = [path for path, t in pending.items() if now - t >= DEBOUNCE_SECONDS]
+            for path in sorted(ready):
+                del pending[path]
+                started = time.perf_counter()
+                try:
+                    result = process_article(path, kept_urls, conn)
+                except Exception as e:
+                    result = f"❌ 处理失败: {path} - {e}"
+                if result:
+                    processed += 1
+                    elapsed = (time.perf_counter() - started) * 1000
+                    print(f"  {result}  （{elapsed:.0f}ms）")
+    except KeyboardInterrupt:
+        print(f"\n已停止，本次共处理 {processed} 篇文章")
+    finally:
+        watcher.close()
+        conn.close()
+
+if __name__ == "__main__":
+    main()